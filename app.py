@@ -1,7 +1,24 @@
+import os
+import time
+
 import streamlit as st
 import pandas as pd
-import os
-from practice.flyer_completion import flyer_completion
+from devtools import profiling
+from devtools.panel import profiling_panel
+from practice.item_bank import watch_item_banks
+from practice.tasks import load_task, run_task, task_key, task_label, task_labels
+from storage.passwords import (
+    KDFBusy,
+    VerifiedCache,
+    hash_password_pooled,
+    is_hashed,
+    verify_password_pooled,
+)
+from storage.mistakes import get_mistake_index
+from storage.progress import get_progress_index
+from storage.reviews import BLANK, ERROR_TYPE, get_review_scheduler
+from storage.sessions import get_session_store
+from storage.users import AUTHOR_ROLES, open_user_store
 
 # ==========================
 # APP CONFIG
@@ -11,14 +28,17 @@ st.set_page_config(page_title="Adaptive Learning App", layout="wide")
 # ==========================
 # DEV MODE (allow testing without login)
 # ==========================
-DEV_MODE = True
+DEV_MODE = os.environ.get("DEV_MODE", "1") != "0"
 
-USER_FILE = "users.csv"
+# Per-rerun timings in a sidebar panel and metrics.jsonl (PROFILE=1)
+PROFILE_MODE = profiling.ENABLED
 
-if not os.path.exists(USER_FILE):
-    pd.DataFrame(
-        columns=["student_id", "full_name", "password"]
-    ).to_csv(USER_FILE, index=False)
+# Item search results per page (teachers and authors only, see is_author)
+SEARCH_PASSAGES = 20
+ALL = "All"
+
+# Shown when the password KDF pool is saturated (storage.passwords)
+SERVER_BUSY = "Server busy, please try again"
 
 # ==========================
 # SESSION STATE
@@ -34,13 +54,116 @@ for key, default in {
 # ==========================
 # USER FUNCTIONS
 # ==========================
-def load_users():
-    return pd.read_csv(USER_FILE)
+@st.cache_resource
+def get_user_store():
+    # One store (and DB connection pool) per process, shared by all sessions
+    return open_user_store()
+
+def find_user(student_id):
+    with profiling.section("user_lookup"):
+        return get_user_store().get(student_id)
+
+def is_author():
+    """
+    Whether the signed-in user may use Item Search: a teacher or author
+    role in their user record (read on every check, so a role change
+    applies at once). The DEV MODE login has no record and may.
+    """
+    if not st.session_state.logged_in:
+        return False
+    user = find_user(st.session_state.student_id)
+    if user is None:
+        return DEV_MODE and st.session_state.student_id == "DEV"
+    return user["role"] in AUTHOR_ROLES
 
 def save_user(student_id, full_name, password):
-    df = load_users()
-    df.loc[len(df)] = [student_id, full_name, password]
-    df.to_csv(USER_FILE, index=False)
+    password_hash = hash_password_pooled(password)
+    return get_user_store().add(student_id, full_name, password_hash)
+
+def check_login(student_id, password):
+    """
+    Return the user if the password matches, else None.
+    The slow KDF runs on the shared worker pool; a repeat login in the
+    same session within a few minutes is answered from VerifiedCache.
+    Raises KDFBusy when the pool's backlog is full.
+    """
+    user = find_user(student_id)
+    if user is None:
+        return None
+
+    if "verified_logins" not in st.session_state:
+        st.session_state.verified_logins = VerifiedCache()
+    cache = st.session_state.verified_logins
+
+    stored = user["password"]
+    if cache.hit(student_id, stored, password):
+        profiling.count("login_cache.hit")
+        return user
+    profiling.count("login_cache.miss")
+
+    with profiling.section("password_verify"):
+        if not verify_password_pooled(password, stored):
+            return None
+
+    # Upgrade accounts still holding a plaintext password (when the KDF
+    # pool is saturated, the next login upgrades it instead)
+    if not is_hashed(stored):
+        try:
+            stored = hash_password_pooled(password)
+            get_user_store().set_password(student_id, stored)
+        except KDFBusy:
+            pass
+
+    cache.add(student_id, stored, password)
+    return user
+
+# ==========================
+# SHARED LOGIN SESSIONS
+# ==========================
+# A login is a row in the shared session store whose token rides in the
+# page URL (?session=...), so when several app processes run behind a
+# load balancer, a reconnect served by another process stays signed in.
+# A token restores a login only once; the URL then carries a new one.
+def start_login(student_id, full_name, token):
+    st.session_state.logged_in = True
+    st.session_state.student_id = student_id
+    st.session_state.full_name = full_name
+    st.session_state.session_token = token
+    st.query_params["session"] = token
+
+def end_login():
+    st.session_state.logged_in = False
+    st.session_state.student_id = None
+    st.session_state.full_name = None
+    st.session_state.pop("session_token", None)
+    st.query_params.pop("session", None)
+
+def sync_login():
+    """
+    Keep this session's login in step with the session store: restore it
+    from the URL token in a new session (which rotates the token), follow
+    a rotation done by another tab, and drop the login once it was logged
+    out elsewhere or expired (a cached check, cheap on every rerun).
+    """
+    store = get_session_store()
+    token = st.session_state.get("session_token")
+    if token:
+        session = store.get(token)
+        if session is None:
+            end_login()
+        elif session["token"] != token:
+            st.session_state.session_token = session["token"]
+            st.query_params["session"] = session["token"]
+        return
+
+    token = st.query_params.get("session")
+    if not token:
+        return
+    session = store.restore(token)
+    if session is None:
+        st.query_params.pop("session", None)
+        return
+    start_login(session["student_id"], session["full_name"], session["token"])
 
 # ==========================
 # TOP LOGIN BAR
@@ -59,19 +182,18 @@ def top_login_bar():
                     pw = st.text_input("Password", type="password")
 
                     if st.button("Login"):
-                        df = load_users()
-                        user = df[
-                            (df.student_id == sid)
-                            & (df.password == pw)
-                        ]
-
-                        if not user.empty:
-                            st.session_state.logged_in = True
-                            st.session_state.student_id = sid
-                            st.session_state.full_name = user.iloc[0]["full_name"]
-                            st.rerun()
+                        try:
+                            with st.spinner("Signing in..."):
+                                user = check_login(sid, pw)
+                        except KDFBusy:
+                            st.error(SERVER_BUSY)
                         else:
-                            st.error("Wrong ID or password")
+                            if user is not None:
+                                token = get_session_store().create(sid, user["full_name"])
+                                start_login(sid, user["full_name"], token)
+                                st.rerun()
+                            else:
+                                st.error("Wrong ID or password")
 
                 # SIGN UP
                 with tab2:
@@ -80,16 +202,22 @@ def top_login_bar():
                     new_pw = st.text_input("Password", type="password", key="new_pw")
 
                     if st.button("Create account"):
-                        df = load_users()
+                        if not (new_id and new_name and new_pw):
+                            st.warning("Fill all fields")
 
-                        if new_id in df.student_id.values:
+                        elif find_user(new_id) is not None:
                             st.error("ID already exists")
 
-                        elif new_id and new_name and new_pw:
-                            save_user(new_id, new_name, new_pw)
-                            st.success("Account created!")
                         else:
-                            st.warning("Fill all fields")
+                            try:
+                                created = save_user(new_id, new_name, new_pw)
+                            except KDFBusy:
+                                st.error(SERVER_BUSY)
+                            else:
+                                if created:
+                                    st.success("Account created!")
+                                else:
+                                    st.error("ID already exists")
 
         else:
             with st.popover(f"👤 {st.session_state.full_name}"):
@@ -97,33 +225,11 @@ def top_login_bar():
                 st.write(f"ID: {st.session_state.student_id}")
 
                 if st.button("Logout"):
-                    st.session_state.logged_in = False
-                    st.session_state.student_id = None
-                    st.session_state.full_name = None
+                    if st.session_state.get("session_token"):
+                        get_session_store().delete(st.session_state.session_token)
+                    end_login()
                     st.rerun()
 
-# ==========================
-# TASK PLACEHOLDERS
-# ==========================
-def notice_task():
-    st.subheader("📢 Notice Completion")
-    st.info("Notice task goes here")
-
-def leaflet_task():
-    flyer_completion()
-
-def reorder_task():
-    st.subheader("🔀 Reordering Text")
-    st.info("Reordering task goes here")
-
-def info_gap_task():
-    st.subheader("🧩 Information Gap Completion")
-    st.info("Info-gap task goes here")
-
-def reading_task():
-    st.subheader("📘 Reading Comprehension")
-    st.info("Reading task goes here")
-
 # ==========================
 # PAGES
 # ==========================
@@ -146,20 +252,17 @@ def diagnostic_page():
         st.warning("👉 Please sign in to access diagnostic test")
         return
 
-    st.info("Diagnostic test content will be added here.")
+    # Imported on first use: pulls in the flyer task and NumPy
+    from practice.diagnostic import diagnostic_test
+    diagnostic_test()
 
 def practice_page():
     st.header("📝 Practice")
 
     task_type = st.radio(
         "Choose a task type",
-        [
-            "📢 Notice completion",
-            "📄 Leaflet/Flyer completion",
-            "🔀 Reordering text",
-            "🧩 Information gap completion",
-            "📘 Reading comprehension",
-        ]
+        task_labels(),
+        key="task_type"
     )
 
     st.divider()
@@ -168,20 +271,8 @@ def practice_page():
         st.warning("👉 Please sign in to start this task")
         return
 
-    if task_type == "📢 Notice completion":
-        notice_task()
-
-    elif task_type == "📄 Leaflet/Flyer completion":
-        leaflet_task()
-
-    elif task_type == "🔀 Reordering text":
-        reorder_task()
-
-    elif task_type == "🧩 Information gap completion":
-        info_gap_task()
-
-    elif task_type == "📘 Reading comprehension":
-        reading_task()
+    # The task's module is imported the first time anyone picks it
+    run_task(task_key(task_type))
 
 def progress_page():
     st.header("📊 Progress")
@@ -190,7 +281,52 @@ def progress_page():
         st.warning("Sign in to view progress")
         return
 
-    st.info("Progress analytics here")
+    progress = get_progress_index()
+    summary = progress.summary(st.session_state.student_id)
+
+    if not summary["overall"]:
+        st.info("No attempts yet. Submit a practice passage to see your progress.")
+        return
+
+    overall = summary["overall"][0]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Blanks answered", overall["attempts"])
+    col2.metric("Correct", overall["correct"])
+    col3.metric("Accuracy", f"{overall['accuracy'] * 100:.0f}%")
+
+    st.divider()
+
+    dimension_labels = {"topic": "Topic", "error_type": "Error type"}
+    dimension = st.radio(
+        "Break down by",
+        list(dimension_labels),
+        format_func=dimension_labels.get,
+        horizontal=True
+    )
+
+    # Weakest categories first
+    st.subheader(f"Accuracy by {dimension_labels[dimension].lower()}")
+    st.dataframe(
+        pd.DataFrame([
+            {
+                dimension_labels[dimension]: r["category"],
+                "Answered": r["attempts"],
+                "Correct": r["correct"],
+                "Accuracy (%)": round(r["accuracy"] * 100),
+            }
+            for r in summary[dimension]
+        ]),
+        hide_index=True
+    )
+
+    # Daily accuracy trend per category
+    st.subheader("Trend")
+    trend = progress.trend(st.session_state.student_id, dimension)
+    chart = pd.DataFrame({
+        category: pd.Series({day: correct / attempts * 100 for day, attempts, correct in days})
+        for category, days in trend.items()
+    }).sort_index()
+    st.line_chart(chart, y_label="Accuracy (%)")
 
 def review_page():
     st.header("🔁 Review Mistakes")
@@ -199,38 +335,236 @@ def review_page():
         st.warning("Sign in to review mistakes")
         return
 
-    st.info("Mistake review here")
+    data = load_task("flyer").load_flyer_data()
+    if not data:
+        return
+
+    due_reviews(data)
+
+    mistakes = get_mistake_index()
+    categories = mistakes.categories(st.session_state.student_id, task="flyer")
+
+    st.subheader("Open mistakes")
+    if not categories:
+        st.success("No open mistakes. Wrong answers from practice will show up here.")
+        return
+
+    category = st.selectbox(
+        "Error type",
+        list(categories),
+        format_func=lambda c: f"{c} ({categories[c]})"
+    )
+    limit = st.slider("Show", min_value=5, max_value=50, value=10, step=5)
+
+    for entry in mistakes.unresolved(st.session_state.student_id, category, limit, task="flyer"):
+        blank = data.blank(entry["blank_id"])
+        p_index = data.index_of(entry["passage_id"])
+        if blank is None or p_index is None:
+            # Item no longer in the current bank
+            continue
+        passage = data[p_index]
+
+        with st.expander(f"{passage['topic']} - Blank ({blank['blank']})"):
+            st.text(passage["passage_text"])
+            st.write("Your answer:", entry["chosen"])
+            st.write("Correct answer:", blank["correct_answer"])
+
+            analysis = blank["error_analysis"].get(entry["chosen"])
+            st.write("Error type:", analysis["error_type"] if analysis else blank["error_type"])
+            if entry["wrong_count"] > 1:
+                st.caption(f"Missed {entry['wrong_count']} times")
+
+            # Other blanks of this passage still wrong, whatever their error type
+            others = sorted(
+                data.blank(b)["blank"]
+                for b in mistakes.in_passage(st.session_state.student_id, "flyer", entry["passage_id"])
+                if b != entry["blank_id"] and data.blank(b) is not None
+            )
+            if others:
+                st.caption("Also still wrong in this passage: " + ", ".join(f"({n})" for n in others))
+
+            st.button(
+                "Practice this passage",
+                key=f"review_{entry['task']}_{entry['blank_id']}",
+                on_click=open_flyer_passage,
+                args=(p_index,)
+            )
+
+def due_reviews(data):
+    """Spaced-repetition cards due now: passages to revisit and error types"""
+    st.subheader("🗓 Due for review")
+
+    # This page reviews flyer items; other tasks' cards are not listed here
+    due = get_review_scheduler().due(st.session_state.student_id, task="flyer")
+    if not due:
+        st.info("Nothing due right now. Answered blanks come back here on an SM-2 schedule.")
+        return
+
+    error_types = [c["key"] for c in due if c["kind"] == ERROR_TYPE]
+    if error_types:
+        st.write("Error types to revisit:", ", ".join(error_types))
+
+    # One button per passage, however many of its blanks are due
+    passages = {}
+    for card in due:
+        if card["kind"] != BLANK:
+            continue
+        blank = data.blank(card["key"])
+        if blank is not None:
+            passages.setdefault(blank["passage_id"], []).append(blank["blank"])
+
+    for passage_id, blanks in passages.items():
+        p_index = data.index_of(passage_id)
+        col1, col2 = st.columns([4, 1])
+        col1.write(f"{data[p_index]['topic']} - blanks {', '.join(f'({b})' for b in sorted(blanks))}")
+        col2.button(
+            "Review",
+            key=f"due_flyer_{passage_id}",
+            on_click=open_flyer_passage,
+            args=(p_index,)
+        )
+
+def search_page():
+    st.header("🔎 Item Search")
+
+    if not is_author():
+        st.warning("Item search is for teachers and content authors")
+        return
+
+    # Imported on first use: builds a per-bank-version inverted index
+    from practice.item_bank import bank_files, bank_path, load_item_bank
+    from practice.search import search_index
+
+    banks = {}
+    for name in bank_files():
+        try:
+            banks[name] = load_item_bank(bank_path(name))
+        except (OSError, ValueError):
+            # unreadable or malformed: leave it out of the list
+            continue
+    if not banks:
+        st.warning("No item banks found")
+        return
+
+    name = st.selectbox("Item bank", list(banks), key="search_bank", on_change=reset_search_facets)
+    with profiling.section("search.index"):
+        index = search_index(banks[name])
+
+    query = st.text_input(
+        "Search",
+        key="search_query",
+        placeholder="error:collocation distractor:make/do",
+        help="Words must all match. field:word searches one field (text, topic, option, "
+             "answer, distractor, error); a/b matches either word; colloc* matches a prefix; "
+             "-word excludes."
+    )
+
+    # Facet choices are read before the widgets are drawn, so their counts can follow them
+    topic = st.session_state.get("search_topic", ALL)
+    category = st.session_state.get("search_category", ALL)
+    start = time.perf_counter()
+    with profiling.section("search.query"):
+        result = index.search(
+            query,
+            topic=None if topic == ALL else topic,
+            category=None if category == ALL else category
+        )
+    elapsed = time.perf_counter() - start
+
+    col1, col2 = st.columns(2)
+    with col1:
+        counts = result["topics"]
+        st.selectbox("Topic", [ALL] + sorted(set(counts) | ({topic} - {ALL})), key="search_topic",
+                     format_func=lambda t: t if t == ALL else f"{t} ({counts.get(t, 0)})")
+    with col2:
+        counts_by_category = result["categories"]
+        st.selectbox("Error category", [ALL] + sorted(set(counts_by_category) | ({category} - {ALL})),
+                     key="search_category",
+                     format_func=lambda c: c if c == ALL else f"{c} ({counts_by_category.get(c, 0)})")
+
+    rows = result["rows"]
+    st.caption(f"{len(rows)} blanks in {len(result['passages'])} passages · {elapsed * 1000:.1f} ms")
+
+    bank = banks[name]
+    shown = result["passages"][:SEARCH_PASSAGES]
+    matching = {bank.blanks[row]["id"] for row in index.rows_in(rows, shown)}
+    for p_index in shown:
+        passage = bank[p_index]
+        with st.expander(f"{passage['topic']} - passage {passage['id']}"):
+            st.text(passage["passage_text"])
+            for q in passage["questions"]:
+                if q["id"] not in matching:
+                    continue
+                options = " / ".join(f"**{o}**" if o == q["correct_answer"] else o for o in q["options"])
+                st.markdown(f"({q['blank']}) {options} — {q['error_type'] or 'Uncategorized'}")
+    if len(result["passages"]) > SEARCH_PASSAGES:
+        st.caption(f"Showing the first {SEARCH_PASSAGES} passages; refine the search to see more.")
+
+def reset_search_facets():
+    # Topics and categories differ between banks
+    st.session_state.search_topic = ALL
+    st.session_state.search_category = ALL
+
+def open_flyer_passage(p_index):
+    # Runs before the next rerun, so the navigation widgets can still be set
+    st.session_state.menu = "Practice"
+    st.session_state.task_type = task_label("flyer")
+    st.session_state.flyer_passage_index = p_index
+    st.session_state.flyer_submitted = False
+    # p_index is a row of the current bank version
+    load_task("flyer").unpin_bank()
 
 # ==========================
 # MAIN
 # ==========================
-top_login_bar()
+with profiling.rerun("app"):
+    # Attach progress counters, the mistake index and the review scheduler
+    # before the first attempt is recorded
+    get_progress_index()
+    get_mistake_index()
+    get_review_scheduler()
+    # Reload changed item banks in the background (BANK_WATCH_INTERVAL)
+    watch_item_banks()
+
+    with profiling.section("login_bar"):
+        sync_login()
+        top_login_bar()
+
+    if DEV_MODE:
+        st.sidebar.warning("⚠ DEV MODE ON")
+
+    if PROFILE_MODE:
+        profiling_panel()
+
+    menu = st.sidebar.radio(
+        "Navigation",
+        [
+            "Home",
+            "Diagnostic Test",
+            "Practice",
+            "Progress",
+            "Review Mistakes",
+        ] + (["Item Search"] if is_author() else []),
+        key="menu"
+    )
 
-if DEV_MODE:
-    st.sidebar.warning("⚠ DEV MODE ON")
+    with profiling.section(f"page:{menu}"):
+        if menu == "Home":
+            home_page()
 
-menu = st.sidebar.radio(
-    "Navigation",
-    [
-        "Home",
-        "Diagnostic Test",
-        "Practice",
-        "Progress",
-        "Review Mistakes",
-    ]
-)
+        elif menu == "Diagnostic Test":
+            diagnostic_page()
 
-if menu == "Home":
-    home_page()
+        elif menu == "Practice":
+            practice_page()
 
-elif menu == "Diagnostic Test":
-    diagnostic_page()
+        elif menu == "Progress":
+            progress_page()
 
-elif menu == "Practice":
-    practice_page()
+        elif menu == "Review Mistakes":
+            review_page()
 
-elif menu == "Progress":
-    progress_page()
+        elif menu == "Item Search":
+            search_page()
 
-elif menu == "Review Mistakes":
-    review_page()
+    profiling.note_session_state(st.session_state)
@@ -0,0 +1,84 @@
+"""
+Adaptive selection benchmark.
+
+Builds a synthetic item bank (six blanks per passage), binds an
+AdaptiveEngine to it with an in-memory attempt log, warms the item
+statistics with random attempts and reports select() latency.
+
+Run from the project root:
+    python benchmarks/bench_adaptive.py
+    python benchmarks/bench_adaptive.py --items 50000 200000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from practice.adaptive import AdaptiveEngine  # noqa: E402
+from practice.item_bank import ItemBank  # noqa: E402
+from storage.attempts import AttemptLog, make_event  # noqa: E402
+
+BLANKS_PER_PASSAGE = 6
+
+
+def synthetic_bank(items):
+    passages, blanks = [], []
+    for p in range(items // BLANKS_PER_PASSAGE):
+        ids = [f"{p}_{b}" for b in range(1, BLANKS_PER_PASSAGE + 1)]
+        passages.append({"id": str(p), "topic": f"Topic {p % 40}", "passage_text": "...", "blank_ids": ids})
+        for b, blank_id in enumerate(ids, 1):
+            blanks.append({"id": blank_id, "passage_id": str(p), "blank": b,
+                           "options": ["a", "b", "c", "d"], "correct_answer": "a",
+                           "correct_letter": "A", "error_type": "Collocation", "error_analysis": ""})
+    data = {"format": "passage-blank/1", "task": "bench", "passages": passages, "blanks": blanks}
+    return ItemBank("<synthetic>", f"bench-{items}", data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[5_000, 50_000])
+    parser.add_argument("--selects", type=int, default=2_000)
+    parser.add_argument("--warmup-attempts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'bind ms':>8} {'attempts/sec':>13} {'select p50 ms':>14} {'select p99 ms':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for items in args.items:
+            bank = synthetic_bank(items)
+            log = AttemptLog(os.path.join(tmp, f"attempts_{items}.db"), flush_interval=3600, batch_size=10**9)
+            engine = AdaptiveEngine(log, "bench")
+
+            start = time.perf_counter()
+            engine.bind(bank)
+            bind_ms = (time.perf_counter() - start) * 1000
+
+            rng = random.Random(0)
+            events = [
+                make_event(f"s{rng.randrange(500)}", "bench", bank.version, "0", rng.choice(bank.blanks)["id"],
+                           "a", rng.random() < 0.6, None, 1000)
+                for _ in range(args.warmup_attempts)
+            ]
+            start = time.perf_counter()
+            engine.apply(events)
+            attempts_per_sec = len(events) / (time.perf_counter() - start)
+
+            timings = []
+            for i in range(args.selects):
+                start = time.perf_counter()
+                engine.select(f"s{i % 500}", current=i % len(bank))
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p99 = timings[int(len(timings) * 0.99) - 1]
+            print(f"{items:>8} {bind_ms:>8.1f} {attempts_per_sec:>13,.0f} "
+                  f"{statistics.median(timings):>14.3f} {p99:>14.3f}")
+            log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+JSON vs memory-mapped item bank benchmark.
+
+Writes a synthetic passage/blank bank as JSON and as the converter's
+binary .bank, then starts fresh worker processes that each load the
+bank and serve passages from it:
+
+    json      load_item_bank() with no .bank next to the JSON (full parse)
+    mapped    load_item_bank() with the .bank (hashes the JSON, maps the .bank)
+    bank-only open_mapped_bank() on the .bank alone (no JSON read at all)
+
+For one worker it reports the time to the first served passage, the
+time to touch every passage, and the RSS the bank added. Then it keeps
+--workers processes alive that have each served --serve random passages
+(0 = all) and reports their summed PSS / private memory, which is where
+the shared page-cache pages of the mapped file show up.
+
+Run from the project root:
+    python benchmarks/bench_binary_bank.py
+    python benchmarks/bench_binary_bank.py --blanks 60000 --workers 8 --serve 0
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "data", "converted data"))
+
+MODES = ("json", "mapped", "bank-only")
+ERROR_TYPES = ["Collocation", "Word Form", "Word Order", "Adjective Form", "Reduced Clause"]
+WORDS = "students campus design contest green energy award school event rules".split()
+
+
+def synthetic_bank(blanks, per_passage=6):
+    passages, items = [], []
+    for p in range(blanks // per_passage):
+        ids = [f"{p}.{b}" for b in range(1, per_passage + 1)]
+        text = " ".join(WORDS[(p + k) % len(WORDS)] for k in range(150))
+        passages.append({"id": str(p), "topic": f"Topic {p % 40}", "passage_text": text, "blank_ids": ids})
+        for b, blank_id in enumerate(ids):
+            options = [f"{WORDS[(p + b + k) % len(WORDS)]}{k}" for k in range(4)]
+            correct = (p + b) % 4
+            items.append({
+                "id": blank_id, "passage_id": str(p), "blank": b + 1, "options": options,
+                "correct_answer": options[correct], "correct_letter": "ABCD"[correct],
+                "error_type": ERROR_TYPES[b % len(ERROR_TYPES)],
+                "error_analysis": {o: {"error_type": ERROR_TYPES[(b + k) % len(ERROR_TYPES)]}
+                                   for k, o in enumerate(options) if k != correct},
+            })
+    return {"format": "passage-blank/1", "task": "bench", "passages": passages, "blanks": items}
+
+
+# =========================
+# WORKER
+# =========================
+def memory_kb(pid="self"):
+    """RSS, PSS and private memory of a process in kB (smaps_rollup)"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields["Rss"], fields["Pss"], private
+
+
+def worker(mode, path, serve):
+    """Load the bank, serve `serve` random passages (0 = all), report, then wait for stdin to close"""
+    from practice.item_bank import load_item_bank, open_mapped_bank
+
+    rss_before = memory_kb()[0]
+    start = time.perf_counter()
+    if mode == "bank-only":
+        bank = open_mapped_bank(path[:-len(".json")] + ".bank")
+    else:
+        bank = load_item_bank(path)
+    first = bank[0]
+    first_served = time.perf_counter() - start
+
+    picks = range(len(bank)) if not int(serve) else random.sample(range(len(bank)), int(serve))
+    start = time.perf_counter()
+    served = sum(len(bank[i]["questions"]) for i in picks)
+    serve_time = time.perf_counter() - start
+    assert served and first["questions"]
+
+    print(json.dumps({
+        "kind": type(bank).__name__,
+        "first_served": first_served,
+        "serve_time": serve_time,
+        "rss_added_kb": memory_kb()[0] - rss_before,
+    }), flush=True)
+    sys.stdin.read()
+
+
+def start_workers(mode, path, count, serve=0):
+    procs = [
+        subprocess.Popen([sys.executable, __file__, "--worker", mode, path, str(serve)],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(count)
+    ]
+    reports = [json.loads(p.stdout.readline()) for p in procs]
+    return procs, reports
+
+
+def stop_workers(procs):
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+
+
+def drop_page_cache_hint(path):
+    """Ask the kernel to forget a file's pages, so the first open is cold (best effort)"""
+    if hasattr(os, "posix_fadvise"):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+# =========================
+# MAIN
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--blanks", type=int, default=60_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--serve", type=int, default=200,
+                        help="passages each of the --workers processes serves (0 = all)")
+    parser.add_argument("--repeat", type=int, default=3, help="single-worker runs per mode (median)")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "PATH", "SERVE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    from binary_bank import write_binary_bank
+
+    tmp = tempfile.mkdtemp(prefix="bench-bank-")
+    try:
+        json_only = os.path.join(tmp, "json", "bank.json")
+        with_binary = os.path.join(tmp, "binary", "bank.json")
+        for path in (json_only, with_binary):
+            os.makedirs(os.path.dirname(path))
+        with open(json_only, "w", encoding="utf-8") as f:
+            f.write(json.dumps(synthetic_bank(args.blanks), ensure_ascii=False))
+        shutil.copyfile(json_only, with_binary)
+        start = time.perf_counter()
+        binary_path = write_binary_bank(with_binary)
+        build = time.perf_counter() - start
+
+        print(f"{args.blanks} blanks: JSON {os.path.getsize(json_only) / 1e6:.1f} MB, "
+              f".bank {os.path.getsize(binary_path) / 1e6:.1f} MB (built in {build:.2f}s)\n")
+
+        paths = {"json": json_only, "mapped": with_binary, "bank-only": with_binary}
+
+        print(f"{'mode':<10} {'bank':<15} {'first passage':>14} {'all passages':>13} {'RSS added':>10}")
+        for mode in MODES:
+            runs = []
+            for _ in range(args.repeat):
+                for path in (json_only, with_binary, binary_path):
+                    drop_page_cache_hint(path)
+                procs, reports = start_workers(mode, paths[mode], 1)
+                stop_workers(procs)
+                runs.append(reports[0])
+            runs.sort(key=lambda r: r["first_served"])
+            r = runs[len(runs) // 2]
+            print(f"{mode:<10} {r['kind']:<15} {r['first_served'] * 1000:>11.1f} ms "
+                  f"{r['serve_time'] * 1000:>10.1f} ms {r['rss_added_kb'] / 1024:>7.1f} MB")
+
+        served = f"{args.serve} random passages" if args.serve else "every passage"
+        print(f"\n{args.workers} workers alive, each having served {served}:")
+        print(f"{'mode':<10} {'RSS sum':>9} {'PSS sum':>9} {'private sum':>12}")
+        for mode in MODES:
+            procs, _ = start_workers(mode, paths[mode], args.workers, args.serve)
+            try:
+                usage = [memory_kb(p.pid) for p in procs]
+            finally:
+                stop_workers(procs)
+            rss, pss, private = (sum(u[i] for u in usage) / 1024 for i in range(3))
+            print(f"{mode:<10} {rss:>6.0f} MB {pss:>6.0f} MB {private:>9.0f} MB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Diagnostic test simulation.
+
+Simulates students with known ability answering a synthetic calibrated
+bank, once with the adaptive test (practice.cat) and once with a fixed
+form of random items, and reports items used, ability RMSE, how often
+the placement level is right, and the cost of one test step.
+
+Run from the project root:
+    python benchmarks/bench_cat.py
+    python benchmarks/bench_cat.py --items 50000 --students 1000 --fixed 20 40
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from practice.cat import AdaptiveTest, ItemTables, level_of  # noqa: E402
+
+
+class SyntheticBank:
+    def __init__(self, items):
+        self.version = f"bench-{items}"
+        self.blanks = [{"id": str(i)} for i in range(items)]
+
+
+def simulate_cat(tables, difficulty, abilities, rng):
+    estimates, lengths, step_times = [], [], []
+    for theta in abilities:
+        test = AdaptiveTest(tables)
+        while True:
+            start = time.perf_counter()
+            item = test.next_item()
+            if item is None:
+                break
+            correct = rng.random() < 1 / (1 + np.exp(difficulty[item] - theta))
+            test.answer(item, correct)
+            step_times.append(time.perf_counter() - start)
+        estimates.append(test.ability)
+        lengths.append(len(test.used))
+    return np.array(estimates), np.array(lengths), np.array(step_times)
+
+
+def simulate_fixed(tables, difficulty, abilities, length, rng):
+    form = rng.choice(len(difficulty), size=length, replace=False)
+    estimates = []
+    for theta in abilities:
+        test = AdaptiveTest(tables)
+        for item in form:
+            test.answer(item, rng.random() < 1 / (1 + np.exp(difficulty[item] - theta)))
+        estimates.append(test.ability)
+    return np.array(estimates)
+
+
+def report(name, items_used, estimates, abilities):
+    rmse = np.sqrt(np.mean((estimates - abilities) ** 2))
+    placed = np.mean([level_of(e) == level_of(a) for e, a in zip(estimates, abilities)])
+    print(f"{name:<14} {items_used:>11.1f} {rmse:>6.3f} {placed * 100:>12.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--fixed", type=int, nargs="+", default=[20, 40])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    difficulty = rng.normal(0.0, 1.2, args.items)
+    abilities = rng.normal(0.0, 1.0, args.students)
+
+    start = time.perf_counter()
+    tables = ItemTables(SyntheticBank(args.items), difficulty)
+    print(f"tables for {args.items} items built in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    print(f"{'test':<14} {'items used':>11} {'RMSE':>6} {'right level':>13}")
+    estimates, lengths, step_times = simulate_cat(tables, difficulty, abilities, rng)
+    report("adaptive", lengths.mean(), estimates, abilities)
+    for length in args.fixed:
+        report(f"fixed {length}", length, simulate_fixed(tables, difficulty, abilities, length, rng), abilities)
+
+    print(f"\nadaptive step (choose + update): p50 {np.median(step_times) * 1000:.3f} ms, "
+          f"p99 {np.percentile(step_times, 99) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Converter throughput benchmark.
+
+Generates synthetic flyer CSVs (6 blanks per passage) and reports rows/sec
+for the row-by-row converter and the chunked, vectorized streaming mode.
+
+Run from the project root:
+    python benchmarks/bench_converter.py
+    python benchmarks/bench_converter.py --rows 10000 100000 --skip-legacy
+"""
+import argparse
+import csv
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CONVERTER_DIR = os.path.join(ROOT, "data", "converted data")
+CONVERTER_PATH = os.path.join(CONVERTER_DIR, "flyer_converter.py")
+
+BLANKS_PER_PASSAGE = 6
+
+
+def load_converter():
+    """Import flyer_converter.py (its folder name is not a package)"""
+    # the converter imports its sibling modules (binary_bank, error_taxonomy)
+    if CONVERTER_DIR not in sys.path:
+        sys.path.insert(0, CONVERTER_DIR)
+    spec = importlib.util.spec_from_file_location("flyer_converter", CONVERTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_synthetic_csv(path, rows):
+    """Write a flyer CSV with the same columns as data/raw data/flyer_gap-fill.csv"""
+    passage = ("Dear students, we are (1) ______ to announce our contest. " * 12).strip()
+    error_types = ["Adjective Form", "Collocation", "Word Order", "Reduced Clause", "Word Form"]
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Topic", "Question", "Option A", "Option B",
+                         "Option C", "Option D", "Correct Answer", "Error Type"])
+        for i in range(rows):
+            p, b = divmod(i, BLANKS_PER_PASSAGE)
+            writer.writerow([
+                f"{p + 1}.{b + 1}",
+                f"Topic {p % 50}",
+                f"{passage} #{p}",
+                f"excite {i}", f"exciting {i}", f"excitingly {i}", f"excited {i}",
+                "ABCD"[i % 4],
+                error_types[i % len(error_types)],
+            ])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--chunksize", type=int, default=20_000)
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="only time the streaming converter")
+    args = parser.parse_args()
+
+    converter = load_converter()
+
+    print(f"{'rows':>8}  {'mode':<10} {'seconds':>8}  {'rows/sec':>10}  {'output MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            csv_path = os.path.join(tmp, f"flyer_{rows}.csv")
+            out_path = os.path.join(tmp, f"flyer_{rows}.json")
+            write_synthetic_csv(csv_path, rows)
+
+            modes = [("stream", converter.convert_flyer_csv_streaming,
+                      {"chunksize": args.chunksize})]
+            if not args.skip_legacy:
+                modes.insert(0, ("iterrows", converter.convert_flyer_csv_to_json, {}))
+
+            for name, fn, kwargs in modes:
+                seconds = timed(fn, csv_path, out_path, **kwargs)
+                size_mb = os.path.getsize(out_path) / 1e6
+                print(f"{rows:>8}  {name:<10} {seconds:>8.2f}  {rows / seconds:>10,.0f}  {size_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Batch grading benchmark.
+
+Builds a synthetic bank, then grades random submissions with
+practice.grading.AnswerKey: already-encoded (row, option code) arrays,
+and (blank id, option text) pairs as read back from the attempt log.
+Reports blanks/sec for each, against a per-answer Python loop.
+
+Run from the project root:
+    python benchmarks/bench_grading.py
+    python benchmarks/bench_grading.py --blanks 50000 --answers 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from practice.grading import AnswerKey  # noqa: E402
+from practice.item_bank import ItemBank  # noqa: E402
+
+ERROR_TYPES = ["Collocation", "Word Form", "Word Order", "Adjective Form", "Reduced Clause"]
+
+
+def synthetic_bank(blanks):
+    per_passage = 6
+    passages, items = [], []
+    for p in range(blanks // per_passage):
+        ids = [f"{p}.{b}" for b in range(1, per_passage + 1)]
+        passages.append({"id": str(p), "topic": "t", "passage_text": "...", "blank_ids": ids})
+        for b, blank_id in enumerate(ids):
+            options = [f"w{p}_{b}_{k}" for k in range(4)]
+            correct = (p + b) % 4
+            items.append({
+                "id": blank_id, "passage_id": str(p), "blank": b + 1, "options": options,
+                "correct_answer": options[correct], "correct_letter": "ABCD"[correct],
+                "error_type": ERROR_TYPES[b % len(ERROR_TYPES)],
+                "error_analysis": {o: {"error_type": ERROR_TYPES[(b + k) % len(ERROR_TYPES)]}
+                                   for k, o in enumerate(options) if k != correct},
+            })
+    data = {"format": "passage-blank/1", "task": "bench", "passages": passages, "blanks": items}
+    return ItemBank("<synthetic>", f"bench-{blanks}", data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--blanks", type=int, default=50_000)
+    parser.add_argument("--answers", type=int, default=5_000_000)
+    parser.add_argument("--text-answers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    bank = synthetic_bank(args.blanks)
+    start = time.perf_counter()
+    key = AnswerKey(bank)
+    print(f"answer key for {len(bank.blanks)} blanks built in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, len(bank.blanks), args.answers)
+    choices = rng.integers(-1, 4, args.answers)
+
+    start = time.perf_counter()
+    is_correct, category = key.grade(rows, choices)
+    encoded_rate = args.answers / (time.perf_counter() - start)
+
+    n = args.text_answers
+    blank_ids = np.array(key.blank_ids, dtype=object)[rows[:n]]
+    chosen = np.array([bank.blanks[r]["options"][c] if c >= 0 else None
+                       for r, c in zip(rows[:n], choices[:n])], dtype=object)
+    start = time.perf_counter()
+    text_rows, text_codes = key.encode_many(blank_ids, chosen)
+    text_correct, _ = key.grade(text_rows, text_codes)
+    text_rate = n / (time.perf_counter() - start)
+    assert (text_correct == is_correct[:n]).all()
+
+    sample = min(n, 200_000)
+    start = time.perf_counter()
+    loop = [
+        chosen[i] == bank.blank(blank_ids[i])["correct_answer"]
+        for i in range(sample)
+    ]
+    loop_rate = sample / (time.perf_counter() - start)
+    assert (np.array(loop) == is_correct[:sample]).all()
+
+    print(f"{'input':<26} {'blanks/sec':>14}")
+    print(f"{'encoded arrays':<26} {encoded_rate:>14,.0f}")
+    print(f"{'(blank id, text) pairs':<26} {text_rate:>14,.0f}")
+    print(f"{'python loop (text)':<26} {loop_rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
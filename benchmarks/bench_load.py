@@ -0,0 +1,178 @@
+"""
+Concurrent-session load benchmark.
+
+Starts one `streamlit run app.py` worker (DEV_MODE off, on a temporary
+copy of the project with N pre-created accounts) and drives N virtual
+students over the websocket protocol at the same time. Each student
+loads the app, signs in, opens the Leaflet/Flyer task, answers every
+blank of the passage and submits, for a number of rounds.
+
+Reports per-interaction latency percentiles, reruns/sec and the
+worker's peak RSS, and saves them as JSON (with the commit and
+parameters) so runs can be compared:
+
+    python benchmarks/bench_load.py --students 20
+    python benchmarks/bench_load.py --students 20 --compare benchmarks/results/load-<old>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_rerun import TASK, Session, connect, serve  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+PASSWORD = "bench-password"
+INTERACTIONS = ("load", "login", "navigate", "answer", "submit")
+
+
+def create_accounts(students):
+    def prepare(project):
+        # Accounts are created up front so the run measures logins, not signups
+        sys.path.insert(0, project)
+        from storage.passwords import hash_password
+        from storage.users import SQLiteUserStore
+
+        store = SQLiteUserStore(os.path.join(project, "users.db"), legacy_csv=None)
+        password_hash = hash_password(PASSWORD)
+        for i in range(students):
+            store.add(f"student{i}", f"Student {i}", password_hash)
+    return prepare
+
+
+def peak_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+
+async def student(port, index, rounds, think, timings):
+    rng = random.Random(index)
+
+    async def timed(name, interaction):
+        timings[name].append(await interaction)
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+    async with connect(port) as ws:
+        session = Session(ws)
+        await timed("load", session.rerun())
+
+        session.set_text(session.find("text_input", "Student ID")[0], f"student{index}")
+        session.set_text(session.find("text_input", "Password")[0], PASSWORD)
+        await timed("login", session.click(session.find("button", "Login")[0]))
+
+        await timed("navigate", session.set_radio(session.find("radio", "Navigation")[0], "Practice"))
+        await timed("navigate", session.set_radio(session.find("radio", "Choose a task type")[0], TASK))
+
+        for _ in range(rounds):
+            for widget_id in session.find("radio", "Choose answer:"):
+                options = session.widgets[widget_id][2]
+                await timed("answer", session.set_radio(widget_id, rng.choice(options)))
+            await timed("submit", session.click(session.find("button", "📤 Submit Answers")[0]))
+            retry = session.find("button", "🔄 Retry")
+            if retry:
+                await session.click(retry[0])
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize(timings, elapsed, rss):
+    result = {"interactions": {}, "reruns_per_sec": 0.0, "peak_rss_mb": round(rss, 1)}
+    total = 0
+    for name in INTERACTIONS:
+        values = np.array(timings[name]) * 1000
+        total += len(values)
+        if len(values):
+            result["interactions"][name] = {
+                "count": len(values),
+                "p50_ms": round(float(np.percentile(values, 50)), 1),
+                "p95_ms": round(float(np.percentile(values, 95)), 1),
+                "p99_ms": round(float(np.percentile(values, 99)), 1),
+            }
+    result["reruns_per_sec"] = round(total / elapsed, 1)
+    return result
+
+
+def print_report(result, baseline=None):
+    def change(new, old):
+        if not old:
+            return ""
+        return f" ({(new - old) / old * 100:+.0f}%)"
+
+    print(f"{'interaction':<10} {'count':>6} {'p50 ms':>14} {'p95 ms':>14} {'p99 ms':>14}")
+    for name, row in result["interactions"].items():
+        old = (baseline or {}).get("interactions", {}).get(name, {})
+        print(f"{name:<10} {row['count']:>6} "
+              + " ".join(f"{row[k]:>7.1f}{change(row[k], old.get(k)):>7}" for k in ("p50_ms", "p95_ms", "p99_ms")))
+    old = baseline or {}
+    print(f"\nreruns/sec: {result['reruns_per_sec']}{change(result['reruns_per_sec'], old.get('reruns_per_sec'))}")
+    print(f"peak RSS:   {result['peak_rss_mb']} MB{change(result['peak_rss_mb'], old.get('peak_rss_mb'))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=10, help="concurrent virtual students")
+    parser.add_argument("--rounds", type=int, default=3, help="passages each student submits")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between clicks (s)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/load-<commit>-<N>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    timings = {name: [] for name in INTERACTIONS}
+    with serve(ROOT, env={"DEV_MODE": "0"}, prepare=create_accounts(args.students)) as (server, port):
+        async def run_all():
+            await asyncio.gather(*(student(port, i, args.rounds, args.think, timings)
+                                   for i in range(args.students)))
+
+        start = time.perf_counter()
+        asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+        rss = peak_rss_mb(server.pid)
+
+    result = {
+        "benchmark": "load",
+        "commit": git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "params": {"students": args.students, "rounds": args.rounds, "think": args.think},
+        "seconds": round(elapsed, 2),
+        **summarize(timings, elapsed, rss),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != result["params"]:
+            print(f"⚠ Comparing different parameters: {baseline.get('params')} vs {result['params']}")
+
+    print(f"{args.students} students x {args.rounds} passages in {elapsed:.1f} s\n")
+    print_report(result, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{result['commit']}-{args.students}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(json.dumps(result, indent=2))
+    print(f"\n✅ Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Packed-layout parser benchmark.
+
+Generates a synthetic CSV in the partner-school layout used by
+advertisement_gap-fill.csv (six blanks packed into each row, about 1% of
+rows deliberately malformed) and reports passages/sec and blanks/sec.
+
+Run from the project root:
+    python benchmarks/bench_packed.py
+    python benchmarks/bench_packed.py --passages 10000 100000
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "data", "converted data"))
+
+import packed_converter  # noqa: E402
+
+BLANKS_PER_PASSAGE = 6
+
+
+def write_synthetic_csv(path, passages):
+    """Write a packed CSV; every 100th row is missing one answer"""
+    error_types = ["Collocation Error (Preposition)", "Overgeneralization (Word Form)",
+                   "L1 Interference (Adjective Order)", "Tense Inconsistency (Passive Participle)"]
+    text = " ".join(f"Sentence with blank ({b}) ______ in it." for b in range(1, BLANKS_PER_PASSAGE + 1))
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Topic", "Question", "Option_A", "Option_B", "Option_C",
+                         "Option_D", "Correct_Answer", "Error_Type"])
+        for p in range(passages):
+            blanks = range(1, BLANKS_PER_PASSAGE + 1)
+            options = "; ".join(
+                f"({b}): A. word{p}a{b} | B. word{p}b{b} | C. word{p}c{b} | D. word{p}d{b}" for b in blanks
+            )
+            answers = ", ".join(f"{b}:{'ABCD'[(p + b) % 4]}" for b in blanks
+                                if not (p % 100 == 99 and b == BLANKS_PER_PASSAGE))
+            errors = "; ".join(f"({b}): {error_types[(p + b) % len(error_types)]}" for b in blanks)
+            writer.writerow([p + 1, f"Topic {p % 40}", f"{text} #{p}", options, answers, errors])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--passages", type=int, nargs="+", default=[10_000, 50_000])
+    args = parser.parse_args()
+
+    print(f"{'passages':>9} {'blanks':>8} {'seconds':>8} {'passages/sec':>13} {'blanks/sec':>11} {'malformed':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for passages in args.passages:
+            csv_path = os.path.join(tmp, f"packed_{passages}.csv")
+            out_path = os.path.join(tmp, f"packed_{passages}.json")
+            write_synthetic_csv(csv_path, passages)
+
+            report = io.StringIO()
+            start = time.perf_counter()
+            blanks = packed_converter.convert_packed_csv(csv_path, out_path, report=report)
+            seconds = time.perf_counter() - start
+            malformed = report.getvalue().count(" line ")
+
+            print(f"{passages:>9} {blanks:>8} {seconds:>8.2f} {passages / seconds:>13,.0f} "
+                  f"{blanks / seconds:>11,.0f} {malformed:>9}")
+
+
+if __name__ == "__main__":
+    main()
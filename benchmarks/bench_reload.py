@@ -0,0 +1,148 @@
+"""
+Request-path latency while an item bank is replaced.
+
+Writes a synthetic passage/blank bank, loads it, then keeps --threads
+request threads calling load_item_bank() and serving a passage while
+the file is rewritten --swaps times with new content:
+
+    stat    no watcher: every call stats the file, and the first call to
+            see a new version re-reads and parses it while the others
+            wait for the cache lock
+    watch   BankWatcher: calls return the cached bank and the new version
+            is built in the watcher thread and swapped in
+
+Each mode runs in a fresh process. Reports per-call latency percentiles
+and the worst call, how long each new version took to be served, and
+how many requests were served in total.
+
+Run from the project root:
+    python benchmarks/bench_reload.py
+    python benchmarks/bench_reload.py --blanks 60000 --threads 16 --swaps 5
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_binary_bank import synthetic_bank
+
+MODES = ("stat", "watch")
+
+
+def write_bank(path, blanks, revision):
+    bank = synthetic_bank(blanks)
+    bank["passages"][0]["topic"] = f"Revision {revision}"
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(bank, ensure_ascii=False))
+    os.replace(tmp, path)
+
+
+# =========================
+# WORKER
+# =========================
+def worker(mode, path, blanks, threads, swaps, interval):
+    """One process: request threads plus a writer replacing the bank"""
+    import numpy as np
+
+    from practice import item_bank
+
+    if mode == "watch":
+        item_bank.watch_item_banks(interval)
+    bank = item_bank.load_item_bank(path)
+    assert bank[0]["topic"] == "Revision 0"
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+    seen = {}   # revision -> time first served
+
+    def serve(out):
+        k = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            bank = item_bank.load_item_bank(path)
+            bank[k % len(bank)]
+            topic = bank[0]["topic"]
+            out.append(time.perf_counter() - start)
+            if topic not in seen:
+                seen[topic] = time.perf_counter()
+            k += 1
+            # a request does other work between bank lookups
+            time.sleep(0.001)
+
+    pool = [threading.Thread(target=serve, args=(out,)) for out in latencies]
+    for t in pool:
+        t.start()
+
+    served_after = []
+    for revision in range(1, swaps + 1):
+        time.sleep(interval * 3)
+        write_bank(path, blanks, revision)
+        written = time.perf_counter()
+        name = f"Revision {revision}"
+        while name not in seen:
+            time.sleep(0.005)
+        served_after.append(seen[name] - written)
+    stop.set()
+    for t in pool:
+        t.join()
+
+    calls = np.concatenate([np.array(out) for out in latencies]) * 1000
+    print(json.dumps({
+        "calls": len(calls),
+        "p50": float(np.percentile(calls, 50)),
+        "p99": float(np.percentile(calls, 99)),
+        "max": float(calls.max()),
+        "stalled": int((calls > 10).sum()),
+        "served_after": served_after,
+    }), flush=True)
+
+
+# =========================
+# MAIN
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--blanks", type=int, default=30_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--swaps", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=0.5, help="watcher interval in seconds")
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker, args.blanks, args.threads, args.swaps, args.interval)
+        return
+
+    tmp = tempfile.mkdtemp(prefix="bench-reload-")
+    try:
+        print(f"{args.blanks} blanks, {args.threads} request threads, {args.swaps} new versions\n")
+        print(f"{'mode':<6} {'calls':>7} {'p50':>9} {'p99':>9} {'worst':>10} {'calls >10 ms':>13} {'new version served after':>25}")
+        for mode in MODES:
+            path = os.path.join(tmp, mode, "bank.json")
+            os.makedirs(os.path.dirname(path))
+            write_bank(path, args.blanks, 0)
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, path, "--blanks", str(args.blanks),
+                 "--threads", str(args.threads), "--swaps", str(args.swaps), "--interval", str(args.interval)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            after = ", ".join(f"{s:.2f}s" for s in r["served_after"])
+            print(f"{mode:<6} {r['calls']:>7} {r['p50']:>6.3f} ms {r['p99']:>6.3f} ms "
+                  f"{r['max']:>7.1f} ms {r['stalled']:>13} {after:>25}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
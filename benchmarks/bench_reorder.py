@@ -0,0 +1,51 @@
+"""
+Reordering re-score benchmark.
+
+Scores a synthetic cohort of random submissions with both rubrics,
+once with the batch functions (practice.order_scoring.score_orders) and
+once row by row (score_order), and reports submissions/sec.
+
+Run from the project root:
+    python benchmarks/bench_reorder.py
+    python benchmarks/bench_reorder.py --submissions 1000000 --segments 6 12
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from practice.order_scoring import RUBRICS, score_order, score_orders  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=200_000)
+    parser.add_argument("--segments", type=int, nargs="+", default=[6, 12, 30])
+    parser.add_argument("--loop-sample", type=int, default=20_000, help="rows timed in the per-row loop")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'segments':>8} {'rubric':>8} {'batch subs/sec':>15} {'loop subs/sec':>14} {'speedup':>8}")
+    for n in args.segments:
+        orders = rng.permuted(np.tile(np.arange(n), (args.submissions, 1)), axis=1)
+        sample = [list(map(int, row)) for row in orders[:args.loop_sample]]
+        for rubric in RUBRICS:
+            start = time.perf_counter()
+            scores = score_orders(orders, rubric)
+            batch = len(orders) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            expected = [score_order(o, rubric) for o in sample]
+            loop = len(sample) / (time.perf_counter() - start)
+
+            assert np.allclose(scores[:len(sample)], expected)
+            print(f"{n:>8} {rubric:>8} {batch:>15,.0f} {loop:>14,.0f} {batch / loop:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
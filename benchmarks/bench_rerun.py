@@ -0,0 +1,197 @@
+"""
+Per-interaction rerun benchmark.
+
+Starts `streamlit run app.py` on a copy of a project tree and drives it
+over the app's websocket protocol the way a browser does: open the
+Leaflet/Flyer task, then change blank answers and submit/retry. A widget
+inside an st.fragment sends the fragment's id, so only that fragment
+reruns. Reports the time from sending each interaction to the server's
+"script finished" message, and the server's CPU time per interaction
+(read from /proc, so Linux only).
+
+Run from the project root (compare against an older checkout with --project):
+    python benchmarks/bench_rerun.py
+    python benchmarks/bench_rerun.py --project /tmp/before --clicks 200
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+TASK = "📄 Leaflet/Flyer completion"
+
+
+def cpu_seconds(pid):
+    """utime + stime of a process"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(project, env=None, prepare=None):
+    """
+    Run `streamlit run app.py` on a temporary copy of `project`; yields
+    the server process and its port. prepare(copy_dir) runs before start.
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "app")
+        shutil.copytree(project, copy, ignore=shutil.ignore_patterns(
+            ".git", "__pycache__", "*.db", "*.db-*", "results"))
+        if prepare:
+            prepare(copy)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+             "--server.port", str(port), "--server.enableXsrfProtection", "false",
+             "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+            cwd=copy, env={**os.environ, **(env or {})},
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                    break
+                except OSError:
+                    time.sleep(0.2)
+            yield server, port
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def connect(port):
+    return websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream",
+                              subprotocols=["streamlit"], max_size=None)
+
+
+class Session:
+    """Minimal browser stand-in: keeps widget states, sends reruns, collects widgets"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.states = {}       # widget id -> WidgetState
+        self.widgets = {}      # widget id -> (kind, label, options, fragment_id)
+        self.page_hash = ""
+
+    async def rerun(self, fragment_id=""):
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.main_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._collect(fwd.delta)
+            elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                # (st.rerun() inside the script starts another run: wait for that one too)
+                elapsed = time.perf_counter() - start
+                # Buttons are only "clicked" for one run
+                for widget_id, state in list(self.states.items()):
+                    if state.WhichOneof("value") == "trigger_value":
+                        del self.states[widget_id]
+                return elapsed
+
+    def _collect(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind)
+        if getattr(proto, "id", ""):
+            options = list(getattr(proto, "options", []))
+            self.widgets[proto.id] = (kind, getattr(proto, "label", ""), options, delta.fragment_id)
+
+    def find(self, kind, label):
+        return [w for w, (k, l, _, _) in self.widgets.items() if k == kind and l == label]
+
+    def set_text(self, widget_id, value):
+        """Type into a text input (sent with the next rerun, like a browser)"""
+        self.states[widget_id] = WidgetState(id=widget_id, string_value=value)
+
+    async def set_radio(self, widget_id, value):
+        state = WidgetState(id=widget_id, string_value=value)
+        self.states[widget_id] = state
+        return await self.rerun(self.widgets[widget_id][3])
+
+    async def click(self, widget_id):
+        self.states[widget_id] = WidgetState(id=widget_id, trigger_value=True)
+        return await self.rerun(self.widgets[widget_id][3])
+
+
+async def measure(timings, name, pid, interaction):
+    cpu = cpu_seconds(pid)
+    wall = await interaction
+    timings.setdefault(name, []).append((wall, cpu_seconds(pid) - cpu))
+
+
+async def drive(port, pid, clicks):
+    async with connect(port) as ws:
+        session = Session(ws)
+        await session.rerun()
+        await session.set_radio(session.find("radio", "Navigation")[0], "Practice")
+        await session.set_radio(session.find("radio", "Choose a task type")[0], TASK)
+
+        blanks = session.find("radio", "Choose answer:")
+        timings = {}
+        for i in range(clicks):
+            widget_id = blanks[i % len(blanks)]
+            options = session.widgets[widget_id][2]
+            await measure(timings, "answer change", pid,
+                          session.set_radio(widget_id, options[i % len(options)]))
+            if i % len(blanks) == len(blanks) - 1:
+                await measure(timings, "submit", pid,
+                              session.click(session.find("button", "📤 Submit Answers")[0]))
+                await measure(timings, "retry", pid,
+                              session.click(session.find("button", "🔄 Retry")[0]))
+                for widget_id in blanks:
+                    session.states.pop(widget_id, None)
+        return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--project", default=ROOT, help="project tree containing app.py")
+    parser.add_argument("--clicks", type=int, default=120)
+    args = parser.parse_args()
+
+    with serve(args.project) as (server, port):
+        timings = asyncio.run(drive(port, server.pid, args.clicks))
+
+    print(f"{'interaction':<14} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'server CPU ms':>14}")
+    for name, samples in timings.items():
+        walls = sorted(wall for wall, _ in samples)
+        p95 = walls[max(int(len(walls) * 0.95) - 1, 0)]
+        cpu = statistics.mean(cpu for _, cpu in samples)
+        print(f"{name:<14} {len(walls):>6} {statistics.median(walls) * 1000:>8.1f} "
+              f"{p95 * 1000:>8.1f} {cpu * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
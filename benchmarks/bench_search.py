@@ -0,0 +1,138 @@
+"""
+Item-bank search benchmark.
+
+Builds a synthetic bank (passages of generated text, four options per
+blank, taxonomy error labels), times building practice.search.SearchIndex,
+then times a set of authoring queries with facet counts against a
+straight Python scan over the same bank.
+
+Run from the project root:
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --blanks 120000 --repeat 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from practice.item_bank import ItemBank  # noqa: E402
+from practice.search import SearchIndex, words  # noqa: E402
+
+TOPICS = ["Sustainable Campus", "Global Internship", "Underwater Expeditions", "Smart Home Systems",
+          "Local Schools", "Science Fair", "City Library", "Sports Day", "Art Exhibition", "Food Festival"]
+LABELS = [("Collocation", "Preposition"), ("Collocation", "Make vs Do"), ("Collocation", None),
+          ("Word Form", None), ("Word Order", None), ("Overgeneralization", "Verb Patterns"),
+          ("L1 Interference", "Adjective Order"), ("Tense Inconsistency", "Passive Participle")]
+OPTION_WORDS = ["make", "do", "take", "have", "on", "in", "at", "for", "excited", "exciting",
+                "decide", "decision", "careful", "carefully", "achieve", "achievement"]
+TEXT_WORDS = ("students school event join contest award team project energy green online "
+              "community volunteer register deadline museum ocean research design future").split()
+
+QUERIES = [
+    "error:collocation distractor:make/do",
+    "colloc*",
+    "topic:campus text:energy",
+    "answer:excited -error:collocation",
+    "option:achiev* error:form",
+]
+
+
+def synthetic_bank(blanks, per_passage=6, seed=0):
+    rng = random.Random(seed)
+    taxonomy = [{"label": f"{c} ({s})" if s else c, "category": c, "subcategory": s} for c, s in LABELS]
+    passages, items = [], []
+    for p in range(blanks // per_passage):
+        ids = [f"{p}.{b}" for b in range(1, per_passage + 1)]
+        text = " ".join(rng.choice(TEXT_WORDS) for _ in range(120))
+        passages.append({"id": str(p), "topic": TOPICS[p % len(TOPICS)], "passage_text": text, "blank_ids": ids})
+        for b, blank_id in enumerate(ids):
+            options = rng.sample(OPTION_WORDS, 4)
+            correct = rng.randrange(4)
+            code = rng.randrange(len(taxonomy))
+            label = taxonomy[code]["label"]
+            items.append({
+                "id": blank_id, "passage_id": str(p), "blank": b + 1, "options": options,
+                "correct_answer": options[correct], "correct_letter": "ABCD"[correct],
+                "error_type": label, "error_code": code,
+                "error_analysis": {o: {"error_type": label, "error_code": code}
+                                   for k, o in enumerate(options) if k != correct},
+            })
+    data = {"format": "passage-blank/1", "task": "bench", "error_taxonomy": taxonomy,
+            "passages": passages, "blanks": items}
+    return ItemBank("<synthetic>", f"bench-{blanks}", data)
+
+
+def scan(bank, index, query):
+    """The same query answered by re-reading every blank (no index)"""
+    rows = []
+    for i, b in enumerate(bank.blanks):
+        passage = bank[index.passage_of[i]]
+        fields = {
+            "text": set(words(passage["passage_text"])),
+            "topic": set(words(passage["topic"])),
+            "option": {w for o in b["options"] for w in words(o)},
+            "answer": set(words(b["correct_answer"])),
+            "distractor": {w for o in b["options"] if o != b["correct_answer"] for w in words(o)},
+            "error": set(words(b["error_type"])) | {w for e in b["error_analysis"].values()
+                                                    for w in words(e["error_type"])},
+        }
+        ok = True
+        for negated, names, alternatives in index.parse(query):
+            hit = any(
+                (any(w.startswith(a[:-1]) for w in fields[f]) if a.endswith("*") else a in fields[f])
+                for f in names for a in alternatives
+            )
+            if hit == negated:
+                ok = False
+                break
+        if ok:
+            rows.append(i)
+    topics = {}
+    for i in rows:
+        topics[index.topics[index.topic_of[i]]] = topics.get(index.topics[index.topic_of[i]], 0) + 1
+    return np.array(rows), topics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--blanks", type=int, default=60_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    bank = synthetic_bank(args.blanks)
+    start = time.perf_counter()
+    index = SearchIndex(bank)
+    build = time.perf_counter() - start
+    print(f"{len(bank.blanks)} blanks / {len(bank)} passages: index built in {build:.2f}s\n")
+
+    print(f"{'query':<40} {'hits':>7} {'p50':>9} {'p95':>9} {'scan':>9}")
+    for query in QUERIES:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = index.search(query)
+            times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rows, topics = scan(bank, index, query)
+        scanned = time.perf_counter() - start
+        assert np.array_equal(rows, result["rows"]) and topics == result["topics"], query
+
+        p50, p95 = np.percentile(times, [50, 95]) * 1000
+        print(f"{query:<40} {len(result['rows']):>7} {p50:>6.2f} ms {p95:>6.2f} ms {scanned * 1000:>6.0f} ms")
+
+    topic = index.topics[0]
+    start = time.perf_counter()
+    result = index.search("error:collocation", topic=topic)
+    print(f"\nwith topic facet '{topic}': {len(result['rows'])} hits in "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
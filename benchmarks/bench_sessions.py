@@ -0,0 +1,130 @@
+"""
+Shared session store under several app processes.
+
+Starts --workers processes on one sessions database. Each plays
+--sessions signed-in students doing --reruns reruns, a round every
+--gap seconds: every rerun checks the login (SessionStore.get, as
+app.sync_login does) and every --save-every-th rerun saves the
+in-progress answers (save_state, as an answered blank does). Runs once
+with the read-through cache disabled and once with the default
+CACHE_TTL, and reports per-call latency percentiles and the session
+checks that reached SQLite.
+
+Run from the project root:
+    python benchmarks/bench_sessions.py
+    python benchmarks/bench_sessions.py --workers 8 --sessions 50 --reruns 400
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+
+MODES = {"uncached": 0.0, "cached": None}
+
+
+# =========================
+# WORKER
+# =========================
+def worker(path, cache_ttl, sessions, reruns, save_every, gap):
+    import numpy as np
+
+    from storage.sessions import CACHE_TTL, SessionStore
+
+    store = SessionStore(path, cache_ttl=CACHE_TTL if cache_ttl == "default" else float(cache_ttl))
+    tokens = [store.create(f"student{os.getpid()}-{i}", "Bench Student") for i in range(sessions)]
+    answers = {t: {} for t in tokens}
+
+    queries = 0
+    original_conn = store._conn
+
+    def counting_conn():
+        nonlocal queries
+        queries += 1
+        return original_conn()
+
+    gets, saves = [], []
+    start_all = time.perf_counter()
+    for k in range(reruns):
+        for i, token in enumerate(tokens):
+            store._conn = counting_conn
+            start = time.perf_counter()
+            assert store.get(token) is not None
+            gets.append(time.perf_counter() - start)
+            store._conn = original_conn
+
+            if (k + i) % save_every == 0:
+                answers[token][f"p{k % 40}_b{i % 6 + 1}"] = f"option {k}"
+                start = time.perf_counter()
+                store.save_state(token, "flyer", {"answers": answers[token], "passage_id": str(k % 40)})
+                saves.append(time.perf_counter() - start)
+        time.sleep(gap)
+    elapsed = time.perf_counter() - start_all
+
+    gets = np.array(gets) * 1000
+    saves = np.array(saves) * 1000
+    print(json.dumps({
+        "gets": len(gets), "get_p50": float(np.percentile(gets, 50)), "get_p99": float(np.percentile(gets, 99)),
+        "queries": queries,
+        "saves": len(saves), "save_p50": float(np.percentile(saves, 50)), "save_p99": float(np.percentile(saves, 99)),
+        "elapsed": elapsed,
+    }), flush=True)
+
+
+# =========================
+# MAIN
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=25, help="signed-in sessions per worker")
+    parser.add_argument("--reruns", type=int, default=200, help="reruns per session")
+    parser.add_argument("--save-every", type=int, default=4, help="reruns per saved answer")
+    parser.add_argument("--gap", type=float, default=0.05, help="seconds between rounds of reruns")
+    parser.add_argument("--worker", nargs=2, metavar=("PATH", "CACHE_TTL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker, args.sessions, args.reruns, args.save_every, args.gap)
+        return
+
+    tmp = tempfile.mkdtemp(prefix="bench-sessions-")
+    try:
+        print(f"{args.workers} processes x {args.sessions} sessions x {args.reruns} reruns "
+              f"({args.gap * 1000:.0f} ms apart), a save every {args.save_every} reruns\n")
+        print(f"{'mode':<9} {'check p50':>10} {'check p99':>10} {'checks hitting SQLite':>22} "
+              f"{'save p50':>10} {'save p99':>10} {'wall':>7}")
+        for mode, cache_ttl in MODES.items():
+            path = os.path.join(tmp, f"{mode}.db")
+            start = time.perf_counter()
+            procs = [
+                subprocess.Popen(
+                    [sys.executable, __file__, "--worker", path, "default" if cache_ttl is None else str(cache_ttl),
+                     "--sessions", str(args.sessions), "--reruns", str(args.reruns),
+                     "--save-every", str(args.save_every), "--gap", str(args.gap)],
+                    stdout=subprocess.PIPE, text=True,
+                )
+                for _ in range(args.workers)
+            ]
+            reports = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+            wall = time.perf_counter() - start
+
+            gets = sum(r["gets"] for r in reports)
+            queries = sum(r["queries"] for r in reports)
+            worst = lambda key: max(r[key] for r in reports)
+            print(f"{mode:<9} {worst('get_p50'):>7.3f} ms {worst('get_p99'):>7.3f} ms "
+                  f"{queries:>12} / {gets:<7} {worst('save_p50'):>7.3f} ms {worst('save_p99'):>7.3f} ms "
+                  f"{wall:>5.1f} s")
+        print("\n(p50 / p99: the slowest worker's)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
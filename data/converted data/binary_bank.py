@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+# =========================
+# FORMAT
+# =========================
+# flyer_gap-fill.json -> flyer_gap-fill.bank
+#
+#   "ITEMBANK"                8 bytes
+#   header length             uint32, little endian
+#   header                    JSON: format, task, source_sha256, counts and
+#                             name -> [offset, dtype, count] of every section
+#   sections                  flat little-endian arrays, 8-byte aligned
+#
+# Every string (ids, topics, passage texts, options, categories) is stored
+# once in the "strings" blob and referenced by its number; string k is
+# strings[string_offsets[k]:string_offsets[k + 1]], -1 means None.
+# Variable-length lists (a passage's blanks, a blank's options) are
+# ranges of a flat array given by a start array with one extra entry.
+# Error labels are category numbers; for banks with an error_taxonomy the
+# numbers are the taxonomy codes and the table itself is in the header.
+# The app maps the file read-only (practice.item_bank.MappedItemBank), so
+# worker processes share its page-cache pages and nothing is parsed up front.
+BINARY_FORMAT = "passage-blank-bin/1"
+MAGIC = b"ITEMBANK"
+ALIGN = 8
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+BLANK_FIELDS = {"id", "passage_id", "blank", "options", "correct_answer",
+                "correct_letter", "error_type", "error_code", "error_analysis"}
+PASSAGE_FIELDS = {"id", "topic", "passage_text", "blank_ids"}
+
+
+def binary_path_for(json_path):
+    root, _ = os.path.splitext(json_path)
+    return root + ".bank"
+
+
+class StringTable:
+    """Deduplicated UTF-8 strings, numbered in first-seen order"""
+
+    def __init__(self):
+        self.number = {}
+        self.blob = bytearray()
+        self.offsets = [0]
+
+    def add(self, value):
+        if value is None:
+            return -1
+        value = str(value)
+        k = self.number.get(value)
+        if k is None:
+            k = self.number[value] = len(self.offsets) - 1
+            self.blob += value.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return k
+
+
+def _check_fields(kind, record, allowed):
+    extra = set(record) - allowed
+    if extra:
+        raise ValueError(f"{kind} {record.get('id')} has fields the binary format does not store: "
+                         f"{sorted(extra)}")
+
+
+def build_sections(bank):
+    """name -> NumPy array of every section of a passage/blank bank dict"""
+    if bank.get("format") != "passage-blank/1":
+        raise ValueError("only passage/blank item banks have a binary form")
+
+    strings = StringTable()
+    taxonomy = bank.get("error_taxonomy")
+    categories = {entry["label"]: code for code, entry in enumerate(taxonomy or ())}
+
+    def category(name):
+        if name is None:
+            return -1
+        return categories.setdefault(name, len(categories))
+
+    def check_code(blank_id, record):
+        # error_code must be the taxonomy code of error_type (both present or both absent)
+        expected = category(record.get("error_type"))
+        code = record.get("error_code")
+        if taxonomy is not None and (expected if expected >= 0 else None) != code:
+            raise ValueError(f"blank {blank_id}: error_code does not match error_type")
+        if taxonomy is None and "error_code" in record:
+            raise ValueError(f"blank {blank_id}: error_code without an error_taxonomy")
+
+    blanks = bank["blanks"]
+    passages = bank["passages"]
+    passage_row = {p["id"]: i for i, p in enumerate(passages)}
+    blank_row = {b["id"]: i for i, b in enumerate(blanks)}
+
+    blank_id, blank_passage, blank_number, blank_correct, blank_error_type = [], [], [], [], []
+    options_start, option_text, option_category = [0], [], []
+    for b in blanks:
+        _check_fields("blank", b, BLANK_FIELDS)
+        options = [str(o) for o in b["options"]]
+        if b["correct_answer"] not in options:
+            raise ValueError(f"blank {b['id']}: correct answer is not one of its options")
+        correct = options.index(b["correct_answer"])
+        if b.get("correct_letter") not in (None, LETTERS[correct]):
+            raise ValueError(f"blank {b['id']}: correct_letter does not match correct_answer")
+
+        analysis = b.get("error_analysis") or {}
+        for option, entry in analysis.items():
+            if option not in options or set(entry) - {"error_code"} != {"error_type"}:
+                raise ValueError(f"blank {b['id']}: error_analysis cannot be stored in the binary format")
+            check_code(b["id"], entry)
+        check_code(b["id"], b)
+
+        blank_id.append(strings.add(b["id"]))
+        blank_passage.append(passage_row[b["passage_id"]])
+        blank_number.append(b["blank"])
+        blank_correct.append(correct)
+        blank_error_type.append(category(b.get("error_type")))
+        seen = set()
+        for option in options:
+            option_text.append(strings.add(option))
+            # error_analysis is keyed by option text: only the first copy carries it
+            entry = analysis.get(option) if option not in seen else None
+            seen.add(option)
+            option_category.append(category(entry["error_type"]) if entry is not None else -2)
+        options_start.append(len(option_text))
+
+    passage_id, passage_topic, passage_text = [], [], []
+    blanks_start, blank_index = [0], []
+    for p in passages:
+        _check_fields("passage", p, PASSAGE_FIELDS)
+        passage_id.append(strings.add(p["id"]))
+        passage_topic.append(strings.add(p.get("topic")))
+        passage_text.append(strings.add(p.get("passage_text")))
+        blank_index.extend(blank_row[b] for b in p["blank_ids"])
+        blanks_start.append(len(blank_index))
+
+    category_name = [strings.add(name) for name in categories]
+
+    if len(strings.blob) >= 2 ** 32:
+        raise ValueError("string blob is larger than 4 GB")
+
+    return {
+        "strings": np.frombuffer(bytes(strings.blob), dtype=np.uint8),
+        "string_offsets": np.array(strings.offsets, dtype="<u4"),
+        "passage_id": np.array(passage_id, dtype="<i4"),
+        "passage_topic": np.array(passage_topic, dtype="<i4"),
+        "passage_text": np.array(passage_text, dtype="<i4"),
+        "passage_blanks_start": np.array(blanks_start, dtype="<i4"),
+        "passage_blanks": np.array(blank_index, dtype="<i4"),
+        "blank_id": np.array(blank_id, dtype="<i4"),
+        "blank_passage": np.array(blank_passage, dtype="<i4"),
+        "blank_number": np.array(blank_number, dtype="<i4"),
+        "blank_correct": np.array(blank_correct, dtype="<i2"),
+        "blank_error_type": np.array(blank_error_type, dtype="<i2"),
+        "blank_options_start": np.array(options_start, dtype="<i4"),
+        "option_text": np.array(option_text, dtype="<i4"),
+        # category number; -1 = error_analysis entry without a type, -2 = no entry
+        "option_category": np.array(option_category, dtype="<i2"),
+        "category_name": np.array(category_name, dtype="<i4"),
+    }
+
+
+def _padding(size):
+    return b"\0" * (-size % ALIGN)
+
+
+def write_binary_bank(json_path, output_path=None):
+    """
+    Write the binary form of a converted JSON bank next to it (atomically).
+    The header records the JSON file's sha256, so the app only uses the
+    binary file while it matches the JSON it was built from.
+    Returns the output path; raises ValueError for banks it cannot store.
+    """
+    output_path = output_path or binary_path_for(json_path)
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    bank = json.loads(raw.decode("utf-8"))
+    sections = build_sections(bank)
+
+    # Section offsets depend on the header length, which depends on the
+    # offsets: repeat the layout until the header length stops changing.
+    header = {
+        "format": BINARY_FORMAT,
+        "task": bank.get("task"),
+        "source_sha256": hashlib.sha256(raw).hexdigest(),
+        "source_size": len(raw),
+        "passages": len(bank["passages"]),
+        "blanks": len(bank["blanks"]),
+        "error_taxonomy": bank.get("error_taxonomy"),
+        "sections": {name: [0, array.dtype.str, len(array)] for name, array in sections.items()},
+    }
+    encoded = b""
+    while True:
+        offset = len(MAGIC) + 4 + len(encoded)
+        offset += -offset % ALIGN
+        for name, array in sections.items():
+            header["sections"][name][0] = offset
+            offset += array.nbytes
+            offset += -offset % ALIGN
+        laid_out = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        settled = len(laid_out) == len(encoded)
+        encoded = laid_out
+        if settled:
+            break
+
+    tmp_path = output_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+            f.write(_padding(f.tell()))
+            for name, array in sections.items():
+                assert f.tell() == header["sections"][name][0]
+                f.write(array.tobytes())
+                f.write(_padding(f.tell()))
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def try_write_binary_bank(json_path):
+    """write_binary_bank for the converters: report instead of failing the conversion"""
+    try:
+        path = write_binary_bank(json_path)
+    except (ValueError, KeyError) as e:
+        print(f"⚠️ No binary bank for {json_path}: {e}")
+        return None
+    print(f"📦 Binary bank saved to: {path}")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mappable binary form of converted item banks")
+    parser.add_argument("banks", nargs="+", help="converted JSON banks")
+    args = parser.parse_args()
+
+    for json_path in args.banks:
+        try_write_binary_bank(json_path)
@@ -0,0 +1,186 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import binary_bank
+import flyer_converter
+import packed_converter
+
+RAW_DIR = os.path.join("data", "raw data")
+OUTPUT_DIR = os.path.join("data", "converted data")
+
+FLAT_COLUMNS = {'ID', 'Topic', 'Question', *flyer_converter.OPTION_COLUMNS,
+                'Correct Answer', 'Error Type'}
+
+
+# =========================
+# DISCOVERY
+# =========================
+def discover_csvs(raw_dir=RAW_DIR):
+    """Every .csv under raw_dir (recursive), in a stable order"""
+    found = []
+    for folder, _, files in os.walk(raw_dir):
+        found.extend(os.path.join(folder, name) for name in files if name.lower().endswith(".csv"))
+    return sorted(found)
+
+
+def bank_key(csv_path):
+    """
+    Item bank a CSV belongs to: its file name up to the first dot.
+    "flyer_gap-fill.csv" and "flyer_gap-fill.spring.csv" both go to
+    flyer_gap-fill.json; the task type is the part before the first "_".
+    """
+    return os.path.basename(csv_path).split('.')[0]
+
+
+def task_of(key):
+    return key.split('_')[0]
+
+
+def detect_layout(csv_path):
+    """Name of the converter that understands this CSV, or None"""
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = set(next(reader, []))
+        first_row = next((row for row in reader if any(c.strip() for c in row)), [])
+
+    if packed_converter.is_packed_row(first_row):
+        return "packed"
+    if FLAT_COLUMNS <= header:
+        return "flat"
+    return None
+
+
+CONVERTERS = {
+    "flat": flyer_converter.convert_flyer_csv_streaming,
+    "packed": packed_converter.convert_packed_csv,
+}
+
+
+# =========================
+# WORKER
+# =========================
+def convert_one(csv_path, part_path, task):
+    """Convert one CSV to a partial bank file (runs in a worker process)"""
+    start = time.perf_counter()
+    layout = detect_layout(csv_path)
+    if layout is None:
+        raise ValueError("unrecognised column layout")
+    rows = CONVERTERS[layout](csv_path, part_path, task=task)
+    return layout, rows, time.perf_counter() - start
+
+
+# =========================
+# MERGE
+# =========================
+def merge_parts(part_paths, output_path, task):
+    """Concatenate several partial banks of one task into a single bank"""
+    passages, blanks = [], []
+    seen = set()
+    for part_path in part_paths:
+        with open(part_path, 'r', encoding='utf-8') as f:
+            part = json.load(f)
+        for blank in part["blanks"]:
+            if blank["id"] in seen:
+                raise ValueError(f"blank id {blank['id']} appears in more than one CSV")
+            seen.add(blank["id"])
+        passages.extend(part["passages"])
+        blanks.extend(part["blanks"])
+
+    flyer_converter.write_json_atomic(
+        flyer_converter.build_item_bank(task, passages, blanks), output_path
+    )
+
+
+def bulk_import(raw_dir=RAW_DIR, output_dir=OUTPUT_DIR, workers=None, binary=True):
+    """
+    Convert every raw CSV in a process pool, one file per worker, and
+    write one item bank per bank key. A bank is only replaced when all of
+    its CSVs converted successfully; with `binary`, its memory-mappable
+    .bank is rebuilt right after.
+    Returns a list of per-file result dicts for the summary.
+    """
+    csv_paths = discover_csvs(raw_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Parts live next to the outputs so os.replace stays on one filesystem
+    part_dir = tempfile.mkdtemp(prefix=".bulk-", dir=output_dir)
+    results = []
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for i, csv_path in enumerate(csv_paths):
+                key = bank_key(csv_path)
+                part_path = os.path.join(part_dir, f"{i}.json")
+                future = pool.submit(convert_one, csv_path, part_path, task_of(key))
+                futures[future] = {"file": csv_path, "key": key, "part": part_path}
+
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    result["layout"], result["rows"], result["seconds"] = future.result()
+                    result["error"] = None
+                except Exception as e:
+                    result.update(layout=None, rows=0, seconds=0.0, error=str(e))
+                results.append(result)
+
+        results.sort(key=lambda r: r["file"])
+
+        by_key = {}
+        for result in results:
+            by_key.setdefault(result["key"], []).append(result)
+
+        for key, group in by_key.items():
+            if any(r["error"] for r in group):
+                continue
+            output_path = os.path.join(output_dir, f"{key}.json")
+            if len(group) == 1:
+                os.replace(group[0]["part"], output_path)
+            else:
+                try:
+                    merge_parts([r["part"] for r in group], output_path, task_of(key))
+                except ValueError as e:
+                    for r in group:
+                        r["error"] = str(e)
+                    continue
+            if binary:
+                binary_bank.try_write_binary_bank(output_path)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    return results
+
+
+def print_summary(results, wall_seconds):
+    print(f"{'file':<45} {'layout':<8} {'rows':>8} {'seconds':>8}  status")
+    for r in results:
+        status = f"❌ {r['error']}" if r["error"] else f"✅ {r['key']}.json"
+        print(f"{os.path.relpath(r['file']):<45} {r['layout'] or '-':<8} "
+              f"{r['rows']:>8} {r['seconds']:>8.2f}  {status}")
+
+    cpu_seconds = sum(r["seconds"] for r in results)
+    total_rows = sum(r["rows"] for r in results)
+    print(f"\n{len(results)} files, {total_rows} rows, "
+          f"{cpu_seconds:.2f}s of conversion in {wall_seconds:.2f}s wall time")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert every CSV under data/raw data in parallel")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--no-binary", action="store_true",
+                        help="do not write memory-mappable .bank files next to the JSON banks")
+    args = parser.parse_args()
+
+    print("--- Starting Bulk Import ---")
+    start = time.perf_counter()
+    results = bulk_import(args.raw_dir, args.output_dir, args.workers, not args.no_binary)
+    print_summary(results, time.perf_counter() - start)
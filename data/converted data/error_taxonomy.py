@@ -0,0 +1,146 @@
+import re
+
+# =========================
+# CANONICAL NAMES
+# =========================
+# Error labels arrive as free text ("Word Order ", "Collocation Error
+# (Preposition)"). Each one is normalized to a category and an optional
+# subcategory and gets its code in TAXONOMY, one table shared by every
+# bank. Each bank carries a copy as "error_taxonomy":
+#
+#   "error_taxonomy": [{"label": "Adjective Form",
+#                       "category": "Adjective Form", "subcategory": null}, ...]
+#
+# Blanks and error_analysis entries keep the canonical label in
+# "error_type" and carry its index in the table as "error_code", so a
+# code means the same error in every bank and every conversion.
+
+# (category, subcategory) of every code, in code order. Codes are
+# positions: never reorder or remove entries, add new ones at the end.
+TAXONOMY = (
+    ("Adjective Form", None),
+    ("Collocation", None),
+    ("L1 Interference", None),
+    ("Overgeneralization", None),
+    ("Reduced Clause", None),
+    ("Tense Inconsistency", None),
+    ("Word Form", None),
+    ("Word Order", None),
+    ("Other", None),
+    ("Collocation", "Confusing words"),
+    ("Collocation", "Idiomatic Expression"),
+    ("Collocation", "Make vs Do"),
+    ("Collocation", "Preposition"),
+    ("Collocation", "Take steps vs Make steps"),
+    ("Collocation", "Verb-Noun match"),
+    ("L1 Interference", "Adjective Order"),
+    ("L1 Interference", "Comparison Structure"),
+    ("L1 Interference", "Noun Phrase Order"),
+    ("Overgeneralization", "Adjective -ed/-ing"),
+    ("Overgeneralization", "Gerund after preposition"),
+    ("Overgeneralization", "Verb Patterns"),
+    ("Overgeneralization", "Word Form"),
+    ("Tense Inconsistency", "Passive Participle"),
+    ("Tense Inconsistency", "Present Participle"),
+    ("Tense Inconsistency", "Reduced Relative Clause"),
+)
+
+# label of unknown categories
+OTHER = "Other"
+
+# casefolded spelling -> canonical category
+CATEGORIES = {category.casefold(): category for category, subcategory in TAXONOMY if subcategory is None}
+
+# casefolded spelling -> canonical subcategory, for synonyms seen in the CSVs
+SUBCATEGORY_ALIASES = {
+    "idiom": "Idiomatic Expression",
+}
+
+LABEL_RE = re.compile(r"^(.*?)\s*\((.*)\)$")
+SUFFIX_RE = re.compile(r"\s+errors?$", re.I)
+
+
+def normalize_label(text):
+    """
+    (category, subcategory) of a free-text error label, subcategory None
+    if there is none; None for empty labels. Whitespace is collapsed, a
+    trailing "Error" is dropped and known names get their canonical case.
+    """
+    if text is None:
+        return None
+    text = " ".join(str(text).split())
+    if not text or text.casefold() == "nan":
+        return None
+
+    match = LABEL_RE.match(text)
+    category, subcategory = (match.group(1), match.group(2).strip()) if match else (text, None)
+    category = SUFFIX_RE.sub("", category)
+    category = CATEGORIES.get(category.casefold(), category)
+    if subcategory:
+        subcategory = SUBCATEGORY_ALIASES.get(subcategory.casefold(), subcategory)
+    return category, subcategory or None
+
+
+def label_of(category, subcategory):
+    return f"{category} ({subcategory})" if subcategory else category
+
+
+# casefolded label -> code
+CODES = {label_of(*entry).casefold(): code for code, entry in enumerate(TAXONOMY)}
+
+
+# =========================
+# TAXONOMY TABLE
+# =========================
+class ErrorTaxonomy:
+    """
+    Encodes error labels with the TAXONOMY codes while a bank is written.
+
+    Raw labels are cached, so each distinct spelling is normalized once
+    however many blanks repeat it. A label missing from the table is
+    counted under its category (or "Other" for an unknown category) and
+    listed in `unknown`, so the converter can report it.
+    """
+
+    def __init__(self):
+        self.unknown = set()
+        self._raw = {}          # raw text -> code (or None)
+
+    def code(self, text):
+        """Code of a raw label (None for empty labels)"""
+        if text in self._raw:
+            return self._raw[text]
+        normalized = normalize_label(text)
+        code = None
+        if normalized is not None:
+            label = label_of(*normalized)
+            code = CODES.get(label.casefold())
+            if code is None:
+                self.unknown.add(label)
+                code = CODES.get(normalized[0].casefold(), CODES[OTHER.casefold()])
+        self._raw[text] = code
+        return code
+
+    def label(self, code):
+        return label_of(*TAXONOMY[code]) if code is not None else None
+
+    def encode_blank(self, blank):
+        """Rewrite a blank's error labels to canonical labels plus codes (in place)"""
+        code = self.code(blank.get("error_type"))
+        blank["error_type"] = self.label(code)
+        blank["error_code"] = code
+        for entry in (blank.get("error_analysis") or {}).values():
+            code = self.code(entry.get("error_type"))
+            entry["error_type"] = self.label(code)
+            entry["error_code"] = code
+        return blank
+
+    def table(self):
+        return [{"label": label_of(category, subcategory), "category": category, "subcategory": subcategory}
+                for category, subcategory in TAXONOMY]
+
+    def report(self):
+        """Warn about labels that are not in TAXONOMY yet"""
+        if self.unknown:
+            print(f"⚠️ Error labels not in the taxonomy table (counted under their category): "
+                  f"{', '.join(sorted(self.unknown))}")
@@ -1,72 +1,131 @@
 import pandas as pd
+import numpy as np
+import argparse
+import hashlib
 import json
 import os
+import time
 
-def convert_flyer_csv_to_json():
+import binary_bank
+from error_taxonomy import ErrorTaxonomy
+
+LETTER_TO_INDEX = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+OPTION_COLUMNS = ['Option A', 'Option B', 'Option C', 'Option D']
+FORMAT_VERSION = "passage-blank/1"
+
+DEFAULT_INPUT = os.path.join("data", "raw data", "flyer_gap-fill.csv")
+DEFAULT_OUTPUT = os.path.join("data", "converted data", "flyer_gap-fill.json")
+DEFAULT_CHUNKSIZE = 20000
+
+
+def split_item_id(item_id):
+    """
+    Split a blank ID such as "2.4" into its passage id and blank number.
+    IDs without a dot are treated as a single-blank passage.
+    """
+    passage_id, _, blank = str(item_id).strip().partition('.')
+    return passage_id, int(blank) if blank else 1
+
+
+def build_item_bank(task, passages, blanks):
+    """
+    Normalized item bank layout shared by every converter:
+    each passage is stored once and lists the ids of its blanks,
+    and each blank points back to its passage with passage_id.
+    Error labels are normalized and coded with the shared error taxonomy.
+    """
+    taxonomy = ErrorTaxonomy()
+    for blank in blanks:
+        taxonomy.encode_blank(blank)
+    taxonomy.report()
+    return {
+        "format": FORMAT_VERSION,
+        "task": task,
+        "error_taxonomy": taxonomy.table(),
+        "passages": passages,
+        "blanks": blanks
+    }
+
+
+def convert_flyer_csv_to_json(input_path=DEFAULT_INPUT, output_path=DEFAULT_OUTPUT):
     """
-    Convert flyer_gap-fill.csv to JSON format
+    Convert flyer_gap-fill.csv to the normalized passage/blank JSON format
     Input: data/raw data/flyer_gap-fill.csv
     Output: data/converted data/flyer_gap-fill.json
     """
-    
-    # Define paths
-    input_path = os.path.join("data", "raw data", "flyer_gap-fill.csv")
-    output_path = os.path.join("data", "converted data", "flyer_gap-fill.json")
 
     print(f"--- Starting Conversion ---")
-    
+
     try:
         # Read CSV with UTF-8 encoding
         df = pd.read_csv(input_path, encoding='utf-8-sig')
-        
-        questions = []
+
+        passages = []
+        passage_by_id = {}
+        blanks = []
         for _, row in df.iterrows():
             # Collect all options into a list
             options = [
-                str(row['Option A']), 
-                str(row['Option B']), 
-                str(row['Option C']), 
+                str(row['Option A']),
+                str(row['Option B']),
+                str(row['Option C']),
                 str(row['Option D'])
             ]
-            
+
             # Determine correct answer based on letter (A, B, C, or D)
             correct_letter = str(row['Correct Answer']).strip().upper()
-            letter_to_index = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
-            
+
             # Get the correct option text
-            correct_option_index = letter_to_index.get(correct_letter, 0)
+            correct_option_index = LETTER_TO_INDEX.get(correct_letter, 0)
             correct_option_text = options[correct_option_index]
-            
+
             # Create mapping for error analysis on distractors
             error_analysis = {}
-            for letter, index in letter_to_index.items():
+            for letter, index in LETTER_TO_INDEX.items():
                 opt_text = options[index]
                 if letter != correct_letter:
                     error_analysis[opt_text] = {
                         "error_type": row['Error Type']
                     }
 
-            # Build question data structure
-            question_data = {
-                "id": str(row['ID']),
-                "topic": row['Topic'],
-                "question_text": row['Question'],
+            # Store each passage once, the first time one of its blanks is seen
+            blank_id = str(row['ID'])
+            passage_id, blank_number = split_item_id(blank_id)
+            passage = passage_by_id.get(passage_id)
+            if passage is None:
+                passage = {
+                    "id": passage_id,
+                    "topic": row['Topic'],
+                    "passage_text": row['Question'],
+                    "blank_ids": []
+                }
+                passage_by_id[passage_id] = passage
+                passages.append(passage)
+            passage["blank_ids"].append(blank_id)
+
+            # Build blank data structure
+            blank_data = {
+                "id": blank_id,
+                "passage_id": passage_id,
+                "blank": blank_number,
                 "options": options,
                 "correct_answer": correct_option_text,
                 "correct_letter": correct_letter,
                 "error_type": row['Error Type'],
                 "error_analysis": error_analysis
             }
-            questions.append(question_data)
+            blanks.append(blank_data)
+
+        item_bank = build_item_bank("flyer", passages, blanks)
 
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
         # Export to JSON file
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(questions, f, ensure_ascii=False, indent=4)
-        
-        print(f"✅ Success! {len(questions)} questions converted.")
+            json.dump(item_bank, f, ensure_ascii=False, indent=4)
+
+        print(f"✅ Success! {len(passages)} passages / {len(blanks)} blanks converted.")
         print(f"📁 File saved to: {output_path}")
 
     except FileNotFoundError:
@@ -76,5 +135,325 @@ def convert_flyer_csv_to_json():
         import traceback
         traceback.print_exc()
 
+# =========================
+# STREAMING (LARGE BANKS)
+# =========================
+def chunk_to_blanks(chunk):
+    """
+    Build blank records for one CSV chunk with column-wise operations.
+
+    Options, correct letters and distractor masks are computed as arrays
+    for the whole chunk; Python only loops once to emit the dicts.
+    Returns (passage_ids, blank_records).
+    """
+    n = len(chunk)
+    options = chunk[OPTION_COLUMNS].astype(str).to_numpy()
+
+    letters = chunk['Correct Answer'].astype(str).str.strip().str.upper()
+    letter_index = letters.map(LETTER_TO_INDEX).fillna(-1).astype(np.int64).to_numpy()
+    correct_index = np.where(letter_index < 0, 0, letter_index)
+    correct_text = options[np.arange(n), correct_index]
+
+    # True where the option is a distractor (unknown letters mark all four)
+    distractor = np.arange(len(OPTION_COLUMNS))[None, :] != letter_index[:, None]
+
+    ids = chunk['ID'].astype(str).str.strip()
+    parts = ids.str.partition('.')
+    passage_ids = parts[0].to_numpy()
+    blank_numbers = pd.to_numeric(parts[2], errors='coerce').fillna(1).astype(np.int64).to_numpy()
+
+    error_types = chunk['Error Type'].astype(object).where(chunk['Error Type'].notna(), None).to_numpy()
+
+    blanks = [
+        {
+            "id": blank_id,
+            "passage_id": passage_id,
+            "blank": int(blank_number),
+            "options": list(opts),
+            "correct_answer": correct,
+            "correct_letter": letter,
+            "error_type": error_type,
+            "error_analysis": {
+                opt: {"error_type": error_type}
+                for opt, is_distractor in zip(opts, mask) if is_distractor
+            }
+        }
+        for blank_id, passage_id, blank_number, opts, correct, letter, error_type, mask in zip(
+            ids.to_numpy(), passage_ids, blank_numbers, options,
+            correct_text, letters.to_numpy(), error_types, distractor
+        )
+    ]
+    return passage_ids, blanks
+
+
+def collect_passages(chunk, passage_ids, passages):
+    """
+    Add an entry to `passages` (passage id -> record) for the first row of
+    every passage id in the chunk that has not been seen yet.
+    blank_ids is left for the caller to fill in row order.
+    """
+    first_rows = np.flatnonzero(~pd.Series(passage_ids).duplicated().to_numpy())
+    topics = chunk['Topic'].to_numpy()[first_rows]
+    texts = chunk['Question'].to_numpy()[first_rows]
+    for passage_id, topic, text in zip(passage_ids[first_rows], topics, texts):
+        if passage_id not in passages:
+            passages[passage_id] = {
+                "id": passage_id,
+                "topic": topic,
+                "passage_text": text,
+                "blank_ids": []
+            }
+
+
+class ItemBankWriter:
+    """
+    Write a normalized item bank incrementally.
+
+    Blanks are written as soon as they are added, one compact record per
+    line; only the passage table (one entry per passage, not per blank)
+    and the error taxonomy are kept in memory and written on close. Everything goes to a temporary
+    name that is moved into place only if the `with` block succeeds, so a
+    failed run never leaves a half-written bank behind.
+    """
+
+    def __init__(self, output_path, task):
+        self.output_path = output_path
+        self.tmp_path = output_path + ".tmp"
+        self.task = task
+        self.passages = {}
+        self.taxonomy = ErrorTaxonomy()
+        self.count = 0
+        self._sep = ""
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.output_path) or ".", exist_ok=True)
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self._file.write('{"format": %s, "task": %s,\n"blanks": [\n'
+                         % (json.dumps(FORMAT_VERSION), json.dumps(self.task)))
+        return self
+
+    def add_passage(self, passage_id, topic, passage_text):
+        if passage_id not in self.passages:
+            self.passages[passage_id] = {
+                "id": passage_id,
+                "topic": topic,
+                "passage_text": passage_text,
+                "blank_ids": []
+            }
+
+    def add_blanks(self, blanks):
+        f = self._file
+        for blank in blanks:
+            self.passages[blank["passage_id"]]["blank_ids"].append(blank["id"])
+            self.taxonomy.encode_blank(blank)
+            f.write(self._sep)
+            f.write(json.dumps(blank, ensure_ascii=False))
+            self._sep = ",\n"
+        self.count += len(blanks)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._file.write('\n],\n"passages": [\n')
+                self._file.write(",\n".join(json.dumps(p, ensure_ascii=False)
+                                            for p in self.passages.values()))
+                self._file.write('\n],\n"error_taxonomy": %s}\n'
+                                 % json.dumps(self.taxonomy.table(), ensure_ascii=False))
+                self.taxonomy.report()
+            self._file.close()
+            if exc_type is None:
+                os.replace(self.tmp_path, self.output_path)
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+        return False
+
+
+def convert_flyer_csv_streaming(input_path=DEFAULT_INPUT, output_path=DEFAULT_OUTPUT,
+                                chunksize=DEFAULT_CHUNKSIZE, task="flyer"):
+    """
+    Convert a large flyer CSV chunk by chunk through an ItemBankWriter,
+    so memory stays bounded by the chunk size plus the passage table.
+    Returns the number of blanks written.
+    """
+    with ItemBankWriter(output_path, task) as writer:
+        for chunk in pd.read_csv(input_path, encoding='utf-8-sig', dtype={'ID': str},
+                                 chunksize=chunksize):
+            passage_ids, blanks = chunk_to_blanks(chunk)
+            collect_passages(chunk, passage_ids, writer.passages)
+            writer.add_blanks(blanks)
+
+    return writer.count
+
+
+# =========================
+# INCREMENTAL RE-CONVERSION
+# =========================
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(output_path):
+    """flyer_gap-fill.json -> flyer_gap-fill.manifest.json"""
+    root, _ = os.path.splitext(output_path)
+    return root + ".manifest.json"
+
+
+def hash_rows(df):
+    """One content hash per CSV row (hex), computed column-wise by pandas"""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return [format(h, "016x") for h in hashes.tolist()]
+
+
+def write_json_atomic(obj, path):
+    """Write JSON to a temporary file next to `path`, then move it into place"""
+    tmp_path = path + ".tmp"
+    try:
+        # json.dumps uses the C encoder; json.dump streams through the slow Python one
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(obj, ensure_ascii=False))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def file_sha256(path):
+    """Content hash of a whole file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """The manifest of the last build, or None if missing/unreadable/outdated"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def load_previous_blanks(output_path):
+    """Blank records of the last build by id, or {} if there is no usable output"""
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            bank = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    if bank.get("format") != FORMAT_VERSION:
+        return {}
+    return {b["id"]: b for b in bank["blanks"]}
+
+
+def convert_flyer_csv_incremental(input_path=DEFAULT_INPUT, output_path=DEFAULT_OUTPUT,
+                                  manifest_path=None, task="flyer"):
+    """
+    Re-convert only the CSV rows whose content changed since the last build.
+
+    A manifest next to the output stores the hash of the whole CSV and one
+    content hash per row ID. An untouched CSV returns straight away.
+    Otherwise rows with a new or different hash are rebuilt with
+    chunk_to_blanks(), rows that disappeared are dropped, and every other
+    blank is reused as is from the previous output. The bank and manifest
+    are both replaced atomically, and the manifest's "last_change" lists
+    the added, changed and deleted blank ids so downstream caches can
+    invalidate just those.
+    Returns that change summary.
+    """
+    manifest_path = manifest_path or manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    source_sha256 = file_sha256(input_path)
+
+    if (manifest is not None and manifest.get("source_sha256") == source_sha256
+            and os.path.exists(output_path)):
+        return {"added": [], "changed": [], "deleted": []}
+
+    df = pd.read_csv(input_path, encoding='utf-8-sig', dtype={'ID': str})
+    ids = df['ID'].astype(str).str.strip()
+    if ids.duplicated().any():
+        dupes = sorted(set(ids[ids.duplicated()]))
+        raise ValueError(f"Incremental conversion needs unique IDs, duplicated: {dupes}")
+
+    row_hashes = dict(zip(ids.tolist(), hash_rows(df)))
+    old_hashes = manifest["rows"] if manifest is not None else {}
+
+    # Only parse the previous output if some of it can be reused
+    stale = np.array([old_hashes.get(i) != h for i, h in row_hashes.items()], dtype=bool)
+    old_blanks = load_previous_blanks(output_path) if not stale.all() else {}
+    stale |= ~ids.isin(old_blanks.keys()).to_numpy()
+
+    added = [i for i in ids[stale] if i not in old_hashes]
+    changed = [i for i in ids[stale] if i in old_hashes]
+    deleted = [i for i in old_hashes if i not in row_hashes]
+
+    # Only the stale rows go through the converter
+    new_blanks = {}
+    if stale.any():
+        _, rebuilt = chunk_to_blanks(df[stale])
+        new_blanks = {b["id"]: b for b in rebuilt}
+
+    # Passage table is cheap to derive from the CSV, so rebuild it in row order
+    passage_ids = ids.str.partition('.')[0].to_numpy()
+    passages = {}
+    collect_passages(df, passage_ids, passages)
+
+    blanks = []
+    for blank_id, passage_id in zip(ids.tolist(), passage_ids):
+        blank = new_blanks.get(blank_id) or old_blanks[blank_id]
+        passages[passage_id]["blank_ids"].append(blank_id)
+        blanks.append(blank)
+
+    change = {"added": added, "changed": changed, "deleted": deleted}
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    write_json_atomic(build_item_bank(task, list(passages.values()), blanks), output_path)
+    write_json_atomic({
+        "version": MANIFEST_VERSION,
+        "source": os.path.basename(input_path),
+        "source_sha256": source_sha256,
+        "rows": row_hashes,
+        "last_change": change
+    }, manifest_path)
+
+    return change
+
+
 if __name__ == "__main__":
-    convert_flyer_csv_to_json()
+    parser = argparse.ArgumentParser(description="Convert a flyer gap-fill CSV to an item bank")
+    parser.add_argument("--input", default=DEFAULT_INPUT)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--stream", action="store_true",
+                        help="chunked, vectorized conversion for large banks")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-process rows changed since the last build")
+    parser.add_argument("--no-binary", action="store_true",
+                        help="do not write the memory-mappable .bank next to the JSON")
+    args = parser.parse_args()
+
+    if args.incremental:
+        start = time.perf_counter()
+        change = convert_flyer_csv_incremental(args.input, args.output)
+        elapsed = time.perf_counter() - start
+        print(f"✅ {len(change['added'])} added, {len(change['changed'])} changed, "
+              f"{len(change['deleted'])} deleted in {elapsed * 1000:.0f} ms.")
+        print(f"📁 File saved to: {args.output}")
+    elif args.stream:
+        start = time.perf_counter()
+        count = convert_flyer_csv_streaming(args.input, args.output, args.chunksize)
+        elapsed = time.perf_counter() - start
+        print(f"✅ Success! {count} blanks streamed in {elapsed:.2f}s.")
+        print(f"📁 File saved to: {args.output}")
+    else:
+        convert_flyer_csv_to_json(args.input, args.output)
+
+    if not args.no_binary and os.path.exists(args.output):
+        binary_bank.try_write_binary_bank(args.output)
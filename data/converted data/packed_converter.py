@@ -0,0 +1,140 @@
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+
+import binary_bank
+from flyer_converter import LETTER_TO_INDEX, ItemBankWriter
+
+DEFAULT_INPUT = os.path.join("data", "raw data", "advertisement_gap-fill.csv")
+DEFAULT_OUTPUT = os.path.join("data", "converted data", "advertisement_gap-fill.json")
+
+# Packed layout: every blank of a passage lives in one cell
+#   options: "(1): A. excite | B. exciting | C. excitingly | D. excited; (2): ..."
+#   answers: "1:D, 2:B, 3:A, ..."
+#   errors:  "(1): Overgeneralization (Adjective -ed/-ing); (2): ..."
+OPTIONS_RE = re.compile(
+    r"\((\d+)\)\s*:\s*"
+    r"A\.\s*(.*?)\s*\|\s*B\.\s*(.*?)\s*\|\s*C\.\s*(.*?)\s*\|\s*D\.\s*(.*?)\s*"
+    r"(?=;\s*\(\d+\)\s*:|;?\s*$)",
+    re.S
+)
+ANSWERS_RE = re.compile(r"(\d+)\s*:\s*([A-Da-d])\b")
+ERRORS_RE = re.compile(r"\((\d+)\)\s*:\s*(.*?)\s*(?=;\s*\(\d+\)\s*:|;?\s*$)", re.S)
+
+
+def is_packed_row(cells):
+    """True if cell 4 of a row holds packed "(1): A. ... | B. ..." options"""
+    return len(cells) > 3 and OPTIONS_RE.match(cells[3].strip()) is not None
+
+
+class MalformedRow(ValueError):
+    pass
+
+
+def parse_packed_row(cells):
+    """
+    Parse one packed row into (passage_id, topic, passage_text, blanks).
+
+    The three packed cells are taken by position after ID/Topic/Question,
+    so both the 6-column files our partners send and files whose header
+    still names Option_A..Option_D work. Raises MalformedRow when the
+    options, answers and error types do not describe the same blanks.
+    """
+    cells = [c.strip() for c in cells]
+    if not cells or not cells[0]:
+        raise MalformedRow("missing ID")
+    if len(cells) < 6:
+        raise MalformedRow(f"too few columns: {len(cells)} (ID, Topic, Question and 3 packed cells expected)")
+    packed = [c for c in cells[3:] if c]
+    if len(packed) != 3:
+        raise MalformedRow(f"expected 3 packed cells (options, answers, errors), found {len(packed)}")
+
+    passage_id, topic, passage_text = cells[0], cells[1], cells[2]
+    options_cell, answers_cell, errors_cell = packed
+
+    options = {int(m.group(1)): list(m.group(2, 3, 4, 5)) for m in OPTIONS_RE.finditer(options_cell)}
+    answers = {int(n): letter.upper() for n, letter in ANSWERS_RE.findall(answers_cell)}
+    errors = {int(n): text for n, text in ERRORS_RE.findall(errors_cell)}
+
+    if not options:
+        raise MalformedRow("no blanks found in options cell")
+    if options.keys() != answers.keys():
+        raise MalformedRow(f"blanks with options {sorted(options)} but answers for {sorted(answers)}")
+    if options.keys() != errors.keys():
+        raise MalformedRow(f"blanks with options {sorted(options)} but error types for {sorted(errors)}")
+
+    blanks = []
+    for number in sorted(options):
+        opts = options[number]
+        letter = answers[number]
+        error_type = errors[number]
+        blanks.append({
+            "id": f"{passage_id}.{number}",
+            "passage_id": passage_id,
+            "blank": number,
+            "options": opts,
+            "correct_answer": opts[LETTER_TO_INDEX[letter]],
+            "correct_letter": letter,
+            "error_type": error_type,
+            "error_analysis": {
+                opt: {"error_type": error_type}
+                for i, opt in enumerate(opts) if i != LETTER_TO_INDEX[letter]
+            }
+        })
+    return passage_id, topic, passage_text, blanks
+
+
+def convert_packed_csv(input_path=DEFAULT_INPUT, output_path=DEFAULT_OUTPUT,
+                       task="advertisement", report=sys.stderr):
+    """
+    Convert a packed multi-blank CSV into a normalized item bank in a single
+    pass over the file. Malformed rows are reported (line number and reason)
+    and skipped instead of stopping the run.
+    Returns the number of blanks written.
+    """
+    malformed = 0
+
+    with open(input_path, 'r', encoding='utf-8-sig', newline='') as f, \
+            ItemBankWriter(output_path, task) as writer:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+
+        for cells in reader:
+            if not any(c.strip() for c in cells):
+                continue
+            try:
+                passage_id, topic, passage_text, blanks = parse_packed_row(cells)
+                if passage_id in writer.passages:
+                    raise MalformedRow(f"duplicate passage ID {passage_id}")
+            except MalformedRow as e:
+                malformed += 1
+                print(f"⚠️ {os.path.basename(input_path)} line {reader.line_num}: {e}", file=report)
+                continue
+
+            writer.add_passage(passage_id, topic, passage_text)
+            writer.add_blanks(blanks)
+
+    if malformed:
+        print(f"⚠️ {malformed} malformed rows skipped", file=report)
+    return writer.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a packed multi-blank CSV to an item bank")
+    parser.add_argument("--input", default=DEFAULT_INPUT)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--task", default="advertisement")
+    parser.add_argument("--no-binary", action="store_true",
+                        help="do not write the memory-mappable .bank next to the JSON")
+    args = parser.parse_args()
+
+    print(f"--- Starting Conversion ---")
+    start = time.perf_counter()
+    count = convert_packed_csv(args.input, args.output, args.task)
+    print(f"✅ Success! {count} blanks converted in {time.perf_counter() - start:.2f}s.")
+    print(f"📁 File saved to: {args.output}")
+    if not args.no_binary:
+        binary_bank.try_write_binary_bank(args.output)
@@ -0,0 +1,46 @@
+import pandas as pd
+import streamlit as st
+
+from devtools import profiling
+
+# =========================
+# PROFILING PANEL
+# =========================
+def profiling_panel():
+    """Sidebar summary of the last reruns of this process (PROFILE=1 only)"""
+    summary = profiling.collector.summary()
+
+    with st.sidebar.expander("⏱ Profiling"):
+        if not summary["reruns"]:
+            st.caption("No reruns recorded yet")
+            return
+
+        total = summary["total"]
+        st.caption(
+            f"Last {summary['reruns']} reruns · mean {total['mean_ms']:.1f} ms · "
+            f"p95 {total['p95_ms']:.1f} ms · max {total['max_ms']:.1f} ms"
+        )
+
+        # Slowest sections first
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Section": name,
+                    "Calls": s["count"],
+                    "Mean ms": round(s["mean_ms"], 2),
+                    "p95 ms": round(s["p95_ms"], 2),
+                }
+                for name, s in sorted(summary["sections"].items(), key=lambda kv: -kv[1]["mean_ms"])
+            ]),
+            hide_index=True
+        )
+
+        if summary["counters"]:
+            st.dataframe(
+                pd.DataFrame([{"Counter": k, "Total": v} for k, v in sorted(summary["counters"].items())]),
+                hide_index=True
+            )
+
+        size = profiling.approx_size({k: st.session_state[k] for k in st.session_state})
+        st.caption(f"This session: {len(st.session_state)} state keys, ~{size / 1024:.1f} KB")
+        st.caption(f"Exported to {profiling.METRICS_FILE}")
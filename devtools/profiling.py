@@ -0,0 +1,182 @@
+import atexit
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# Opt-in: PROFILE=1 streamlit run app.py
+ENABLED = os.environ.get("PROFILE", "0") != "0"
+METRICS_FILE = os.environ.get("PROFILE_FILE", "metrics.jsonl")
+
+ROLLING_RERUNS = 200      # reruns kept for the sidebar summary
+FLUSH_EVERY = 50          # reruns buffered before appending to METRICS_FILE
+
+_NULL = contextlib.nullcontext()
+_local = threading.local()
+
+
+# =========================
+# RECORDING API
+# =========================
+def section(name):
+    """
+    `with section("name"):` times a block into the current rerun.
+    Outside a rerun (e.g. a fragment rerunning on its own) the block is
+    recorded as a rerun of its own. Returns a shared no-op when disabled.
+    """
+    if not ENABLED:
+        return _NULL
+    return _Section(name)
+
+
+def rerun(name="app"):
+    """`with rerun():` wraps one script run (app.py, or a fragment)"""
+    if not ENABLED:
+        return _NULL
+    return _Section(name)
+
+
+def count(name, n=1):
+    """Bump a named counter (cache hits, lookups...) in the current rerun"""
+    if not ENABLED:
+        return
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record["counters"][name] = record["counters"].get(name, 0) + n
+
+
+def note_session_state(state):
+    """Record session-state key count and approximate size for the current rerun"""
+    if not ENABLED:
+        return
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record["session_keys"] = len(state)
+        record["session_bytes"] = sum(approx_size(state[k]) for k in list(state.keys()))
+
+
+def approx_size(value, depth=3):
+    """sys.getsizeof over containers, a few levels deep"""
+    size = sys.getsizeof(value, 0)
+    if depth and isinstance(value, dict):
+        size += sum(approx_size(k, depth - 1) + approx_size(v, depth - 1) for k, v in value.items())
+    elif depth and isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(approx_size(v, depth - 1) for v in value)
+    return size
+
+
+class _Section:
+    __slots__ = ("name", "start", "owner")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.owner = getattr(_local, "record", None) is None
+        if self.owner:
+            _local.record = {
+                "ts": time.time(),
+                "rerun": self.name,
+                "sections": {},
+                "counters": {},
+            }
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        record = _local.record
+        if self.owner:
+            record["total_ms"] = elapsed_ms
+            _local.record = None
+            collector.add(record)
+        else:
+            sections = record["sections"]
+            sections[self.name] = sections.get(self.name, 0.0) + elapsed_ms
+        return False
+
+
+# =========================
+# COLLECTOR
+# =========================
+class Collector:
+    """Rolling window of finished reruns, appended to METRICS_FILE in batches"""
+
+    def __init__(self, path=METRICS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=ROLLING_RERUNS)
+        self._pending = []
+
+    def add(self, record):
+        with self._lock:
+            self._recent.append(record)
+            self._pending.append(record)
+            if len(self._pending) < FLUSH_EVERY:
+                return
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in batch))
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", self.path, e)
+
+    def recent(self):
+        with self._lock:
+            return list(self._recent)
+
+    def summary(self):
+        """
+        Rolling stats: {"reruns", "total": {...}, "sections": {name: {...}},
+        "counters": {name: total}}, times in ms (mean / p95 / max).
+        """
+        records = self.recent()
+        sections, counters = {}, {}
+        for r in records:
+            for name, ms in r["sections"].items():
+                sections.setdefault(name, []).append(ms)
+            for name, n in r["counters"].items():
+                counters[name] = counters.get(name, 0) + n
+        return {
+            "reruns": len(records),
+            "total": _stats([r["total_ms"] for r in records]),
+            "sections": {name: _stats(values) for name, values in sections.items()},
+            "counters": counters,
+            "last": records[-1] if records else None,
+        }
+
+
+def _stats(values):
+    if not values:
+        return {"count": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": sum(values) / len(values),
+        "p95_ms": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+        "max_ms": ordered[-1],
+    }
+
+
+collector = Collector()
+if ENABLED:
+    atexit.register(collector.flush)
@@ -0,0 +1,261 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+from storage.attempts import get_attempt_log
+
+# =========================
+# MODEL SETTINGS
+# =========================
+# Elo / 1PL-IRT style: P(correct) = 1 / (1 + exp(-(ability - difficulty)))
+K_START = 0.4           # step size for a new student / item
+K_DECAY = 0.05          # step shrinks as 1 / (1 + K_DECAY * attempts)
+K_MIN = 0.05
+TARGET_SUCCESS = 0.7    # pick passages the student gets ~70% right
+RECENT_PASSAGES = 20    # do not repeat any of the last N passages
+
+
+def step_size(attempts):
+    return max(K_START / (1 + K_DECAY * attempts), K_MIN)
+
+
+def p_correct(ability, difficulty):
+    return 1.0 / (1.0 + math.exp(difficulty - ability))
+
+
+# =========================
+# ADAPTIVE ENGINE
+# =========================
+class AdaptiveEngine:
+    """
+    Item selection for one task type.
+
+    Item statistics live in flat NumPy arrays aligned with the bound
+    ItemBank: blank difficulty and attempt count, plus each passage's
+    summed difficulty and blank count, so the mean difficulty of every
+    passage is one vectorized division. Student abilities are a dict.
+
+    Both are updated online from attempt events (an AttemptLog listener)
+    and saved in the flush transaction (item_stats / abilities tables),
+    so nothing is refitted and a restart just reloads the parameters.
+    The flush hook replays the batch on the saved parameters, not the
+    in-memory ones, and keeps the result: processes sharing the database
+    take turns on its write lock, so each builds on what the others
+    saved. Rows another process wrote reload their parameters.
+    select() scores the whole bank with a handful of array operations.
+    """
+
+    def __init__(self, log, task):
+        self._log = log
+        self.task = task
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng()
+
+        self.version = None
+        self._blank_index = {}
+        self._passage_ids = ()
+
+        # persisted parameters for blanks not (yet) in a bound bank
+        self._saved_items = {}
+        # student -> [ability, attempts]
+        self._abilities = {}
+        # student -> recently served passage indices
+        self._recent = {}
+
+        with self._lock, log.attach(self.apply, self.persist, self.reload) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS item_stats ("
+                " task TEXT NOT NULL, blank_id TEXT NOT NULL,"
+                " difficulty REAL NOT NULL, attempts INTEGER NOT NULL,"
+                " PRIMARY KEY (task, blank_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS abilities ("
+                " student_id TEXT NOT NULL, task TEXT NOT NULL,"
+                " ability REAL NOT NULL, attempts INTEGER NOT NULL,"
+                " PRIMARY KEY (student_id, task))"
+            )
+            for blank_id, difficulty, attempts in conn.execute(
+                "SELECT blank_id, difficulty, attempts FROM item_stats WHERE task = ?", (task,)
+            ):
+                self._saved_items[blank_id] = (difficulty, attempts)
+            for student_id, ability, attempts in conn.execute(
+                "SELECT student_id, ability, attempts FROM abilities WHERE task = ?", (task,)
+            ):
+                self._abilities[student_id] = [ability, attempts]
+
+    # ---------- binding ----------
+    def bind(self, bank):
+        """(Re)build the parameter arrays for a bank version; cheap if unchanged"""
+        if bank.version == self.version:
+            return
+        with self._lock:
+            if bank.version == self.version:
+                return
+            # Keep what the current arrays learned for blanks that survive
+            for blank_id, i in self._blank_index.items():
+                self._saved_items[blank_id] = (float(self.difficulty[i]), int(self.attempts[i]))
+
+            blanks = bank.blanks
+            passage_index = {p["id"]: i for i, p in enumerate(bank.passages)}
+            saved = [self._saved_items.get(b["id"], (0.0, 0)) for b in blanks]
+
+            self.difficulty = np.array([s[0] for s in saved], dtype=np.float64)
+            self.attempts = np.array([s[1] for s in saved], dtype=np.int64)
+            self.passage_of = np.array([passage_index[b["passage_id"]] for b in blanks], dtype=np.int64)
+            n_passages = len(bank.passages)
+            self.passage_sum = np.bincount(self.passage_of, weights=self.difficulty, minlength=n_passages)
+            self.passage_count = np.maximum(np.bincount(self.passage_of, minlength=n_passages), 1)
+
+            self._blank_index = {b["id"]: i for i, b in enumerate(blanks)}
+            self._passage_ids = tuple(p["id"] for p in bank.passages)
+            self._recent = {}
+            self.version = bank.version
+
+    # ---------- online updates ----------
+    def ability(self, student_id):
+        state = self._abilities.get(student_id)
+        return state[0] if state else 0.0
+
+    def _step(self, student, item, correct):
+        """One Elo step on [ability, attempts] and [difficulty, attempts]; returns the difficulty change"""
+        surprise = correct - p_correct(student[0], item[0])
+        delta = -step_size(item[1]) * surprise
+        student[0] += step_size(student[1]) * surprise
+        student[1] += 1
+        item[0] += delta
+        item[1] += 1
+        return delta
+
+    def apply(self, events):
+        """AttemptLog listener: one Elo step per answered blank"""
+        with self._lock:
+            for e in events:
+                if e["task"] != self.task:
+                    continue
+                i = self._blank_index.get(e["blank_id"])
+                if i is None:
+                    continue
+                student = self._abilities.setdefault(e["student_id"], [0.0, 0])
+                item = [self.difficulty[i], self.attempts[i]]
+                delta = self._step(student, item, e["correct"])
+                self.difficulty[i], self.attempts[i] = item
+                self.passage_sum[self.passage_of[i]] += delta
+
+    def _set_item(self, blank_id, difficulty, attempts):
+        """Take saved parameters of a blank (caller holds the lock)"""
+        i = self._blank_index.get(blank_id)
+        if i is None:
+            self._saved_items[blank_id] = (difficulty, attempts)
+            return
+        self.passage_sum[self.passage_of[i]] += difficulty - self.difficulty[i]
+        self.difficulty[i] = difficulty
+        self.attempts[i] = attempts
+
+    def _stored(self, conn, blank_ids, student_ids):
+        """Saved [difficulty, attempts] by blank and [ability, attempts] by student"""
+        items, students = {}, {}
+        for blank_id in blank_ids:
+            row = conn.execute(
+                "SELECT difficulty, attempts FROM item_stats WHERE task = ? AND blank_id = ?",
+                (self.task, blank_id)
+            ).fetchone()
+            if row is not None:
+                items[blank_id] = list(row)
+        for student_id in student_ids:
+            row = conn.execute(
+                "SELECT ability, attempts FROM abilities WHERE student_id = ? AND task = ?",
+                (student_id, self.task)
+            ).fetchone()
+            if row is not None:
+                students[student_id] = list(row)
+        return items, students
+
+    def reload(self, events):
+        """AttemptLog listener for other processes' rows: their writer saved the parameters"""
+        events = [e for e in events if e["task"] == self.task]
+        if not events:
+            return
+        with self._log.connection() as conn, self._lock:
+            items, students = self._stored(conn, {e["blank_id"] for e in events}, {e["student_id"] for e in events})
+            for blank_id, (difficulty, attempts) in items.items():
+                self._set_item(blank_id, difficulty, attempts)
+            self._abilities.update(students)
+
+    def persist(self, conn, events):
+        """AttemptLog flush hook: replay this batch on the saved parameters and save the result"""
+        with self._lock:
+            events = [e for e in events if e["task"] == self.task and e["blank_id"] in self._blank_index]
+            if not events:
+                return
+            items, students = self._stored(conn, {e["blank_id"] for e in events}, {e["student_id"] for e in events})
+            for e in events:
+                self._step(students.setdefault(e["student_id"], [0.0, 0]),
+                           items.setdefault(e["blank_id"], [0.0, 0]), e["correct"])
+            for blank_id, (difficulty, attempts) in items.items():
+                self._set_item(blank_id, difficulty, attempts)
+            self._abilities.update(students)
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO item_stats (task, blank_id, difficulty, attempts) VALUES (?, ?, ?, ?)",
+            [(self.task, blank_id, d, n) for blank_id, (d, n) in items.items()]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO abilities (student_id, task, ability, attempts) VALUES (?, ?, ?, ?)",
+            [(student_id, self.task, a, n) for student_id, (a, n) in students.items()]
+        )
+
+    # ---------- selection ----------
+    def passage_difficulty(self):
+        return self.passage_sum / self.passage_count
+
+    def select(self, student_id, current=None):
+        """
+        Index of the passage whose mean blank difficulty is closest to the
+        level this student answers correctly TARGET_SUCCESS of the time,
+        skipping the current and recently served passages.
+        """
+        with self._lock:
+            n = len(self._passage_ids)
+            if n == 0:
+                return None
+
+            target = self.ability(student_id) - math.log(TARGET_SUCCESS / (1 - TARGET_SUCCESS))
+            score = -np.abs(self.passage_difficulty() - target)
+            # tiny jitter so equally good passages are not always served in file order
+            score += self._rng.random(n) * 1e-6
+
+            recent = self._recent.setdefault(student_id, deque(maxlen=RECENT_PASSAGES))
+            blocked = set(recent)
+            if current is not None:
+                blocked.add(current)
+            if len(blocked) >= n:
+                # Small bank: everything was seen recently, only avoid a repeat
+                blocked = {current} if current is not None and n > 1 else set()
+            if blocked:
+                score[list(blocked)] = -np.inf
+
+            choice = int(np.argmax(score))
+            recent.append(choice)
+            return choice
+
+
+# =========================
+# PROCESS-WIDE ENGINES
+# =========================
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_adaptive_engine(task, bank):
+    """The engine for one task type, bound to the given bank version"""
+    engine = _engines.get(task)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(task)
+            if engine is None:
+                engine = _engines[task] = AdaptiveEngine(get_attempt_log(), task)
+    engine.bind(bank)
+    return engine
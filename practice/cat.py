@@ -0,0 +1,128 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+# =========================
+# TEST SETTINGS
+# =========================
+# Rasch model, same scale as practice.adaptive: P(correct) = 1 / (1 + exp(b - theta))
+ABILITY_GRID = np.linspace(-4.0, 4.0, 161)
+PRIOR_SD = 1.0           # standard normal prior on ability
+SE_TARGET = 0.5          # stop once the posterior SD falls below this
+MIN_ITEMS = 5
+MAX_ITEMS = 20
+TABLE_TTL = 300          # seconds before tables pick up recalibrated difficulties
+
+# (lowest ability, label), highest first
+LEVELS = (
+    (1.5, "Advanced"),
+    (0.5, "Upper-intermediate"),
+    (-0.5, "Intermediate"),
+    (-1.5, "Elementary"),
+    (-math.inf, "Beginner"),
+)
+
+
+def level_of(ability):
+    for lowest, label in LEVELS:
+        if ability >= lowest:
+            return label
+
+
+# =========================
+# PRECOMPUTED TABLES
+# =========================
+class ItemTables:
+    """
+    Response tables for one bank version over ABILITY_GRID, built once
+    from the calibrated blank difficulties:
+
+        log_p[i, g], log_q[i, g]   log P(correct) / log P(wrong) of item i
+        info[g, i]                 Fisher information P * (1 - P)
+
+    A test step is then one row add (posterior update) and one argmax
+    over a precomputed row (item choice) -- nothing is refitted.
+    """
+
+    def __init__(self, bank, difficulty):
+        self.version = bank.version
+        self.blank_ids = tuple(b["id"] for b in bank.blanks)
+        self.built_at = time.time()
+
+        difficulty = np.asarray(difficulty, dtype=np.float64)
+        p = 1.0 / (1.0 + np.exp(difficulty[:, None] - ABILITY_GRID[None, :]))
+        self.log_p = np.log(p)
+        self.log_q = np.log1p(-p)
+        self.info = np.ascontiguousarray((p * (1.0 - p)).T)
+        self.log_prior = -0.5 * (ABILITY_GRID / PRIOR_SD) ** 2
+
+    def __len__(self):
+        return len(self.blank_ids)
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def item_tables(task, bank, difficulty):
+    """Shared ItemTables for a bank version, rebuilt every TABLE_TTL seconds"""
+    key = (task, bank.version)
+    tables = _tables.get(key)
+    if tables is None or time.time() - tables.built_at > TABLE_TTL:
+        with _tables_lock:
+            tables = _tables.get(key)
+            if tables is None or time.time() - tables.built_at > TABLE_TTL:
+                for old in [k for k in _tables if k[0] == task]:
+                    del _tables[old]
+                tables = _tables[key] = ItemTables(bank, difficulty)
+    return tables
+
+
+# =========================
+# ONE TEST
+# =========================
+class AdaptiveTest:
+    """
+    State of one student's diagnostic test: the log posterior over the
+    ability grid and the items used so far. Small enough for session state.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.log_post = tables.log_prior.copy()
+        self.used = []
+        self.responses = []
+        self.ability, self.se = self._estimate()
+
+    def _estimate(self):
+        # EAP estimate and posterior SD
+        post = np.exp(self.log_post - self.log_post.max())
+        post /= post.sum()
+        mean = float(post @ ABILITY_GRID)
+        sd = float(np.sqrt(post @ (ABILITY_GRID - mean) ** 2))
+        return mean, sd
+
+    def finished(self):
+        if len(self.used) >= min(MAX_ITEMS, len(self.tables)):
+            return True
+        return len(self.used) >= MIN_ITEMS and self.se < SE_TARGET
+
+    def next_item(self):
+        """Index (into bank.blanks) of the most informative unused item, or None"""
+        if self.finished():
+            return None
+        g = int(np.abs(ABILITY_GRID - self.ability).argmin())
+        info = self.tables.info[g].copy()
+        info[self.used] = -1.0
+        return int(info.argmax())
+
+    def answer(self, item, correct):
+        self.log_post += self.tables.log_p[item] if correct else self.tables.log_q[item]
+        self.used.append(item)
+        self.responses.append(bool(correct))
+        self.ability, self.se = self._estimate()
+
+    def level(self):
+        return level_of(self.ability)
@@ -0,0 +1,116 @@
+import time
+
+import streamlit as st
+
+from practice.adaptive import get_adaptive_engine
+from practice.cat import AdaptiveTest, item_tables
+from practice.flyer_completion import load_flyer_data
+from practice.grading import answer_key
+from storage.attempts import get_attempt_log, make_event
+
+# =========================
+# INITIALIZE SESSION STATE
+# =========================
+def start_test(data):
+    engine = get_adaptive_engine("flyer", data)
+    tables = item_tables("flyer", data, engine.difficulty)
+    st.session_state.diagnostic = AdaptiveTest(tables)
+    st.session_state.diagnostic_bank = data
+    st.session_state.diagnostic_item = None
+    st.session_state.diagnostic_shown_at = time.time()
+
+
+def grade_answer(data, blank, chosen):
+    """Whether one answer is right, graded by the shared AnswerKey like practice"""
+    key = answer_key(data)
+    rows = key.rows([blank["id"]])
+    is_correct, _ = key.grade(rows, key.encode(rows, [chosen]))
+    return bool(is_correct[0])
+
+
+def record_answer(data, blank, chosen, correct, shown_at):
+    """One attempt event for the diagnostic answer (same log as practice)"""
+    now = time.time()
+    get_attempt_log().record([make_event(
+        student_id=st.session_state.get("student_id") or "anonymous",
+        task="flyer",
+        bank_version=data.version,
+        passage_id=blank["passage_id"],
+        blank_id=blank["id"],
+        topic=data[data.index_of(blank["passage_id"])].get("topic"),
+        chosen=chosen,
+        correct=correct,
+        error_type=blank.get("error_type"),
+        latency_ms=(now - shown_at) * 1000,
+        ts=now,
+    )])
+
+# =========================
+# DIAGNOSTIC TEST
+# =========================
+def diagnostic_test():
+    """Computerized adaptive placement test over the flyer item bank"""
+
+    # A test runs to the end on the bank version it started with, even if
+    # a newer one is loaded meanwhile; the next test starts on the newest
+    test = st.session_state.get("diagnostic")
+    data = st.session_state.get("diagnostic_bank") if test is not None else None
+    if data is None:
+        data = load_flyer_data()
+    if not data:
+        st.warning("No flyer data found")
+        return
+
+    if test is None or test.tables.version != data.version:
+        st.write("Answer one blank at a time. Each question is chosen from your previous answers, "
+                 "and the test stops as soon as your level is clear.")
+        if st.button("▶ Start diagnostic test"):
+            start_test(data)
+            st.rerun()
+        return
+
+    if test.finished():
+        show_result(test)
+        return
+
+    if st.session_state.diagnostic_item is None:
+        st.session_state.diagnostic_item = test.next_item()
+        st.session_state.diagnostic_shown_at = time.time()
+    item = st.session_state.diagnostic_item
+    blank = data.blanks[item]
+    passage = data[data.index_of(blank["passage_id"])]
+
+    st.caption(f"Question {len(test.used) + 1} · estimated level: {test.level()} (±{test.se:.2f})")
+    st.write(f"### Topic: {passage['topic']}")
+    st.text(passage["passage_text"])
+
+    st.markdown(f"#### Blank ({blank['blank']})")
+    chosen = st.radio(
+        "Choose answer:",
+        blank["options"],
+        index=None,
+        key=f"diagnostic_{len(test.used)}"
+    )
+
+    if st.button("Submit answer", disabled=chosen is None):
+        correct = grade_answer(data, blank, chosen)
+        record_answer(data, blank, chosen, correct, st.session_state.diagnostic_shown_at)
+        test.answer(item, correct)
+        st.session_state.diagnostic_item = None
+        st.rerun()
+
+# =========================
+# RESULT
+# =========================
+def show_result(test):
+    st.success(f"🎯 Your level: **{test.level()}**")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Questions", len(test.used))
+    col2.metric("Correct", sum(test.responses))
+    col3.metric("Ability", f"{test.ability:+.2f} ± {test.se:.2f}")
+
+    if st.button("🔄 Retake test"):
+        del st.session_state.diagnostic
+        st.session_state.pop("diagnostic_bank", None)
+        st.rerun()
@@ -1,238 +1,410 @@
 import streamlit as st
 import json
-import os
-from datetime import datetime
+import time
+
+from devtools import profiling
+from practice.adaptive import get_adaptive_engine
+from practice.grading import answer_key as get_answer_key
+from practice.item_bank import bank_path, load_item_bank
+from storage.attempts import get_attempt_log, make_event
+from storage.sessions import get_session_store
+
+FLYER_BANK = "flyer_gap-fill.json"
+
+# Registry metadata (see practice.tasks)
+TASK = {
+    "key": "flyer",
+    "entry": "flyer_completion",
+}
 
 # =========================
 # LOAD DATA
 # =========================
 def load_flyer_data():
-    """Load flyer_gap-fill.json data"""
-    json_path = os.path.join(
-        os.path.dirname(__file__),
-        "..",
-        "data",
-        "converted data",
-        "flyer_gap-fill.json"
-    )
-    
+    """Return the shared flyer item bank (parsed once per process, not per session)"""
+    json_path = bank_path(FLYER_BANK)
+
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with profiling.section("flyer.load_bank"):
+            return load_item_bank(json_path)
     except FileNotFoundError:
         st.error(f"❌ Could not find data file at {json_path}")
         return None
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, ValueError):
         st.error("❌ Error reading JSON file")
         return None
 
+def session_bank():
+    """
+    The bank version this session works on.
+
+    The session keeps a reference to the shared bank it started its
+    passage on (st.session_state.flyer_bank), so a version swapped in by
+    the BankWatcher never changes a passage under a student mid-answer.
+    Navigation moves the session to the current version (unpin_bank).
+    """
+    data = st.session_state.get("flyer_bank")
+    if data is None:
+        data = load_flyer_data()
+        if data is not None:
+            st.session_state.flyer_bank = data
+    return data
+
+
+def unpin_bank():
+    """Let the next rerun pick up the current bank version"""
+    st.session_state.pop("flyer_bank", None)
+
 # =========================
 # INITIALIZE SESSION STATE
 # =========================
-def init_session_state():
-    """Initialize session state for flyer practice"""
-    if "flyer_questions" not in st.session_state:
-        st.session_state.flyer_questions = load_flyer_data()
-    
-    if "flyer_current_q" not in st.session_state:
-        st.session_state.flyer_current_q = 0
-    
+def init_session():
+    """Initialize session state for flyer practice (index and answers only)"""
+    if "flyer_passage_index" not in st.session_state:
+        st.session_state.flyer_passage_index = 0
+        restore_progress()
+
     if "flyer_answers" not in st.session_state:
         st.session_state.flyer_answers = {}
-    
+
     if "flyer_submitted" not in st.session_state:
         st.session_state.flyer_submitted = False
-    
-    if "flyer_score" not in st.session_state:
-        st.session_state.flyer_score = None
+
+    # ids of the passages served so far, for "Previous" (ids, not
+    # indexes, so they survive a new bank version)
+    if "flyer_history" not in st.session_state:
+        st.session_state.flyer_history = []
+
+    # passage id -> time first shown, answer key -> time last changed
+    if "flyer_started_at" not in st.session_state:
+        st.session_state.flyer_started_at = {}
+
+    if "flyer_answer_times" not in st.session_state:
+        st.session_state.flyer_answer_times = {}
+
+
+def answer_key(passage, blank):
+    """Session-state key of one blank's answer"""
+    return f"p{passage['id']}_b{blank}"
+
+
+def unanswered(passage):
+    """Blank numbers of the passage that have no answer yet"""
+    answers = st.session_state.flyer_answers
+    return [q["blank"] for q in passage["questions"] if answers.get(answer_key(passage, q["blank"])) is None]
+
+
+def mark_answered(key, passage):
+    st.session_state.flyer_answer_times[key] = time.time()
+    st.session_state.flyer_answers[key] = st.session_state[key]
+    save_progress(passage)
+
+# =========================
+# SHARED SESSION STATE
+# =========================
+# A signed-in session saves its answers, timings, history and current
+# passage to the shared session store, so a reconnect served by another
+# app process carries on where the student was (see storage.sessions).
+def save_progress(passage):
+    """Save this session's in-progress state if it changed since the last save"""
+    token = st.session_state.get("session_token")
+    if not token:
+        return
+    state = {
+        "passage_id": passage["id"],
+        "answers": st.session_state.flyer_answers,
+        "answer_times": st.session_state.flyer_answer_times,
+        "started_at": st.session_state.flyer_started_at,
+        "history": st.session_state.flyer_history,
+        "submitted": st.session_state.flyer_submitted,
+    }
+    encoded = json.dumps(state, sort_keys=True)
+    if encoded == st.session_state.get("flyer_saved"):
+        return
+    store = get_session_store()
+    with profiling.section("flyer.save_progress"):
+        saved = store.save_state(token, "flyer", state)
+        if not saved:
+            # the login moved to a new token (restored in another tab)
+            session = store.get(token, cached=False)
+            if session is not None and session["token"] != token:
+                st.session_state.session_token = session["token"]
+                st.query_params["session"] = session["token"]
+                saved = store.save_state(session["token"], "flyer", state)
+    if saved:
+        st.session_state.flyer_saved = encoded
+
+
+def restore_progress():
+    """Load what this login saved, e.g. on another process (a new session only)"""
+    token = st.session_state.get("session_token")
+    saved = get_session_store().load_state(token).get("flyer") if token else None
+    if not saved:
+        return
+    st.session_state.flyer_answers = saved["answers"]
+    st.session_state.flyer_answer_times = saved["answer_times"]
+    st.session_state.flyer_started_at = saved["started_at"]
+    st.session_state.flyer_history = saved["history"]
+    st.session_state.flyer_submitted = saved["submitted"]
+    # an index only means something in one bank version: find the passage by id
+    st.session_state.flyer_restored_passage = saved["passage_id"]
+
+# =========================
+# GRADING
+# =========================
+def grade_passage(data, passage):
+    """Per-blank results of the current answers for one passage (graded by the shared AnswerKey)"""
+    key = get_answer_key(data)
+    questions = passage["questions"]
+    answers = [st.session_state.flyer_answers.get(answer_key(passage, q["blank"])) for q in questions]
+
+    rows = key.rows([q["id"] for q in questions])
+    is_correct, category = key.grade(rows, key.encode(rows, answers))
+    categories = key.category_names(category)
+
+    return [
+        {
+            "blank": q["blank"],
+            "blank_id": q["id"],
+            "user_answer": user_answer,
+            "correct_answer": q["correct_answer"],
+            "is_correct": bool(correct),
+            # what the item tests, and what this particular answer shows
+            "error_type": q.get("error_type"),
+            "category": name,
+        }
+        for q, user_answer, correct, name in zip(questions, answers, is_correct, categories)
+    ]
+
+
+def record_submission(data, passage, results):
+    """Hand one attempt event per blank to the shared attempt log (no disk I/O here)"""
+    now = time.time()
+    started = st.session_state.flyer_started_at.get(passage["id"], now)
+    student_id = st.session_state.get("student_id") or "anonymous"
+
+    events = []
+    for r in results:
+        answered = st.session_state.flyer_answer_times.get(answer_key(passage, r["blank"]), now)
+        events.append(make_event(
+            student_id=student_id,
+            task="flyer",
+            bank_version=data.version,
+            passage_id=passage["id"],
+            blank_id=r["blank_id"],
+            topic=passage.get("topic"),
+            chosen=r["user_answer"],
+            correct=r["is_correct"],
+            error_type=r["error_type"],
+            latency_ms=(answered - started) * 1000,
+            ts=now,
+        ))
+    # Bind the engine first so this submission updates item/ability estimates.
+    # It follows the current version (blanks are matched by id), not the one
+    # this session is pinned to, so old sessions do not make it rebind back.
+    with profiling.section("flyer.record"):
+        get_adaptive_engine("flyer", load_flyer_data() or data)
+        get_attempt_log().record(events)
 
 # =========================
 # FLYER COMPLETION TASK
 # =========================
 def flyer_completion():
-    """Main flyer completion MCQ practice"""
-    
-    init_session_state()
-    
-    st.subheader("📄 Leaflet/Flyer Completion")
-    st.write("Fill in the blanks with the correct options. Read the passage carefully and choose the best answer.")
-    
-    # Load questions
-    questions = st.session_state.flyer_questions
-    
-    if questions is None or len(questions) == 0:
-        st.error("❌ No questions available")
+    """Main flyer completion practice: one passage, all of its blanks"""
+
+    init_session()
+
+    data = session_bank()
+
+    if not data:
+        st.warning("No flyer data found")
         return
-    
-    # Display progress
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Question", f"{st.session_state.flyer_current_q + 1}/{len(questions)}")
-    with col2:
-        answered = len(st.session_state.flyer_answers)
-        st.metric("Answered", f"{answered}/{len(questions)}")
-    with col3:
-        if st.session_state.flyer_score is not None:
-            percentage = (st.session_state.flyer_score / len(questions)) * 100
-            st.metric("Score", f"{st.session_state.flyer_score}/{len(questions)}", f"{percentage:.0f}%")
-    
+
+    restored = st.session_state.pop("flyer_restored_passage", None)
+    if restored is not None:
+        st.session_state.flyer_passage_index = data.index_of(restored) or 0
+
+    p_index = min(st.session_state.flyer_passage_index, len(data) - 1)
+    passage = data[p_index]
+    st.session_state.flyer_started_at.setdefault(passage["id"], time.time())
+
+    st.subheader("📄 Leaflet / Flyer Completion")
+    st.write("Fill in the blanks with the correct options. Read the passage carefully and choose the best answer.")
+
+    st.write(f"### Topic: {passage['topic']}")
+    st.caption(f"Passage {p_index + 1}/{len(data)}")
+
+    # ---------- PASSAGE ----------
+    st.markdown("### Passage")
+    st.text(passage["passage_text"])
+
+    st.divider()
+
+    # ---------- QUESTIONS ----------
+    st.markdown("### Fill in each blank")
+
+    for q in passage["questions"]:
+        blank_choice(passage, q)
+
     st.divider()
-    
-    # Get current question
-    current_q = st.session_state.flyer_current_q
-    question = questions[current_q]
-    
-    # Display question content
-    st.write(f"**Topic:** {question['topic']}")
-    st.write(f"**Question ID:** {question['id']}")
-    
-    # Display the passage with blanks
-    st.write("**Passage:**")
-    st.text(question['question_text'])
-    
-    st.write("---")
-    
-    # Display options
-    st.write("**Choose the correct answer:**")
-    
-    # Create radio buttons for options
-    option_key = f"q_{current_q}"
-    
-    # Retrieve stored answer if it exists
-    current_answer = st.session_state.flyer_answers.get(option_key)
-    
-    selected_option = st.radio(
-        "Options:",
-        options=question['options'],
-        index=question['options'].index(current_answer) if current_answer else 0,
-        key=option_key
+
+    passage_actions(data, p_index)
+
+    save_progress(passage)
+
+# =========================
+# FRAGMENTS
+# =========================
+# Each blank is its own fragment, so picking an answer reruns just that
+# radio, and submitting reruns just the buttons and feedback -- not the
+# login bar, sidebar, passage and other blanks. Moving to another passage
+# or retrying reruns the whole app.
+@st.fragment
+def blank_choice(passage, q):
+    with profiling.rerun("flyer.blank"):
+        render_blank(passage, q)
+
+
+def render_blank(passage, q):
+    blank = q["blank"]
+    key = answer_key(passage, blank)
+
+    st.markdown(f"#### Blank ({blank})")
+
+    previous_answer = st.session_state.flyer_answers.get(key)
+
+    selected = st.radio(
+        label="Choose answer:",
+        options=q["options"],
+        index=q["options"].index(previous_answer)
+        if previous_answer in q["options"]
+        else None,
+        key=key,
+        on_change=mark_answered,
+        args=(key, passage)
     )
-    
-    st.write("---")
-    
-    # Store answer
-    st.session_state.flyer_answers[option_key] = selected_option
-    
-    # Navigation buttons
-    col1, col2, col3, col4 = st.columns(4)
-    
+
+    if selected:
+        st.session_state.flyer_answers[key] = selected
+
+
+@st.fragment
+def passage_actions(data, p_index):
+    with profiling.rerun("flyer.actions"):
+        render_actions(data, p_index)
+
+
+def render_actions(data, p_index):
+    """Navigation, submit and feedback of one passage"""
+    passage = data[p_index]
+
+    # ---------- NAVIGATION ----------
+    col1, col2, col3 = st.columns(3)
+
     with col1:
-        if st.button("⬅️ Previous", disabled=(current_q == 0)):
-            st.session_state.flyer_current_q -= 1
+        if st.button("⬅ Previous Passage", disabled=not st.session_state.flyer_history):
+            unpin_bank()
+            current = session_bank() or data
+            previous = current.index_of(st.session_state.flyer_history.pop())
+            st.session_state.flyer_passage_index = previous if previous is not None else 0
+            st.session_state.flyer_submitted = False
             st.rerun()
-    
+
+    # A passage view is recorded once: Submit stays off until Retry or
+    # another passage, and only takes a complete set of answers
     with col2:
-        if st.button("Next ➡️", disabled=(current_q == len(questions) - 1)):
-            st.session_state.flyer_current_q += 1
-            st.rerun()
-    
+        st.button("📤 Submit Answers", disabled=st.session_state.flyer_submitted,
+                  on_click=submit_passage, args=(data, passage))
+
     with col3:
-        if st.button("Jump to..."):
-            st.session_state.show_jump_dialog = True
-    
-    with col4:
-        if st.button("📤 Submit Answers"):
-            if len(st.session_state.flyer_answers) == len(questions):
-                st.session_state.flyer_submitted = True
-                st.rerun()
-            else:
-                st.warning(f"⚠️ Please answer all {len(questions)} questions before submitting")
-    
-    # Show jump dialog
-    if st.session_state.get("show_jump_dialog", False):
-        st.divider()
-        jump_q = st.selectbox(
-            "Jump to question:",
-            range(len(questions)),
-            format_func=lambda i: f"Question {i+1} (ID: {questions[i]['id']})"
-        )
-        if st.button("Go"):
-            st.session_state.flyer_current_q = jump_q
-            st.session_state.show_jump_dialog = False
+        if st.button("Next Passage ➡", disabled=(len(data) < 2)):
+            # Adaptive pick: the passage closest to the student's level,
+            # from the current bank version
+            unpin_bank()
+            current = session_bank() or data
+            engine = get_adaptive_engine("flyer", current)
+            student_id = st.session_state.get("student_id") or "anonymous"
+            st.session_state.flyer_history.append(passage["id"])
+            with profiling.section("adaptive.select"):
+                st.session_state.flyer_passage_index = engine.select(
+                    student_id, current=current.index_of(passage["id"]))
+            st.session_state.flyer_submitted = False
             st.rerun()
-    
-    # Show results if submitted
+
+    missing = st.session_state.pop("flyer_missing", None)
+    if missing:
+        st.warning(f"Answer every blank before submitting (missing: {', '.join(map(str, missing))})")
+
+    # ---------- FEEDBACK ----------
     if st.session_state.flyer_submitted:
-        st.divider()
-        show_results(questions)
+        with profiling.section("flyer.feedback"):
+            show_feedback(data, passage)
+
+
+def submit_passage(data, passage):
+    """Submit callback: runs before the buttons are redrawn, so Submit shows disabled at once"""
+    missing = unanswered(passage)
+    if missing:
+        st.session_state.flyer_missing = missing
+        return
+    if st.session_state.flyer_submitted:
+        return
+    record_submission(data, passage, grade_passage(data, passage))
+    st.session_state.flyer_submitted = True
+    save_progress(passage)
 
 # =========================
-# SHOW RESULTS
+# FEEDBACK
 # =========================
-def show_results(questions):
-    """Display results and feedback"""
-    
-    st.header("📊 Results & Feedback")
-    
-    score = 0
-    results = []
-    
-    for i, question in enumerate(questions):
-        user_answer = st.session_state.flyer_answers.get(f"q_{i}")
-        correct_answer = question['correct_answer']
-        is_correct = user_answer == correct_answer
-        
-        if is_correct:
-            score += 1
-        
-        results.append({
-            "question_id": question['id'],
-            "topic": question['topic'],
-            "user_answer": user_answer,
-            "correct_answer": correct_answer,
-            "is_correct": is_correct,
-            "error_type": question['error_type']
-        })
-    
-    # Store score
-    st.session_state.flyer_score = score
-    
-    # Show overall score
-    percentage = (score / len(questions)) * 100
-    
+def show_feedback(data, passage):
+    """Per-blank correctness and error type for the current passage"""
+
+    st.header("📊 Feedback")
+
+    results = grade_passage(data, passage)
+    total = len(results)
+    correct_count = 0
+
+    for r in results:
+
+        with st.expander(f"Blank {r['blank']}"):
+
+            if r["is_correct"]:
+                st.success("✅ Correct")
+                correct_count += 1
+            else:
+                st.error("❌ Incorrect")
+
+            st.write("Your answer:", r["user_answer"])
+            st.write("Correct answer:", r["correct_answer"])
+
+            if not r["is_correct"]:
+                # the chosen distractor's error_analysis category
+                st.write("Error type:", r["category"])
+            elif r["error_type"]:
+                st.write("Tests:", r["error_type"])
+
+    percentage = (correct_count / total) * 100
+
     if percentage >= 80:
-        st.success(f"🎉 Excellent! Score: {score}/{len(questions)} ({percentage:.0f}%)")
+        st.success(f"🎉 Excellent! Score: {correct_count}/{total} ({percentage:.0f}%)")
     elif percentage >= 60:
-        st.info(f"👍 Good job! Score: {score}/{len(questions)} ({percentage:.0f}%)")
+        st.info(f"👍 Good job! Score: {correct_count}/{total} ({percentage:.0f}%)")
     else:
-        st.warning(f"💪 Keep practicing! Score: {score}/{len(questions)} ({percentage:.0f}%)")
-    
-    st.divider()
-    
-    # Show detailed feedback for each question
-    st.subheader("Detailed Feedback")
-    
-    for idx, result in enumerate(results):
-        with st.expander(f"Question {idx + 1} (ID: {result['question_id']}) - {result['topic']}", 
-                        expanded=False):
-            
-            if result['is_correct']:
-                st.success("✅ Correct!")
-            else:
-                st.error("❌ Incorrect")
-            
-            st.write(f"**Your answer:** {result['user_answer']}")
-            st.write(f"**Correct answer:** {result['correct_answer']}")
-            st.write(f"**Error type:** {result['error_type']}")
-            
-            # Show the question again for reference
-            question = questions[idx]
-            st.write(f"**Passage:** {question['question_text'][:200]}...")
-    
-    st.divider()
-    
-    # Action buttons
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if st.button("🔄 Retake this practice"):
-            st.session_state.flyer_current_q = 0
-            st.session_state.flyer_answers = {}
-            st.session_state.flyer_submitted = False
-            st.session_state.flyer_score = None
-            st.rerun()
-    
-    with col2:
-        if st.button("📈 Back to Practice Menu"):
-            # This will be handled by main app
-            st.info("Redirecting to practice menu...")
+        st.warning(f"💪 Keep practicing! Score: {correct_count}/{total} ({percentage:.0f}%)")
+
+    if st.button("🔄 Retry", on_click=retry_passage, args=(passage,)):
+        # The blanks live in other fragments: redraw the whole passage
+        st.rerun()
+
+
+def retry_passage(passage):
+    """Clear answers for this passage only"""
+    for q in passage["questions"]:
+        key = answer_key(passage, q["blank"])
+        st.session_state.flyer_answers.pop(key, None)
+        st.session_state.flyer_answer_times.pop(key, None)
+        st.session_state.pop(key, None)
+
+    st.session_state.flyer_started_at.pop(passage["id"], None)
+    st.session_state.flyer_submitted = False
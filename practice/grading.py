@@ -0,0 +1,202 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# CATEGORIES
+# =========================
+UNANSWERED = "Unanswered"
+CORRECT = "Correct"
+UNCATEGORIZED = "Uncategorized"
+# codes 0..FIXED-1 are the three above; error categories follow
+FIXED = 3
+
+
+# =========================
+# ANSWER KEY
+# =========================
+class AnswerKey:
+    """
+    Integer-encoded answer key for one ItemBank version.
+
+    Blanks are rows (bank.blanks order) and options are small integer
+    codes (their index in the blank's option list, -1 = unanswered):
+
+        correct[row]             code of the right option
+        categories[cat[row, k]]  what picking option k means: "Correct",
+                                 the distractor's error_analysis type, or
+                                 "Unanswered" (column -1)
+
+    Grading any number of (row, choice) pairs is then two array lookups
+    and a comparison, for the feedback panel and offline re-grading alike.
+    groups[group_of[code]] rolls a category up to its taxonomy category,
+    so counting by either level is one np.bincount.
+    """
+
+    def __init__(self, bank):
+        blanks = bank.blanks
+        self.version = bank.version
+        self.blank_ids = tuple(b["id"] for b in blanks)
+        self.row_of = {blank_id: i for i, blank_id in enumerate(self.blank_ids)}
+        self._option_code = tuple({opt: k for k, opt in enumerate(b["options"])} for b in blanks)
+
+        width = max((len(b["options"]) for b in blanks), default=0)
+        categories = [UNANSWERED, CORRECT, UNCATEGORIZED]
+        # Banks with an error taxonomy already carry integer codes: category
+        # code = FIXED + error_code. Older banks intern their labels here.
+        taxonomy = bank.taxonomy
+        categories += [entry["label"] for entry in taxonomy]
+        code_of = {c: i for i, c in enumerate(categories)}
+
+        def category_code(record):
+            if taxonomy:
+                code = record.get("error_code")
+                return code_of[UNCATEGORIZED] if code is None else FIXED + code
+            name = (record.get("error_type") or "").strip() or UNCATEGORIZED
+            if name not in code_of:
+                code_of[name] = len(categories)
+                categories.append(name)
+            return code_of[name]
+
+        self.correct = np.full(len(blanks), -1, dtype=np.int16)
+        # one extra column, so choice -1 (unanswered) indexes it directly
+        self.cat = np.zeros((len(blanks), width + 1), dtype=np.int16)
+        for i, b in enumerate(blanks):
+            correct = self._option_code[i].get(b["correct_answer"], -1)
+            self.correct[i] = correct
+            for k, option in enumerate(b["options"]):
+                if k == correct:
+                    self.cat[i, k] = code_of[CORRECT]
+                else:
+                    analysis = b.get("error_analysis", {}).get(option) or {}
+                    self.cat[i, k] = category_code(analysis if analysis.get("error_type") else b)
+        self.categories = tuple(categories)
+        self._category_names = np.array(categories, dtype=object)
+
+        # category code -> group code: a taxonomy label's main category
+        # ("Collocation (Preposition)" -> "Collocation"), else itself
+        main = [UNANSWERED, CORRECT, UNCATEGORIZED]
+        main += [entry["category"] for entry in taxonomy] or categories[FIXED:]
+        self.groups = tuple(dict.fromkeys(main))
+        self.group_of = np.array([self.groups.index(name) for name in main], dtype=np.int16)
+        self._group_names = np.array(self.groups, dtype=object)
+
+        # (blank id, option text) lookup table for vectorized encoding
+        pairs = [(blank_id, option) for blank_id, codes in zip(self.blank_ids, self._option_code) for option in codes]
+        self._pair_index = pd.MultiIndex.from_tuples(pairs, names=["blank_id", "option"]) if pairs else None
+        self._pair_row = np.array([self.row_of[b] for b, _ in pairs], dtype=np.int64)
+        self._pair_code = np.array([c for codes in self._option_code for c in codes.values()], dtype=np.int16)
+
+    # ---------- encoding ----------
+    def rows(self, blank_ids):
+        """Rows of the given blank ids (-1 for ids not in this version)"""
+        return np.array([self.row_of.get(b, -1) for b in blank_ids], dtype=np.int64)
+
+    def encode(self, rows, chosen):
+        """Option codes for a few answers given as text (None / unknown -> -1)"""
+        return np.array(
+            [self._option_code[r].get(c, -1) if r >= 0 else -1 for r, c in zip(rows, chosen)],
+            dtype=np.int16
+        )
+
+    def encode_many(self, blank_ids, chosen):
+        """
+        (rows, option codes) for many (blank id, chosen text) pairs at
+        once, through one hash join instead of a Python loop.
+        """
+        if self._pair_index is None:
+            size = len(blank_ids)
+            return np.full(size, -1, dtype=np.int64), np.full(size, -1, dtype=np.int16)
+        found = self._pair_index.get_indexer(pd.MultiIndex.from_arrays([blank_ids, chosen]))
+        hit = found >= 0
+        codes = np.where(hit, self._pair_code[found], -1).astype(np.int16)
+        rows = np.where(hit, self._pair_row[found], -1)
+        # unanswered / unknown option on a known blank still needs its row
+        missing = ~hit
+        if missing.any():
+            ids = np.asarray(blank_ids, dtype=object)[missing]
+            rows[missing] = self.rows(ids)
+        return rows, codes
+
+    # ---------- grading ----------
+    def grade(self, rows, choices):
+        """
+        Grade arrays of rows and option codes.
+        Returns (is_correct bool array, category code array); rows of -1
+        (blank not in this version) grade as wrong and "Uncategorized".
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        choices = np.asarray(choices, dtype=np.int64)
+        known = rows >= 0
+        safe_rows = np.where(known, rows, 0)
+        is_correct = known & (choices >= 0) & (choices == self.correct[safe_rows])
+        category = self.cat[safe_rows, choices]
+        if not known.all():
+            category = np.where(known, category, self.categories.index(UNCATEGORIZED))
+        return is_correct, category
+
+    def category_names(self, codes):
+        return self._category_names[np.asarray(codes)]
+
+    # ---------- analytics ----------
+    def group_names(self, codes):
+        """Main category ("Collocation") of category codes"""
+        return self._group_names[self.group_of[np.asarray(codes)]]
+
+    def category_counts(self, codes, by_group=False):
+        """Number of answers per category (or main category), most frequent first"""
+        codes = np.asarray(codes, dtype=np.int64)
+        names = self._category_names
+        if by_group:
+            codes, names = self.group_of[codes], self._group_names
+        counts = pd.Series(np.bincount(codes, minlength=len(names)), index=names)
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+
+# =========================
+# SHARED KEYS
+# =========================
+_keys = {}  # bank path -> AnswerKey of the version last asked for
+_keys_lock = threading.Lock()
+
+
+def answer_key(bank):
+    """The AnswerKey of a bank version, built once per process; a new version replaces the old one"""
+    key = _keys.get(bank.path)
+    if key is None or key.version != bank.version:
+        with _keys_lock:
+            key = _keys.get(bank.path)
+            if key is None or key.version != bank.version:
+                key = _keys[bank.path] = AnswerKey(bank)
+    return key
+
+
+# =========================
+# OFFLINE RE-GRADING
+# =========================
+def regrade_attempts(log, bank, task):
+    """
+    Re-grade every stored attempt of a task against `bank` (e.g. after an
+    answer-key fix). Returns a DataFrame with the attempt id, student,
+    blank, the stored and new correctness and the new category (and its
+    main category, "group"); rows where "changed" is True are the ones
+    the fix affects.
+    """
+    log.flush()
+    with log.connection() as conn:
+        attempts = pd.read_sql_query(
+            "SELECT id, student_id, blank_id, chosen, correct FROM attempts WHERE task = ? ORDER BY id",
+            conn, params=(task,)
+        )
+
+    key = answer_key(bank)
+    rows, choices = key.encode_many(attempts["blank_id"].to_numpy(object), attempts["chosen"].to_numpy(object))
+    is_correct, category = key.grade(rows, choices)
+
+    attempts = attempts.rename(columns={"correct": "was_correct"})
+    attempts["correct"] = is_correct.astype(np.int64)
+    attempts["category"] = key.category_names(category)
+    attempts["group"] = key.group_names(category)
+    attempts["changed"] = attempts["correct"] != attempts["was_correct"]
+    return attempts
@@ -0,0 +1,12 @@
+import streamlit as st
+
+# Registry metadata (see practice.tasks)
+TASK = {
+    "key": "info_gap",
+    "entry": "info_gap_task",
+}
+
+
+def info_gap_task():
+    st.subheader("🧩 Information Gap Completion")
+    st.info("Info-gap task goes here")
@@ -0,0 +1,525 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+from devtools import profiling
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# PATHS
+# =========================
+CONVERTED_DIR = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "data",
+    "converted data"
+)
+
+
+def bank_path(filename):
+    """Absolute path of an item bank inside data/converted data"""
+    return os.path.abspath(os.path.join(CONVERTED_DIR, filename))
+
+
+# Both converters write "format" as the first key of a bank
+FORMAT_RE = re.compile(rb'^\s*\{\s*"format"\s*:\s*"([^"]*)"')
+
+
+def bank_files(fmt="passage-blank/1"):
+    """File names of the JSON banks of one format in data/converted data"""
+    names = []
+    for name in sorted(os.listdir(CONVERTED_DIR)):
+        if not name.endswith(".json") or name.endswith(".manifest.json"):
+            continue
+        with open(os.path.join(CONVERTED_DIR, name), "rb") as f:
+            match = FORMAT_RE.match(f.read(256))
+        if match and match.group(1).decode() == fmt:
+            names.append(name)
+    return names
+
+
+# =========================
+# ITEM BANK
+# =========================
+def _freeze(value):
+    """Recursively turn parsed JSON into read-only dicts and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ItemBank:
+    """
+    Immutable, process-wide view of one converted item bank.
+
+    One instance is shared by every Streamlit session, so sessions only
+    keep an index and their own answers in st.session_state.
+
+    Banks use the normalized passage/blank layout written by the
+    converters: each passage is stored once and references its blanks by
+    id. On load every passage gets a "questions" tuple pointing at the
+    same blank objects, so nothing is copied.
+
+    taxonomy is the bank's error_taxonomy table: entry `error_code` of a
+    blank (or error_analysis entry) describes its normalized error label.
+    Empty for banks converted before the table existed.
+    """
+
+    __slots__ = ("path", "version", "task", "taxonomy", "passages", "blanks",
+                 "_passage_by_id", "_blank_by_id")
+
+    def __init__(self, path, version, data):
+        if not isinstance(data, dict) or "passages" not in data or "blanks" not in data:
+            raise ValueError(f"{path} is not a passage/blank item bank")
+
+        # a bank that parses but does not hold together is malformed too
+        try:
+            blanks = _freeze(data["blanks"])
+            blank_by_id = {blank["id"]: blank for blank in blanks}
+            passages = []
+            for passage in data["passages"]:
+                missing = [b for b in passage["blank_ids"] if b not in blank_by_id]
+                if missing:
+                    raise ValueError(f"{path}: passage {passage['id']} lists unknown blanks {missing}")
+                passages.append(MappingProxyType({
+                    **{k: _freeze(v) for k, v in passage.items()},
+                    "questions": tuple(blank_by_id[b] for b in passage["blank_ids"])
+                }))
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"{path} is not a passage/blank item bank: {type(e).__name__} {e}") from e
+        passages = tuple(passages)
+
+        self.path = path
+        self.version = version
+        self.task = data.get("task")
+        self.taxonomy = _freeze(data.get("error_taxonomy") or [])
+        self.passages = passages
+        self.blanks = blanks
+        self._passage_by_id = MappingProxyType({p["id"]: i for i, p in enumerate(passages)})
+        self._blank_by_id = MappingProxyType(blank_by_id)
+
+    def __len__(self):
+        return len(self.passages)
+
+    def __getitem__(self, index):
+        return self.passages[index]
+
+    def __iter__(self):
+        return iter(self.passages)
+
+    def index_of(self, passage_id):
+        """Position of a passage by id, or None if it is not in this version"""
+        return self._passage_by_id.get(passage_id)
+
+    def blank(self, blank_id):
+        """Blank by id (e.g. "2.4"), or None"""
+        return self._blank_by_id.get(blank_id)
+
+
+# =========================
+# MEMORY-MAPPED ITEM BANK
+# =========================
+# Written by data/converted data/binary_bank.py next to the JSON bank
+BINARY_FORMAT = "passage-blank-bin/1"
+BINARY_MAGIC = b"ITEMBANK"
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def binary_path_for(path):
+    """flyer_gap-fill.json -> flyer_gap-fill.bank"""
+    root, _ = os.path.splitext(path)
+    return root + ".bank"
+
+
+class _LazyRows:
+    """Read-only sequence whose rows are built on first access and kept"""
+
+    __slots__ = ("_rows", "_build")
+
+    def __init__(self, count, build):
+        self._rows = [None] * count
+        self._build = build
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self._rows))))
+        row = self._rows[index]
+        if row is None:
+            # a race only builds an equal row twice
+            row = self._rows[index] = self._build(range(len(self._rows))[index])
+        return row
+
+    def __iter__(self):
+        for i in range(len(self._rows)):
+            yield self[i]
+
+
+def _read_header(path, buffer):
+    if len(buffer) < len(BINARY_MAGIC) + 4 or buffer[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError(f"{path} is not a binary item bank")
+    (size,) = struct.unpack_from("<I", buffer, len(BINARY_MAGIC))
+    start = len(BINARY_MAGIC) + 4
+    header = json.loads(buffer[start:start + size].decode("utf-8"))
+    if header.get("format") != BINARY_FORMAT:
+        raise ValueError(f"{path} has unsupported format {header.get('format')!r}")
+    return header
+
+
+class MappedItemBank(ItemBank):
+    """
+    ItemBank backed by a read-only mmap of the binary bank file.
+
+    Opening it reads the small header only. Passages and blanks are
+    decoded from the mapped arrays the first time they are used and then
+    kept, so they are the same kind of read-only dicts as ItemBank's and
+    one blank object is shared by bank.blank() and its passage. Because
+    the pages belong to the OS page cache, every worker process mapping
+    the same file shares one copy of the bank.
+
+    version is the sha256 of the JSON bank the file was built from, so
+    attempts, answer keys and engines see the same version either way.
+    """
+
+    __slots__ = ("_mmap", "_arrays", "_strings_at", "_entries", "_lookup_lock")
+
+    def __init__(self, path, buffer):
+        header = _read_header(path, buffer)
+
+        # memoryview casts index as plain ints, far cheaper than NumPy scalars
+        if sys.byteorder != "little":
+            raise ValueError(f"{path}: binary banks are little-endian")
+        view = memoryview(buffer)
+        arrays = {}
+        for name, (offset, dtype, count) in header["sections"].items():
+            dtype = np.dtype(dtype)
+            if offset + dtype.itemsize * count > len(buffer):
+                raise ValueError(f"{path} is truncated (section {name})")
+            arrays[name] = view[offset:offset + dtype.itemsize * count].cast(dtype.char)
+
+        self.path = path
+        self.version = header["source_sha256"]
+        self.task = header.get("task")
+        self.taxonomy = _freeze(header.get("error_taxonomy") or [])
+        self._mmap = buffer
+        self._arrays = arrays
+        self._strings_at = header["sections"]["strings"][0]
+        self._entries = None
+        self._lookup_lock = threading.Lock()
+        self.blanks = _LazyRows(header["blanks"], self._build_blank)
+        self.passages = _LazyRows(header["passages"], self._build_passage)
+        # id -> row lookups are built on first use
+        self._passage_by_id = None
+        self._blank_by_id = None
+
+    # ---------- decoding ----------
+    def _string(self, k):
+        if k < 0:
+            return None
+        offsets = self._arrays["string_offsets"]
+        return self._mmap[self._strings_at + offsets[k]:self._strings_at + offsets[k + 1]].decode("utf-8")
+
+    def _error_entries(self):
+        """Shared read-only {"error_type"[, "error_code"]} dicts, indexed by category number + 1"""
+        if self._entries is None:
+            names = (None,) + tuple(self._string(k) for k in self._arrays["category_name"])
+            if self.taxonomy:
+                entries = tuple(
+                    MappingProxyType({"error_type": name, "error_code": code if code >= 0 else None})
+                    for code, name in enumerate(names, -1)
+                )
+            else:
+                entries = tuple(MappingProxyType({"error_type": name}) for name in names)
+            self._entries = entries
+        return self._entries
+
+    def _build_blank(self, i):
+        a = self._arrays
+        string = self._string
+        entries = self._error_entries()
+        first, last = a["blank_options_start"][i], a["blank_options_start"][i + 1]
+        options = tuple(string(k) for k in a["option_text"][first:last])
+        correct = a["blank_correct"][i]
+        analysis = {
+            option: entries[code + 1]
+            for option, code in zip(options, a["option_category"][first:last])
+            if code != -2
+        }
+        blank = {
+            "id": string(a["blank_id"][i]),
+            "passage_id": string(a["passage_id"][a["blank_passage"][i]]),
+            "blank": a["blank_number"][i],
+            "options": options,
+            "correct_answer": options[correct],
+            "correct_letter": LETTERS[correct],
+            **entries[a["blank_error_type"][i] + 1],
+            "error_analysis": MappingProxyType(analysis),
+        }
+        return MappingProxyType(blank)
+
+    def _build_passage(self, i):
+        a = self._arrays
+        first, last = a["passage_blanks_start"][i], a["passage_blanks_start"][i + 1]
+        questions = tuple(self.blanks[j] for j in a["passage_blanks"][first:last])
+        return MappingProxyType({
+            "id": self._string(a["passage_id"][i]),
+            "topic": self._string(a["passage_topic"][i]),
+            "passage_text": self._string(a["passage_text"][i]),
+            "blank_ids": tuple(q["id"] for q in questions),
+            "questions": questions,
+        })
+
+    def _ids(self, section):
+        return {self._string(k): i for i, k in enumerate(self._arrays[section])}
+
+    # ---------- lookups ----------
+    def index_of(self, passage_id):
+        if self._passage_by_id is None:
+            with self._lookup_lock:
+                if self._passage_by_id is None:
+                    self._passage_by_id = MappingProxyType(self._ids("passage_id"))
+        return self._passage_by_id.get(passage_id)
+
+    def blank(self, blank_id):
+        if self._blank_by_id is None:
+            with self._lookup_lock:
+                if self._blank_by_id is None:
+                    self._blank_by_id = MappingProxyType(self._ids("blank_id"))
+        i = self._blank_by_id.get(blank_id)
+        return self.blanks[i] if i is not None else None
+
+
+def open_mapped_bank(path, version=None):
+    """
+    Map a binary bank read-only. With `version` (the sha256 of the JSON
+    bank), return None unless the file was built from exactly that JSON.
+    Raises FileNotFoundError, and ValueError for files that are not
+    binary banks.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    bank = MappedItemBank(path, buffer)
+    if version is not None and bank.version != version:
+        return None
+    return bank
+
+
+class ReorderBank:
+    """
+    Immutable view of a reordering bank ("reorder/1"): items whose
+    segments are stored in the correct order. Shared like ItemBank.
+    """
+
+    __slots__ = ("path", "version", "task", "items", "_item_by_id")
+
+    def __init__(self, path, version, data):
+        if not isinstance(data, dict) or data.get("format") != "reorder/1" or "items" not in data:
+            raise ValueError(f"{path} is not a reordering item bank")
+
+        self.path = path
+        self.version = version
+        self.task = data.get("task")
+        self.items = _freeze(data["items"])
+        try:
+            self._item_by_id = MappingProxyType({item["id"]: i for i, item in enumerate(self.items)})
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"{path} is not a reordering item bank: {type(e).__name__} {e}") from e
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def index_of(self, item_id):
+        return self._item_by_id.get(item_id)
+
+
+# =========================
+# PROCESS-WIDE CACHE
+# =========================
+# (JSON path, kind) -> (stamp, bank): one entry per class a file is opened as
+_banks = {}
+_lock = threading.Lock()
+
+
+def _stamp(path):
+    """(mtime, size) of a JSON bank and of its .bank twin (None if there is none)"""
+    stat = os.stat(path)
+    try:
+        twin = os.stat(binary_path_for(path))
+        twin_stamp = (twin.st_mtime_ns, twin.st_size)
+    except OSError:
+        twin_stamp = None
+    return stat.st_mtime_ns, stat.st_size, twin_stamp
+
+
+def load_item_bank(path, kind=ItemBank):
+    """
+    Return the shared bank (an ItemBank, or `kind`) for a JSON file.
+
+    Without a BankWatcher, a cheap os.stat() is done on every call. The
+    file is only re-read when its mtime or size changes, and only
+    re-parsed when its content hash changes, so touching the file does not
+    create a new copy. Once watch_item_banks() runs, a loaded bank is
+    returned as is and new versions are swapped in by the watcher.
+    If the converter left an up-to-date binary bank next to the JSON
+    file, it is memory-mapped instead of parsing the JSON (see
+    MappedItemBank).
+    Raises FileNotFoundError / json.JSONDecodeError like json.load would,
+    and ValueError for files that are not passage/blank banks.
+    """
+    path = os.path.abspath(path)
+    cached = _banks.get((path, kind))
+    if cached is not None and _watcher is not None:
+        profiling.count("item_bank.hit")
+        return cached[1]
+
+    stamp = _stamp(path)
+    if cached is not None and cached[0] == stamp:
+        profiling.count("item_bank.hit")
+        return cached[1]
+
+    with _lock:
+        cached = _banks.get((path, kind))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        return _load(path, kind, stamp)
+
+
+def _load(path, kind, stamp):
+    """Read, hash and (re)build one bank into the cache; caller holds _lock"""
+    cached = _banks.get((path, kind))
+    with open(path, "rb") as f:
+        raw = f.read()
+    version = hashlib.sha256(raw).hexdigest()
+
+    bank = None
+    if cached is not None and cached[1].version == version:
+        bank = cached[1]
+        profiling.count("item_bank.touched")
+    if kind is ItemBank and not isinstance(bank, MappedItemBank):
+        # a .bank written after the JSON replaces the parsed copy (same version)
+        bank = _mapped_twin(path, version) or bank
+    if bank is None:
+        with profiling.section("item_bank.parse"):
+            bank = kind(path, version, json.loads(raw.decode("utf-8")))
+
+    _banks[(path, kind)] = (stamp, bank)
+    return bank
+
+
+def _mapped_twin(path, version):
+    """The binary bank built from this exact JSON file, or None"""
+    try:
+        with profiling.section("item_bank.map"):
+            return open_mapped_bank(binary_path_for(path), version)
+    except (OSError, ValueError):
+        # missing, unreadable or foreign file: the JSON is the source of truth
+        return None
+
+
+# =========================
+# BACKGROUND RELOAD
+# =========================
+# Seconds between checks of the loaded banks' files (0 = no watcher:
+# every load_item_bank() call stats the file instead)
+WATCH_INTERVAL = float(os.environ.get("BANK_WATCH_INTERVAL", "2"))
+
+
+class BankWatcher:
+    """
+    Reloads changed item banks in a daemon thread.
+
+    Every `interval` seconds it stats the files of every loaded bank. A
+    change is acted on once the files have stayed the same for one more
+    tick (a converter writes the JSON, then its .bank), and the new
+    version is then built here and swapped into the cache with a single
+    dict assignment. Requests keep getting the previous version until
+    that moment and never stat, read or parse anything themselves, so a
+    content fix costs one load per process however many sessions are
+    active. A bank that fails to load is reported and the previous
+    version keeps being served until the file changes again.
+
+    Sessions that must not change version mid-task keep a reference to
+    the bank they started with (see flyer_completion.session_bank).
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.reloads = 0
+        # (path, kind) -> changed stamp seen on the previous tick
+        self._pending = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="item-bank-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # one bad pass must not end reloading for the process
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Item bank check failed")
+
+    def check(self):
+        """One pass over the loaded banks"""
+        for (path, kind), (stamp, bank) in list(_banks.items()):
+            try:
+                current = _stamp(path)
+            except OSError:
+                # removed or being replaced: keep serving what we have
+                continue
+            key = (path, kind)
+            if current == stamp:
+                self._pending.pop(key, None)
+                continue
+            if self._pending.get(key) != current:
+                self._pending[key] = current
+                continue
+            del self._pending[key]
+
+            try:
+                with _lock:
+                    _load(path, kind, current)
+                self.reloads += 1
+            except (OSError, ValueError) as e:
+                logger.warning("Keeping %s (%s): %s", os.path.basename(path), bank.version[:12], e)
+                with _lock:
+                    _banks[key] = (current, bank)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def watch_item_banks(interval=WATCH_INTERVAL):
+    """Start this process's BankWatcher (once); None if reloading is disabled"""
+    global _watcher
+    if _watcher is None and interval > 0:
+        with _watcher_lock:
+            if _watcher is None:
+                _watcher = BankWatcher(interval)
+    return _watcher
@@ -0,0 +1,12 @@
+import streamlit as st
+
+# Registry metadata (see practice.tasks)
+TASK = {
+    "key": "notice",
+    "entry": "notice_task",
+}
+
+
+def notice_task():
+    st.subheader("📢 Notice Completion")
+    st.info("Notice task goes here")
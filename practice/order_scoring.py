@@ -0,0 +1,174 @@
+from bisect import bisect_left
+
+import numpy as np
+
+# =========================
+# RUBRICS
+# =========================
+# An order is the list of segment indices a student produced, where
+# segment i belongs at position i (so the correct answer is 0, 1, ..., n-1).
+#
+#   "lis"      (longest run of segments in the right relative order - 1) / (n - 1)
+#   "kendall"  1 - (pairs in the wrong relative order) / (n * (n - 1) / 2)
+#
+# Both are 1.0 for the correct order and 0.0 for the reversed one.
+RUBRICS = ("lis", "kendall")
+DEFAULT_RUBRIC = "lis"
+
+
+def _check_rubric(rubric):
+    if rubric not in RUBRICS:
+        raise ValueError(f"Unknown rubric '{rubric}', expected one of {RUBRICS}")
+
+
+# =========================
+# ONE ORDER
+# =========================
+def lis_length(order):
+    """Longest increasing subsequence, O(n log n) patience sorting"""
+    tails = []
+    for x in order:
+        i = bisect_left(tails, x)
+        if i == len(tails):
+            tails.append(x)
+        else:
+            tails[i] = x
+    return len(tails)
+
+
+def inversions(order):
+    """Pairs out of order (Kendall-tau distance to 0..n-1), O(n log n) Fenwick tree"""
+    n = len(order)
+    tree = [0] * (n + 1)
+    count = 0
+    for seen, x in enumerate(order):
+        # earlier values greater than x
+        i, smaller = x + 1, 0
+        while i > 0:
+            smaller += tree[i]
+            i -= i & -i
+        count += seen - smaller
+        i = x + 1
+        while i <= n:
+            tree[i] += 1
+            i += i & -i
+    return count
+
+
+def in_order_positions(order):
+    """Indices (into order) of one longest run in the right relative order"""
+    tails, tail_at, parent = [], [], [-1] * len(order)
+    for j, x in enumerate(order):
+        i = bisect_left(tails, x)
+        if i:
+            parent[j] = tail_at[i - 1]
+        if i == len(tails):
+            tails.append(x)
+            tail_at.append(j)
+        else:
+            tails[i] = x
+            tail_at[i] = j
+    positions = []
+    j = tail_at[-1] if tail_at else -1
+    while j != -1:
+        positions.append(j)
+        j = parent[j]
+    return positions[::-1]
+
+
+def score_order(order, rubric=DEFAULT_RUBRIC):
+    """Partial credit in [0, 1] for one order"""
+    _check_rubric(rubric)
+    n = len(order)
+    if n < 2:
+        return 1.0
+    if rubric == "lis":
+        return (lis_length(order) - 1) / (n - 1)
+    return 1.0 - inversions(order) / (n * (n - 1) / 2)
+
+
+# =========================
+# BATCH (WHOLE COHORT)
+# =========================
+def lis_lengths(orders):
+    """
+    LIS of every row of an (m, n) array of permutations. Patience sorting
+    run on all rows at once: n steps, each a branch-free binary search of
+    log n NumPy operations - O(n log n) per row, no Python loop over rows.
+    """
+    m, n = orders.shape
+    if n == 0:
+        return np.zeros(m, dtype=np.int64)
+    orders = orders.astype(np.int64, copy=False)
+    # Pad each row's tails to a power of two with the sentinel n (larger
+    # than any value), so the search needs no bounds or length checks.
+    width = 1 << n.bit_length()
+    base = np.arange(m, dtype=np.int64) * width - 1
+    tails = np.full(m * width, n, dtype=np.int64)
+    for j in range(n):
+        x = orders[:, j]
+        pos = np.zeros(m, dtype=np.int64)         # becomes the lower bound of x
+        step = width >> 1
+        while step:
+            pos += step * (tails[base + pos + step] < x)
+            step >>= 1
+        tails[base + 1 + pos] = x
+    return (tails.reshape(m, width) < n).sum(axis=1)
+
+
+def inversion_counts(orders):
+    """Inversions of every row of an (m, n) array, one Fenwick tree per row, updated together"""
+    m, n = orders.shape
+    width = n + 1
+    base = np.arange(m, dtype=np.int64) * width
+    tree = np.zeros(m * width, dtype=np.int64)    # row-major (m, n + 1); column 0 stays 0
+    counts = np.zeros(m, dtype=np.int64)
+    for seen in range(n):
+        x = orders[:, seen].astype(np.int64) + 1
+        # prefix sum: how many earlier values are smaller than x
+        i, smaller = x, np.zeros(m, dtype=np.int64)
+        while True:
+            smaller += tree[base + i]
+            i = i & (i - 1)
+            if not i.any():
+                break
+        counts += seen - smaller
+        # insert x (one index per row, so plain fancy-index += is safe)
+        i = x
+        while True:
+            live = i <= n
+            if not live.any():
+                break
+            tree[base[live] + i[live]] += 1
+            i = np.where(live, i + (i & -i), i)
+    return counts
+
+
+def score_orders(orders, rubric=DEFAULT_RUBRIC):
+    """
+    Partial credit for many orders at once (e.g. re-scoring every
+    historical attempt after a rubric change). `orders` is an (m, n)
+    int array or a list of sequences of any lengths; rows of the same
+    length are scored together. Returns a float array of m scores.
+    """
+    _check_rubric(rubric)
+    if isinstance(orders, np.ndarray) and orders.ndim == 2:
+        groups = {orders.shape[1]: (np.arange(len(orders)), orders)}
+    else:
+        by_length = {}
+        for k, order in enumerate(orders):
+            by_length.setdefault(len(order), []).append(k)
+        groups = {
+            n: (np.array(idx), np.array([orders[k] for k in idx], dtype=np.int64).reshape(len(idx), n))
+            for n, idx in by_length.items()
+        }
+
+    scores = np.ones(sum(len(idx) for idx, _ in groups.values()), dtype=np.float64)
+    for n, (idx, block) in groups.items():
+        if n < 2:
+            continue
+        if rubric == "lis":
+            scores[idx] = (lis_lengths(block) - 1) / (n - 1)
+        else:
+            scores[idx] = 1.0 - inversion_counts(block) / (n * (n - 1) / 2)
+    return scores
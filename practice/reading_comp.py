@@ -0,0 +1,12 @@
+import streamlit as st
+
+# Registry metadata (see practice.tasks)
+TASK = {
+    "key": "reading",
+    "entry": "reading_task",
+}
+
+
+def reading_task():
+    st.subheader("📘 Reading Comprehension")
+    st.info("Reading task goes here")
@@ -0,0 +1,214 @@
+import json
+import random
+import string
+import time
+
+import streamlit as st
+
+from practice.item_bank import ReorderBank, bank_path, load_item_bank
+from practice.order_scoring import DEFAULT_RUBRIC, in_order_positions, score_order, score_orders
+from storage.attempts import get_attempt_log, make_event
+
+REORDER_BANK = "reorder_text.json"
+
+# Registry metadata (see practice.tasks)
+TASK = {
+    "key": "reorder",
+    "entry": "reorder_task",
+}
+
+# =========================
+# LOAD DATA
+# =========================
+def load_reorder_data():
+    """Return the shared reordering bank (parsed once per process)"""
+    json_path = bank_path(REORDER_BANK)
+
+    try:
+        return load_item_bank(json_path, kind=ReorderBank)
+    except FileNotFoundError:
+        st.error(f"❌ Could not find data file at {json_path}")
+        return None
+    except (json.JSONDecodeError, ValueError):
+        st.error("❌ Error reading JSON file")
+        return None
+
+# =========================
+# INITIALIZE SESSION STATE
+# =========================
+def init_session():
+    if "reorder_index" not in st.session_state:
+        st.session_state.reorder_index = 0
+
+    if "reorder_submitted" not in st.session_state:
+        st.session_state.reorder_submitted = False
+
+    # item id -> time first shown
+    if "reorder_started_at" not in st.session_state:
+        st.session_state.reorder_started_at = {}
+
+
+def scrambled(item):
+    """Display order of an item's segments: fixed per item, never the answer itself"""
+    n = len(item["segments"])
+    order = random.Random(item["id"]).sample(range(n), n)
+    if n > 1 and order == sorted(order):
+        order = order[1:] + order[:1]
+    return order
+
+
+def choice_key(item):
+    return f"reorder_{item['id']}"
+
+
+def record_submission(data, item, order):
+    now = time.time()
+    started = st.session_state.reorder_started_at.get(item["id"], now)
+    get_attempt_log().record([make_event(
+        student_id=st.session_state.get("student_id") or "anonymous",
+        task="reorder",
+        bank_version=data.version,
+        passage_id=item["id"],
+        blank_id=item["id"],
+        topic=item.get("topic"),
+        # the submitted order, so attempts can be re-scored under a new rubric
+        chosen=",".join(map(str, order)),
+        correct=order == sorted(order),
+        error_type=item.get("error_type"),
+        latency_ms=(now - started) * 1000,
+        ts=now,
+    )])
+
+# =========================
+# REORDERING TASK
+# =========================
+def reorder_task():
+    """Put the sentences of a short text back in order"""
+
+    init_session()
+
+    data = load_reorder_data()
+
+    if not data:
+        st.warning("No reordering data found")
+        return
+
+    index = min(st.session_state.reorder_index, len(data) - 1)
+    item = data[index]
+    st.session_state.reorder_started_at.setdefault(item["id"], time.time())
+
+    st.subheader("🔀 Reordering Text")
+    st.write("Click the sentences in the order that makes a complete, logical text.")
+
+    st.write(f"### Topic: {item['topic']}")
+    st.caption(f"Text {index + 1}/{len(data)}")
+
+    for letter, i in zip(string.ascii_uppercase, scrambled(item)):
+        st.write(f"**{letter}.** {item['segments'][i]}")
+
+    st.divider()
+
+    reorder_answer(data, index)
+
+
+@st.fragment
+def reorder_answer(data, index):
+    """Order picker, navigation and feedback (reruns on its own while ordering)"""
+    item = data[index]
+    letters = dict(zip(scrambled(item), string.ascii_uppercase))
+
+    order = st.multiselect(
+        "Your order",
+        options=scrambled(item),
+        format_func=lambda i: f"{letters[i]}. {item['segments'][i]}",
+        key=choice_key(item),
+        placeholder="Choose the first sentence"
+    )
+    n = len(item["segments"])
+    st.caption(f"{len(order)}/{n} placed: " + " → ".join(letters[i] for i in order))
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        if st.button("⬅ Previous Text", disabled=(index == 0)):
+            st.session_state.reorder_index = index - 1
+            st.session_state.reorder_submitted = False
+            st.rerun()
+
+    # An order is recorded once: Submit stays off until Retry or another
+    # text, and only takes a complete order
+    with col2:
+        st.button("📤 Submit Order", disabled=(len(order) != n or st.session_state.reorder_submitted),
+                  on_click=submit_order, args=(data, item))
+
+    with col3:
+        if st.button("Next Text ➡", disabled=(index == len(data) - 1)):
+            st.session_state.reorder_index = index + 1
+            st.session_state.reorder_submitted = False
+            st.rerun()
+
+    if st.session_state.reorder_submitted and len(order) == n:
+        show_feedback(item, order, letters)
+
+
+def submit_order(data, item):
+    """Submit callback: runs before the buttons are redrawn, so Submit shows disabled at once"""
+    order = st.session_state.get(choice_key(item)) or []
+    if st.session_state.reorder_submitted or len(order) != len(item["segments"]):
+        return
+    record_submission(data, item, order)
+    st.session_state.reorder_submitted = True
+
+# =========================
+# FEEDBACK
+# =========================
+def show_feedback(item, order, letters):
+    st.header("📊 Feedback")
+
+    score = score_order(order, DEFAULT_RUBRIC)
+    if score == 1.0:
+        st.success("🎉 Perfect order!")
+    elif score >= 0.6:
+        st.info(f"👍 Nearly there! Score: {score * 100:.0f}%")
+    else:
+        st.warning(f"💪 Keep practicing! Score: {score * 100:.0f}%")
+
+    # Sentences in the longest run of correct relative order are kept
+    kept = set(in_order_positions(order))
+    st.write("Your order:")
+    for j, i in enumerate(order):
+        mark = "✅" if j in kept else "↕️"
+        st.write(f"{mark} **{letters[i]}.** {item['segments'][i]}")
+
+    st.write("Correct order:", " → ".join(letters[i] for i in range(len(order))))
+
+    if st.button("🔄 Retry", on_click=retry_item, args=(item,)):
+        st.rerun()
+
+
+def retry_item(item):
+    st.session_state.pop(choice_key(item), None)
+    st.session_state.reorder_started_at.pop(item["id"], None)
+    st.session_state.reorder_submitted = False
+
+# =========================
+# RE-SCORING
+# =========================
+def rescore_attempts(log, rubric=DEFAULT_RUBRIC):
+    """
+    Score every stored reordering attempt under `rubric` in one batch.
+    Returns [{"ts", "student_id", "item_id", "score"}], oldest first.
+    """
+    log.flush()
+    with log.connection() as conn:
+        rows = conn.execute(
+            "SELECT ts, student_id, passage_id, chosen FROM attempts"
+            " WHERE task = 'reorder' AND chosen IS NOT NULL ORDER BY id"
+        ).fetchall()
+
+    orders = [[int(x) for x in chosen.split(",")] for _, _, _, chosen in rows]
+    scores = score_orders(orders, rubric)
+    return [
+        {"ts": ts, "student_id": student_id, "item_id": item_id, "score": float(score)}
+        for (ts, student_id, item_id, _), score in zip(rows, scores)
+    ]
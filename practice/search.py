@@ -0,0 +1,225 @@
+import bisect
+import re
+import threading
+
+import numpy as np
+
+# =========================
+# QUERY SYNTAX
+# =========================
+# Clauses are separated by spaces and must all match (AND):
+#
+#   make               any field contains the word "make"
+#   distractor:make/do a wrong option contains "make" or "do" (OR)
+#   error:colloc*      an error label word starts with "colloc"
+#   -topic:campus      leave out passages whose topic contains "campus"
+#
+# Fields: text (passage), topic, option (any option), answer (the
+# correct option), distractor (a wrong option), error (the blank's error
+# label and its distractors' labels). Matching is on lower-cased words.
+FIELDS = ("text", "topic", "option", "answer", "distractor", "error")
+PASSAGE_FIELDS = ("text", "topic")
+FIELD_ALIASES = {"passage": "text", "options": "option", "category": "error", "error_type": "error"}
+
+WORD_RE = re.compile(r"\w+")
+UNCATEGORIZED = "Uncategorized"
+
+
+def words(text):
+    return WORD_RE.findall(str(text).lower()) if text else []
+
+
+# =========================
+# SEARCH INDEX
+# =========================
+class SearchIndex:
+    """
+    Inverted index over one ItemBank version, for the authoring view.
+
+    For every field, word -> sorted array of rows: passage rows for
+    passage text and topic, blank rows for the rest. A query is then a few
+    posting lookups turned into one boolean mask over the bank's blanks
+    (passage matches are spread to their blanks through passage_of), so
+    its cost depends on the postings touched and a handful of vectorized
+    passes over the blanks, never on re-reading text. Facet counts per
+    topic and error category are np.bincount over the matching rows.
+    """
+
+    def __init__(self, bank):
+        passages = bank.passages
+        blanks = bank.blanks
+        self.version = bank.version
+        self.n_blanks = len(blanks)
+        self.n_passages = len(passages)
+        passage_index = {p["id"]: i for i, p in enumerate(passages)}
+        self.passage_of = np.array([passage_index[b["passage_id"]] for b in blanks], dtype=np.int64)
+
+        # ---------- facets ----------
+        topics = sorted({(p.get("topic") or "").strip() for p in passages})
+        topic_code = {t: i for i, t in enumerate(topics)}
+        self.topics = tuple(topics)
+        passage_topic = np.array([topic_code[(p.get("topic") or "").strip()] for p in passages], dtype=np.int64)
+        self.topic_of = passage_topic[self.passage_of]
+
+        taxonomy = bank.taxonomy
+
+        def category(record):
+            if taxonomy and record.get("error_code") is not None:
+                return taxonomy[record["error_code"]]["category"]
+            return (record.get("error_type") or "").strip() or UNCATEGORIZED
+
+        categories = sorted({category(b) for b in blanks})
+        category_code = {c: i for i, c in enumerate(categories)}
+        self.categories = tuple(categories)
+        self.category_of = np.array([category_code[category(b)] for b in blanks], dtype=np.int64)
+
+        # ---------- postings ----------
+        postings = {field: {} for field in FIELDS}
+        # options and error labels repeat across blanks: tokenize each once
+        tokenized = {}
+
+        def add(field, text, row):
+            by_word = postings[field]
+            unique = tokenized.get(text)
+            if unique is None:
+                unique = tokenized[text] = frozenset(words(text))
+            for word in unique:
+                rows = by_word.get(word)
+                if rows is None:
+                    by_word[word] = [row]
+                # rows arrive in order, so only the last entry can repeat
+                elif rows[-1] != row:
+                    rows.append(row)
+
+        for i, p in enumerate(passages):
+            add("text", p.get("passage_text"), i)
+            add("topic", p.get("topic"), i)
+
+        for i, b in enumerate(blanks):
+            for option in b["options"]:
+                add("option", option, i)
+                add("answer" if option == b["correct_answer"] else "distractor", option, i)
+            add("error", b.get("error_type"), i)
+            for entry in (b.get("error_analysis") or {}).values():
+                add("error", entry.get("error_type"), i)
+
+        self._postings = {
+            field: {word: np.array(rows, dtype=np.int64) for word, rows in by_word.items()}
+            for field, by_word in postings.items()
+        }
+        self._vocabulary = {field: sorted(by_word) for field, by_word in self._postings.items()}
+
+    # ---------- matching ----------
+    def _word_rows(self, field, term):
+        """Rows of one field matching a word, or a prefix ending in *"""
+        by_word = self._postings[field]
+        if not term.endswith("*"):
+            rows = by_word.get(term)
+            return [rows] if rows is not None else []
+        prefix = term[:-1]
+        vocabulary = self._vocabulary[field]
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + "\U0010ffff")
+        return [by_word[word] for word in vocabulary[start:end]]
+
+    def _clause_mask(self, fields, alternatives):
+        """Blanks matching any alternative in any of the fields"""
+        mask = np.zeros(self.n_blanks, dtype=bool)
+        passage_mask = None
+        for field in fields:
+            for term in alternatives:
+                for rows in self._word_rows(field, term):
+                    if field in PASSAGE_FIELDS:
+                        if passage_mask is None:
+                            passage_mask = np.zeros(self.n_passages, dtype=bool)
+                        passage_mask[rows] = True
+                    else:
+                        mask[rows] = True
+        if passage_mask is not None:
+            mask |= passage_mask[self.passage_of]
+        return mask
+
+    @staticmethod
+    def parse(query):
+        """[(negated, fields, alternatives)] of a query string"""
+        clauses = []
+        for part in query.split():
+            negated = part.startswith("-") and len(part) > 1
+            part = part[1:] if negated else part
+            field, sep, terms = part.partition(":")
+            field = FIELD_ALIASES.get(field.lower(), field.lower())
+            if sep and field in FIELDS:
+                fields = (field,)
+            else:
+                fields, terms = FIELDS, part
+            alternatives = []
+            for alt in re.split(r"[/|]", terms):
+                star = alt.endswith("*")
+                alt = " ".join(words(alt))
+                if alt:
+                    # only the first word of "-ed" or "make-up" is looked up
+                    alternatives.append(alt.split()[0] + ("*" if star else ""))
+            if alternatives:
+                clauses.append((negated, fields, alternatives))
+        return clauses
+
+    def search(self, query, topic=None, category=None):
+        """
+        Blanks matching a query, optionally inside one topic / error
+        category. Returns {"rows", "passages", "topics", "categories"}:
+        matching blank rows (array), their passage rows (list, bank order), and
+        name -> count facets. Each facet counts the query plus the other
+        facet's filter, so after picking a topic the topic facet still
+        lists the other topics the query matches.
+        """
+        mask = np.ones(self.n_blanks, dtype=bool)
+        for negated, fields, alternatives in self.parse(query):
+            clause = self._clause_mask(fields, alternatives)
+            mask &= ~clause if negated else clause
+
+        in_topic = mask if topic is None else mask & (self.topic_of == self._code(self.topics, topic))
+        in_category = mask if category is None else mask & (self.category_of == self._code(self.categories, category))
+        rows = np.flatnonzero(in_topic & in_category)
+
+        return {
+            "rows": rows,
+            "passages": np.unique(self.passage_of[rows]).tolist(),
+            "topics": self._facet(self.topics, self.topic_of[np.flatnonzero(in_category)]),
+            "categories": self._facet(self.categories, self.category_of[np.flatnonzero(in_topic)]),
+        }
+
+    def rows_in(self, rows, passages):
+        """The rows (as ints) that belong to the given passages"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return rows[np.isin(self.passage_of[rows], passages)].tolist()
+
+    @staticmethod
+    def _code(names, name):
+        try:
+            return names.index(name)
+        except ValueError:
+            return -1
+
+    @staticmethod
+    def _facet(names, codes):
+        counts = np.bincount(codes, minlength=len(names))
+        order = np.argsort(-counts, kind="stable")
+        return {names[i]: int(counts[i]) for i in order if counts[i]}
+
+
+# =========================
+# SHARED INDEXES
+# =========================
+_indexes = {}  # bank path -> SearchIndex of the version last asked for
+_indexes_lock = threading.Lock()
+
+
+def search_index(bank):
+    """The SearchIndex of a bank version, built once per process; a new version replaces the old one"""
+    index = _indexes.get(bank.path)
+    if index is None or index.version != bank.version:
+        with _indexes_lock:
+            index = _indexes.get(bank.path)
+            if index is None or index.version != bank.version:
+                index = _indexes[bank.path] = SearchIndex(bank)
+    return index
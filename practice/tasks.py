@@ -0,0 +1,61 @@
+import importlib
+import threading
+
+# =========================
+# TASK REGISTRY
+# =========================
+# Only what the Practice menu needs up front. Everything else (entry
+# point, item bank, heavy dependencies) lives in the module itself and is
+# only imported when a student first picks the task.
+TASKS = (
+    {"key": "notice", "label": "📢 Notice completion", "module": "practice.notice_completion"},
+    {"key": "flyer", "label": "📄 Leaflet/Flyer completion", "module": "practice.flyer_completion"},
+    {"key": "reorder", "label": "🔀 Reordering text", "module": "practice.reordering_text"},
+    {"key": "info_gap", "label": "🧩 Information gap completion", "module": "practice.info_gap_completion"},
+    {"key": "reading", "label": "📘 Reading comprehension", "module": "practice.reading_comp"},
+)
+
+_by_key = {t["key"]: t for t in TASKS}
+_by_label = {t["label"]: t for t in TASKS}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def task_labels():
+    return [t["label"] for t in TASKS]
+
+
+def task_label(key):
+    return _by_key[key]["label"]
+
+
+def task_key(label):
+    return _by_label[label]["key"]
+
+
+def load_task(key):
+    """
+    Import a task module on first use and return it. The module must
+    define TASK = {"key", "entry"}: its registry key and the name of the
+    function that renders the task.
+    """
+    module = _loaded.get(key)
+    if module is not None:
+        return module
+
+    with _lock:
+        module = _loaded.get(key)
+        if module is None:
+            module = importlib.import_module(_by_key[key]["module"])
+            spec = getattr(module, "TASK", None)
+            if not spec or spec.get("key") != key or not callable(getattr(module, spec.get("entry", ""), None)):
+                raise ValueError(f"{module.__name__} does not declare a valid TASK for '{key}'")
+            _loaded[key] = module
+    return module
+
+
+def run_task(key):
+    """Render a task, importing its module if this is the first time"""
+    module = load_task(key)
+    getattr(module, module.TASK["entry"])()
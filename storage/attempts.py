@@ -0,0 +1,288 @@
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+ATTEMPT_DB = "attempts.db"
+
+FLUSH_INTERVAL = 1.0      # seconds between background flushes
+FLUSH_BATCH_SIZE = 500    # flush early once this many events are waiting
+
+EVENT_FIELDS = (
+    "ts",            # unix time of the submission
+    "student_id",
+    "task",          # e.g. "flyer"
+    "bank_version",  # ItemBank.version the passage came from
+    "passage_id",
+    "blank_id",
+    "topic",
+    "chosen",        # option text the student picked (None if skipped)
+    "correct",       # 1 / 0
+    "error_type",    # error_type of the blank (what the item tests)
+    "latency_ms",    # time from first seeing the passage to answering
+)
+
+
+def make_event(student_id, task, bank_version, passage_id, blank_id,
+               chosen, correct, error_type, latency_ms, topic=None, ts=None):
+    """One attempt event as a plain dict (see EVENT_FIELDS)"""
+    return {
+        "ts": ts if ts is not None else time.time(),
+        "student_id": student_id,
+        "task": task,
+        "bank_version": bank_version,
+        "passage_id": passage_id,
+        "blank_id": blank_id,
+        "topic": topic,
+        "chosen": chosen,
+        "correct": int(bool(correct)),
+        "error_type": error_type,
+        "latency_ms": int(latency_ms) if latency_ms is not None else None,
+    }
+
+
+# =========================
+# ATTEMPT LOG
+# =========================
+class AttemptLog:
+    """
+    Append-only log of attempt events with write-behind persistence.
+
+    record() only appends to an in-memory buffer and returns, so a submit
+    never waits on disk. A daemon thread moves the buffer to SQLite in one
+    transaction per batch, every FLUSH_INTERVAL seconds or as soon as
+    FLUSH_BATCH_SIZE events are waiting; whatever is left is flushed at
+    interpreter exit.
+
+    Listeners registered with subscribe() are called synchronously with
+    each recorded batch, which is how in-memory aggregates stay current
+    without reading the log back. Hooks registered with on_flush() run
+    inside the flush transaction, so materialized tables are written
+    atomically with the events they summarize.
+
+    Several app processes can share one database. Every row carries the
+    origin of the log that wrote it, and after each flush the daemon
+    thread also follows the table: rows other processes committed since
+    the last pass are handed to the listeners (not the flush hooks --
+    their writer already persisted them), so every process's aggregates
+    see every worker's submissions within about FLUSH_INTERVAL. A
+    listener can pass a separate `remote` callback for those rows, e.g.
+    to reload state their writer saved instead of recomputing it.
+    """
+
+    def __init__(self, path=ATTEMPT_DB, flush_interval=FLUSH_INTERVAL,
+                 batch_size=FLUSH_BATCH_SIZE):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        # [listener, id of the last row it reflects, remote callback]
+        self._listeners = []
+        self._flush_hooks = []
+        self.origin = uuid.uuid4().hex
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS attempts ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " ts REAL NOT NULL, student_id TEXT NOT NULL, task TEXT NOT NULL,"
+                " bank_version TEXT, passage_id TEXT NOT NULL, blank_id TEXT NOT NULL,"
+                " topic TEXT, chosen TEXT, correct INTEGER NOT NULL, error_type TEXT,"
+                " latency_ms INTEGER)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(attempts)")}
+            if "topic" not in columns:
+                self._conn.execute("ALTER TABLE attempts ADD COLUMN topic TEXT")
+            if "origin" not in columns:
+                self._conn.execute("ALTER TABLE attempts ADD COLUMN origin TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS attempts_student ON attempts (student_id, ts)"
+            )
+        # rows up to here are already reflected in whatever gets attached
+        self._followed = self._last_id()
+
+        self._thread = threading.Thread(target=self._run, name="attempt-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def subscribe(self, listener, since=None, remote=None):
+        """
+        Call listener(events) for every batch passed to record(), and for
+        rows after `since` (default: the last followed row) that other
+        processes write (remote(events) instead, if given)
+        """
+        self._listeners.append([listener, self._followed if since is None else since, remote or listener])
+
+    def on_flush(self, hook):
+        """Call hook(conn, events) inside every flush transaction"""
+        self._flush_hooks.append(hook)
+
+    @contextmanager
+    def attach(self, listener, hook, remote=None):
+        """
+        `with log.attach(index.apply, index.persist) as conn:` creates and
+        loads an index's materialized tables, then subscribes it.
+
+        The body runs in one write transaction (BEGIN IMMEDIATE), so no
+        process can commit attempts between loading the tables and reading
+        the last row id the listener is then followed from: every event
+        reaches the index exactly once, from the tables or the listener.
+        """
+        with self._flush_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                since = self._last_id()
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self.subscribe(listener, since, remote)
+            self.on_flush(hook)
+
+    def _last_id(self):
+        return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM attempts").fetchone()[0]
+
+    def connection(self):
+        """
+        Run `with log.connection() as conn:` to use the log's SQLite
+        connection without racing the flush thread.
+        """
+        return _LockedConnection(self._conn, self._flush_lock)
+
+    def record(self, events):
+        """Buffer a batch of events (dicts from make_event); never touches disk"""
+        events = list(events)
+        if not events:
+            return
+        with self._lock:
+            self._buffer.extend(events)
+            pending = len(self._buffer)
+        if pending >= self.batch_size:
+            self._wake.set()
+        for listener, _, _ in list(self._listeners):
+            listener(events)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of events written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        f"INSERT INTO attempts ({', '.join(EVENT_FIELDS)}, origin) "
+                        f"VALUES ({', '.join('?' * len(EVENT_FIELDS))}, ?)",
+                        [(*(e[f] for f in EVENT_FIELDS), self.origin) for e in batch]
+                    )
+                    for hook in self._flush_hooks:
+                        hook(self._conn, batch)
+            except sqlite3.Error:
+                # Put the batch back in front so nothing is lost or reordered
+                with self._lock:
+                    self._buffer[:0] = batch
+                raise
+            return len(batch)
+
+    def follow(self):
+        """Hand rows other processes committed since the last pass to the listeners"""
+        with self._flush_lock:
+            rows = self._conn.execute(
+                f"SELECT id, origin, {', '.join(EVENT_FIELDS)} FROM attempts WHERE id > ? ORDER BY id",
+                (self._followed,)
+            ).fetchall()
+            if not rows:
+                return 0
+            self._followed = rows[-1][0]
+            listeners = [(entry[2], entry[1]) for entry in self._listeners]
+            for entry in self._listeners:
+                entry[1] = max(entry[1], self._followed)
+        # Listeners take their own locks: call them outside the flush lock
+        remote = [(row[0], dict(zip(EVENT_FIELDS, row[2:]))) for row in rows if row[1] != self.origin]
+        for listener, since in listeners:
+            events = [e for row_id, e in remote if row_id > since]
+            if events:
+                listener(events)
+        return len(remote)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                self.follow()
+            except sqlite3.Error as e:
+                # Keep the events and retry on the next tick
+                logger.warning("Attempt log flush failed, retrying: %s", e)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def history(self, student_id):
+        """All persisted events of one student, oldest first (offline use)"""
+        self.flush()
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(EVENT_FIELDS)} FROM attempts WHERE student_id = ? ORDER BY id",
+                (student_id,)
+            ).fetchall()
+        return [dict(zip(EVENT_FIELDS, row)) for row in rows]
+
+
+class _LockedConnection:
+    def __init__(self, conn, lock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self._lock.release()
+        return False
+
+
+# =========================
+# PROCESS-WIDE LOG
+# =========================
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_attempt_log():
+    """The AttemptLog shared by every session in this process"""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = AttemptLog()
+    return _log
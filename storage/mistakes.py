@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+from storage.attempts import get_attempt_log
+
+UNCATEGORIZED = "Uncategorized"
+
+
+def mistake_category(event):
+    return (event.get("error_type") or "").strip() or UNCATEGORIZED
+
+
+# =========================
+# MISTAKE INDEX
+# =========================
+class MistakeIndex:
+    """
+    Per-student index of unresolved mistakes behind the Review page.
+
+    For each student: category -> OrderedDict(blank_id -> entry), newest
+    last, plus blank_id -> category and passage_id -> blank ids. A wrong
+    answer (re)inserts its blank at the newest end; a later correct answer
+    removes it. "The 10 newest unresolved Collocation mistakes" is a walk
+    over at most 10 entries, "what is still wrong in this passage" is one
+    lookup, and nothing ever filters raw attempt history.
+
+    Like ProgressIndex it follows the attempt log: in memory through a
+    listener, on disk through a flush hook that keeps the mistakes table
+    in step inside the same transaction as the events.
+    """
+
+    def __init__(self, log):
+        self._lock = threading.Lock()
+        # student -> category -> OrderedDict(blank_id -> entry)
+        self._by_category = {}
+        # student -> blank_id -> category
+        self._category_of = {}
+        # student -> passage_id -> {blank_id}
+        self._by_passage = {}
+
+        with self._lock, log.attach(self.apply, self.persist) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS mistakes ("
+                " student_id TEXT NOT NULL, blank_id TEXT NOT NULL,"
+                " task TEXT NOT NULL, passage_id TEXT NOT NULL, category TEXT NOT NULL,"
+                " chosen TEXT, ts REAL NOT NULL, wrong_count INTEGER NOT NULL,"
+                " PRIMARY KEY (student_id, task, blank_id))"
+            )
+            rows = conn.execute(
+                "SELECT student_id, task, blank_id, passage_id, category, chosen, ts, wrong_count"
+                " FROM mistakes ORDER BY ts"
+            )
+            for student_id, task, blank_id, passage_id, category, chosen, ts, wrong_count in rows:
+                self._insert(student_id, {
+                    "task": task,
+                    "blank_id": blank_id,
+                    "passage_id": passage_id,
+                    "category": category,
+                    "chosen": chosen,
+                    "ts": ts,
+                    "wrong_count": wrong_count,
+                })
+
+    # ---------- updates (caller holds self._lock) ----------
+    def _remove(self, student_id, task, blank_id):
+        key = (task, blank_id)
+        category = self._category_of.get(student_id, {}).pop(key, None)
+        if category is None:
+            return None
+        entries = self._by_category[student_id][category]
+        entry = entries.pop(key)
+        if not entries:
+            del self._by_category[student_id][category]
+        passage_blanks = self._by_passage[student_id][(task, entry["passage_id"])]
+        passage_blanks.discard(blank_id)
+        if not passage_blanks:
+            del self._by_passage[student_id][(task, entry["passage_id"])]
+        return entry
+
+    def _insert(self, student_id, entry):
+        key = (entry["task"], entry["blank_id"])
+        category = entry["category"]
+        self._by_category.setdefault(student_id, {}).setdefault(category, OrderedDict())[key] = entry
+        self._category_of.setdefault(student_id, {})[key] = category
+        self._by_passage.setdefault(student_id, {}).setdefault(
+            (entry["task"], entry["passage_id"]), set()
+        ).add(entry["blank_id"])
+
+    def apply(self, events):
+        """AttemptLog listener: add wrong answers, resolve correct ones"""
+        with self._lock:
+            for e in events:
+                previous = self._remove(e["student_id"], e["task"], e["blank_id"])
+                if e["correct"]:
+                    continue
+                self._insert(e["student_id"], {
+                    "task": e["task"],
+                    "blank_id": e["blank_id"],
+                    "passage_id": e["passage_id"],
+                    "category": mistake_category(e),
+                    "chosen": e["chosen"],
+                    "ts": e["ts"],
+                    "wrong_count": (previous["wrong_count"] if previous else 0) + 1,
+                })
+
+    def persist(self, conn, events):
+        """AttemptLog flush hook: mirror the same changes into the mistakes table"""
+        for e in events:
+            key = (e["student_id"], e["task"], e["blank_id"])
+            if e["correct"]:
+                conn.execute(
+                    "DELETE FROM mistakes WHERE student_id = ? AND task = ? AND blank_id = ?", key
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO mistakes (student_id, task, blank_id, passage_id, category,"
+                    " chosen, ts, wrong_count) VALUES (?, ?, ?, ?, ?, ?, ?, 1)"
+                    " ON CONFLICT (student_id, task, blank_id) DO UPDATE SET"
+                    " passage_id = excluded.passage_id, category = excluded.category,"
+                    " chosen = excluded.chosen, ts = excluded.ts, wrong_count = wrong_count + 1",
+                    (*key, e["passage_id"], mistake_category(e), e["chosen"], e["ts"])
+                )
+
+    # ---------- queries ----------
+    def categories(self, student_id, task=None):
+        """category -> number of unresolved mistakes (of one task), most frequent first"""
+        with self._lock:
+            counts = {
+                c: len(entries) if task is None else sum(1 for t, _ in entries if t == task)
+                for c, entries in self._by_category.get(student_id, {}).items()
+            }
+        return dict(sorted(((c, n) for c, n in counts.items() if n), key=lambda kv: (-kv[1], kv[0])))
+
+    def unresolved(self, student_id, category, limit=10, task=None):
+        """Newest `limit` unresolved mistakes of one category (and task)"""
+        with self._lock:
+            entries = self._by_category.get(student_id, {}).get(category)
+            if not entries:
+                return []
+            newest = (e for e in reversed(entries.values()) if task is None or e["task"] == task)
+            return [dict(e) for e in islice(newest, limit)]
+
+    def in_passage(self, student_id, task, passage_id):
+        """Blank ids of one passage the student still has wrong"""
+        with self._lock:
+            return set(self._by_passage.get(student_id, {}).get((task, passage_id), ()))
+
+
+# =========================
+# PROCESS-WIDE INDEX
+# =========================
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_mistake_index():
+    """The MistakeIndex attached to this process's attempt log"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = MistakeIndex(get_attempt_log())
+    return _index
@@ -0,0 +1,150 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================
+# KDF SETTINGS
+# =========================
+# scrypt cost: ~16 MB and a few tens of ms per hash
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+SCHEME = "scrypt"
+
+# At most KDF_WORKERS hashes run at once; at most KDF_MAX_PENDING wait
+KDF_WORKERS = int(os.environ.get("KDF_WORKERS", min(4, os.cpu_count() or 1)))
+KDF_MAX_PENDING = int(os.environ.get("KDF_MAX_PENDING", 256))
+
+
+# =========================
+# HASHING
+# =========================
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii")
+
+
+def hash_password(password, salt=None):
+    """Salted scrypt hash as "scrypt$n$r$p$salt$key" (base64 salt/key)"""
+    salt = salt or secrets.token_bytes(SALT_BYTES)
+    key = hashlib.scrypt(
+        password.encode("utf-8"), salt=salt,
+        n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=KEY_BYTES
+    )
+    return f"{SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+
+
+def is_hashed(stored):
+    return isinstance(stored, str) and stored.startswith(SCHEME + "$")
+
+
+def verify_password(password, stored):
+    """
+    Check a password against a stored value. Accounts created before
+    hashing still hold plaintext; those are compared in constant time and
+    should be upgraded with hash_password() after a successful login.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(str(password).encode("utf-8"), str(stored).encode("utf-8"))
+
+    try:
+        _, n, r, p, salt, key = stored.split("$")
+        salt, key = base64.b64decode(salt), base64.b64decode(key)
+        candidate = hashlib.scrypt(
+            password.encode("utf-8"), salt=salt,
+            n=int(n), r=int(r), p=int(p), dklen=len(key)
+        )
+    except ValueError:
+        return False
+    return hmac.compare_digest(candidate, key)
+
+
+# =========================
+# WORKER POOL
+# =========================
+_pool = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix="kdf")
+_pending = threading.BoundedSemaphore(KDF_MAX_PENDING)
+
+
+class KDFBusy(RuntimeError):
+    """The KDF pool's backlog is full; the login should be retried later"""
+
+
+def _run_on_pool(fn, *args):
+    """
+    Run a KDF call on the shared pool and wait for its result.
+
+    The calling session still waits for the hash, but hashlib.scrypt
+    releases the GIL, so other sessions keep rendering while it runs, and
+    the pool caps how many hashes compete for the CPU. When KDF_MAX_PENDING
+    calls are already queued this raises KDFBusy at once instead of
+    queueing a login that would take seconds to answer.
+    """
+    if not _pending.acquire(blocking=False):
+        raise KDFBusy("Too many logins in progress")
+    try:
+        return _pool.submit(fn, *args).result()
+    finally:
+        _pending.release()
+
+
+def hash_password_pooled(password):
+    """hash_password() on the KDF pool; raises KDFBusy when it is full"""
+    return _run_on_pool(hash_password, password)
+
+
+def verify_password_pooled(password, stored):
+    """verify_password() on the KDF pool; raises KDFBusy when it is full"""
+    return _run_on_pool(verify_password, password, stored)
+
+
+# =========================
+# VERIFIED-CREDENTIAL CACHE
+# =========================
+# Per-process key so cached fingerprints are useless outside this process
+_CACHE_KEY = secrets.token_bytes(32)
+
+
+class VerifiedCache:
+    """
+    Small per-session LRU of recent successful logins.
+
+    Entries expire after `ttl` seconds and at most `maxsize` are kept. Only
+    an HMAC fingerprint of the password is stored, bound to the stored
+    hash, so a password change invalidates the entry.
+    """
+
+    def __init__(self, maxsize=8, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _fingerprint(password, stored):
+        return hmac.new(_CACHE_KEY, f"{stored}\0{password}".encode("utf-8"), hashlib.sha256).digest()
+
+    def hit(self, student_id, stored, password):
+        entry = self._entries.get(student_id)
+        if entry is None:
+            return False
+        fingerprint, expires = entry
+        if time.monotonic() > expires:
+            del self._entries[student_id]
+            return False
+        if not hmac.compare_digest(fingerprint, self._fingerprint(password, stored)):
+            return False
+        self._entries.move_to_end(student_id)
+        return True
+
+    def add(self, student_id, stored, password):
+        self._entries[student_id] = (self._fingerprint(password, stored), time.monotonic() + self.ttl)
+        self._entries.move_to_end(student_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
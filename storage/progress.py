@@ -0,0 +1,149 @@
+import threading
+import time
+
+from storage.attempts import get_attempt_log
+
+# =========================
+# DIMENSIONS
+# =========================
+# Every event counts once per dimension it has a value for
+DIMENSIONS = ("overall", "topic", "error_type")
+OVERALL = "all"
+
+
+def event_categories(event):
+    """(dimension, category) pairs an attempt event is counted under"""
+    yield "overall", OVERALL
+    if event.get("topic"):
+        yield "topic", event["topic"].strip()
+    if event.get("error_type"):
+        yield "error_type", event["error_type"].strip()
+
+
+def day_of(ts):
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+# =========================
+# PROGRESS INDEX
+# =========================
+class ProgressIndex:
+    """
+    Materialized per-student counters behind the Progress page.
+
+    For every (student, dimension, category, day) we keep attempts and
+    correct counts. They are updated incrementally from each recorded
+    batch of attempt events (in memory) and upserted into the
+    progress_daily table inside the attempt log's flush transaction, so a
+    restart reloads the counters instead of re-scanning attempt history.
+    Running totals are kept next to the daily buckets, so a summary is
+    proportional to the number of categories (trends: categories x days),
+    never to the number of attempts.
+    """
+
+    def __init__(self, log):
+        self._lock = threading.Lock()
+        # student -> (dimension, category) -> [attempts, correct]
+        self._totals = {}
+        # student -> (dimension, category) -> day -> [attempts, correct]
+        self._daily = {}
+
+        # Hold our lock and attach in one transaction of the log, so no
+        # batch (of this or another process) can be flushed into the table,
+        # or applied in memory, between loading the counters and listening
+        # for new events. Create the index before the first submission of
+        # the process.
+        with self._lock, log.attach(self.apply, self.persist) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS progress_daily ("
+                " student_id TEXT NOT NULL, dimension TEXT NOT NULL,"
+                " category TEXT NOT NULL, day TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL, correct INTEGER NOT NULL,"
+                " PRIMARY KEY (student_id, dimension, category, day))"
+            )
+            for row in conn.execute(
+                "SELECT student_id, dimension, category, day, attempts, correct FROM progress_daily"
+            ):
+                self._add(*row)
+
+    def _add(self, student_id, dimension, category, day, attempts, correct):
+        key = (dimension, category)
+        total = self._totals.setdefault(student_id, {}).setdefault(key, [0, 0])
+        total[0] += attempts
+        total[1] += correct
+        bucket = self._daily.setdefault(student_id, {}).setdefault(key, {}).setdefault(day, [0, 0])
+        bucket[0] += attempts
+        bucket[1] += correct
+
+    @staticmethod
+    def _deltas(events):
+        deltas = {}
+        for e in events:
+            day = day_of(e["ts"])
+            for dimension, category in event_categories(e):
+                key = (e["student_id"], dimension, category, day)
+                counts = deltas.setdefault(key, [0, 0])
+                counts[0] += 1
+                counts[1] += e["correct"]
+        return deltas
+
+    def apply(self, events):
+        """AttemptLog listener: fold a batch into the in-memory counters"""
+        deltas = self._deltas(events)
+        with self._lock:
+            for key, (attempts, correct) in deltas.items():
+                self._add(*key, attempts, correct)
+
+    def persist(self, conn, events):
+        """AttemptLog flush hook: upsert the same deltas into progress_daily"""
+        conn.executemany(
+            "INSERT INTO progress_daily (student_id, dimension, category, day, attempts, correct)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (student_id, dimension, category, day) DO UPDATE SET"
+            " attempts = attempts + excluded.attempts, correct = correct + excluded.correct",
+            [(*key, attempts, correct) for key, (attempts, correct) in self._deltas(events).items()]
+        )
+
+    def summary(self, student_id):
+        """
+        dimension -> list of {"category", "attempts", "correct", "accuracy"},
+        weakest category first.
+        """
+        result = {dimension: [] for dimension in DIMENSIONS}
+        with self._lock:
+            for (dimension, category), (attempts, correct) in self._totals.get(student_id, {}).items():
+                result[dimension].append({
+                    "category": category,
+                    "attempts": attempts,
+                    "correct": correct,
+                    "accuracy": correct / attempts if attempts else 0.0,
+                })
+        for rows in result.values():
+            rows.sort(key=lambda r: (r["accuracy"], r["category"]))
+        return result
+
+    def trend(self, student_id, dimension):
+        """category -> [(day, attempts, correct), ...] in day order"""
+        with self._lock:
+            return {
+                category: sorted((day, a, c) for day, (a, c) in days.items())
+                for (dim, category), days in self._daily.get(student_id, {}).items()
+                if dim == dimension
+            }
+
+
+# =========================
+# PROCESS-WIDE INDEX
+# =========================
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_progress_index():
+    """The ProgressIndex attached to this process's attempt log"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ProgressIndex(get_attempt_log())
+    return _index
@@ -0,0 +1,280 @@
+import argparse
+import heapq
+import threading
+import time
+
+from storage.attempts import get_attempt_log
+from storage.mistakes import mistake_category
+
+# =========================
+# SM-2 SETTINGS
+# =========================
+DAY = 86400
+START_EASE = 2.5
+MIN_EASE = 1.3
+CORRECT_QUALITY = 4      # SM-2 grade for a right answer
+WRONG_QUALITY = 1        # ... and for a wrong one (anything < 3 is a lapse)
+
+# Card kinds: one card per blank, one per (task, error type)
+BLANK = "blank"
+ERROR_TYPE = "error_type"
+
+
+def sm2(card, quality, now):
+    """Apply one SM-2 review of the given quality (0-5) to a card dict"""
+    if quality < 3:
+        card["reps"] = 0
+        card["interval"] = 1
+        card["lapses"] += 1
+    else:
+        if card["reps"] == 0:
+            card["interval"] = 1
+        elif card["reps"] == 1:
+            card["interval"] = 6
+        else:
+            card["interval"] = round(card["interval"] * card["ease"])
+        card["reps"] += 1
+    card["ease"] = max(MIN_EASE, card["ease"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    card["due"] = now + card["interval"] * DAY
+
+
+def card_reviews(events):
+    """
+    (student, kind, task, key) -> [(quality, ts), ...] for events in log
+    order. The events of one submission share their ts: each submission
+    reviews a card once, however the events are batched.
+    """
+    reviews = {}
+    by_type = {}
+    for e in events:
+        key = (e["student_id"], BLANK, e["task"], e["blank_id"])
+        review = (CORRECT_QUALITY if e["correct"] else WRONG_QUALITY, e["ts"])
+        blank_reviews = reviews.setdefault(key, [])
+        if blank_reviews and blank_reviews[-1][1] == e["ts"]:
+            blank_reviews[-1] = review
+        else:
+            blank_reviews.append(review)
+        counts = by_type.setdefault(
+            ((e["student_id"], ERROR_TYPE, e["task"], mistake_category(e)), e["ts"]), [0, 0]
+        )
+        counts[0] += 1
+        counts[1] += e["correct"]
+    # An error type's grade is the share of its blanks answered right
+    for (key, ts), (attempts, correct) in by_type.items():
+        reviews.setdefault(key, []).append((round(5 * correct / attempts), ts))
+    return reviews
+
+
+# =========================
+# REVIEW SCHEDULER
+# =========================
+class ReviewScheduler:
+    """
+    SM-2 spaced repetition over blanks and error types.
+
+    Every answered blank, and every error type a student has met, is a
+    card with an ease, interval and due time. Each student has a min-heap
+    of (due, kind, task, key); rescheduling pushes a new entry and the old
+    one is skipped when it surfaces (its due no longer matches the card).
+    So the next due card is a heap peek, and taking k due cards costs
+    O(k log n). The heaps are compacted when stale entries pile up.
+
+    Cards follow the attempt log like the other indexes. A listener
+    reviews them in memory at once; the flush hook then reviews the
+    cards saved in review_cards with the same batch and keeps the
+    result, so processes sharing the database build on each other's
+    reviews instead of overwriting them. Rows another process wrote
+    reload their cards from the table.
+    """
+
+    def __init__(self, log):
+        self._log = log
+        self._lock = threading.Lock()
+        # student -> (kind, task, key) -> card
+        self._cards = {}
+        # student -> [(due, kind, task, key), ...]
+        self._heaps = {}
+
+        with self._lock, log.attach(self.apply, self.persist, self.reload) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS review_cards ("
+                " student_id TEXT NOT NULL, kind TEXT NOT NULL, task TEXT NOT NULL,"
+                " card TEXT NOT NULL, ease REAL NOT NULL, interval INTEGER NOT NULL,"
+                " reps INTEGER NOT NULL, lapses INTEGER NOT NULL, due REAL NOT NULL,"
+                " PRIMARY KEY (student_id, kind, task, card))"
+            )
+            for student_id, kind, task, key, ease, interval, reps, lapses, due in conn.execute(
+                "SELECT student_id, kind, task, card, ease, interval, reps, lapses, due FROM review_cards"
+            ):
+                self._cards.setdefault(student_id, {})[(kind, task, key)] = {
+                    "ease": ease, "interval": interval, "reps": reps, "lapses": lapses, "due": due,
+                }
+            for student_id, cards in self._cards.items():
+                heap = [(card["due"], *card_key) for card_key, card in cards.items()]
+                heapq.heapify(heap)
+                self._heaps[student_id] = heap
+
+    # ---------- updates ----------
+    def _set_card(self, student_id, card_key, card):
+        """Store a card and schedule it (caller holds the lock)"""
+        cards = self._cards.setdefault(student_id, {})
+        cards[card_key] = card
+        heap = self._heaps.setdefault(student_id, [])
+        heapq.heappush(heap, (card["due"], *card_key))
+        if len(heap) > 2 * len(cards) + 16:
+            heap[:] = [(c["due"], *k) for k, c in cards.items()]
+            heapq.heapify(heap)
+
+    @staticmethod
+    def _review(card, reviews):
+        """A copy of `card` (None: a new card) after the given reviews"""
+        card = dict(card) if card is not None else None
+        for quality, ts in reviews:
+            if card is None:
+                card = {"ease": START_EASE, "interval": 0, "reps": 0, "lapses": 0, "due": ts}
+            sm2(card, quality, ts)
+        return card
+
+    @staticmethod
+    def _stored(conn, keys):
+        """(student, kind, task, key) -> card saved in review_cards, for the given keys"""
+        stored = {}
+        for key in keys:
+            row = conn.execute(
+                "SELECT ease, interval, reps, lapses, due FROM review_cards"
+                " WHERE student_id = ? AND kind = ? AND task = ? AND card = ?",
+                key
+            ).fetchone()
+            if row is not None:
+                stored[key] = dict(zip(("ease", "interval", "reps", "lapses", "due"), row))
+        return stored
+
+    def apply(self, events):
+        """AttemptLog listener: one SM-2 review per blank and per error type"""
+        reviews = card_reviews(events)
+        with self._lock:
+            for (student_id, *card_key), steps in reviews.items():
+                card_key = tuple(card_key)
+                card = self._cards.get(student_id, {}).get(card_key)
+                self._set_card(student_id, card_key, self._review(card, steps))
+
+    def reload(self, events):
+        """AttemptLog listener for other processes' rows: their writer saved the cards"""
+        keys = list(card_reviews(events))
+        with self._log.connection() as conn, self._lock:
+            for (student_id, *card_key), card in self._stored(conn, keys).items():
+                self._set_card(student_id, tuple(card_key), card)
+
+    def persist(self, conn, events):
+        """
+        AttemptLog flush hook: review the stored cards with this batch and
+        save them. The flush transaction holds the database's write lock,
+        so each process builds on what the others saved.
+        """
+        reviews = card_reviews(events)
+        with self._lock:
+            stored = self._stored(conn, reviews)
+            rows = []
+            for key, steps in reviews.items():
+                card = self._review(stored.get(key), steps)
+                student_id, *card_key = key
+                self._set_card(student_id, tuple(card_key), card)
+                rows.append((*key, card["ease"], card["interval"], card["reps"], card["lapses"], card["due"]))
+        conn.executemany(
+            "INSERT OR REPLACE INTO review_cards"
+            " (student_id, kind, task, card, ease, interval, reps, lapses, due)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    # ---------- queries ----------
+    def _pop_live(self, student_id, heap):
+        """Pop stale entries off the top; return the live top or None (caller holds the lock)"""
+        cards = self._cards.get(student_id, {})
+        while heap:
+            due, *card_key = heap[0]
+            card = cards.get(tuple(card_key))
+            if card is not None and card["due"] == due:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def due(self, student_id, now=None, limit=20, kind=None, task=None):
+        """Cards (of one kind / task) due by `now`, most overdue first, as dicts"""
+        now = time.time() if now is None else now
+        with self._lock:
+            heap = self._heaps.get(student_id, [])
+            taken, seen, result = [], set(), []
+            while len(result) < limit:
+                top = self._pop_live(student_id, heap)
+                if top is None or top[0] > now:
+                    break
+                heapq.heappop(heap)
+                due, card_kind, card_task, key = top
+                if (card_kind, card_task, key) in seen:
+                    # duplicate entry for a card rescheduled to the same time
+                    continue
+                seen.add((card_kind, card_task, key))
+                taken.append(top)
+                if (kind is None or card_kind == kind) and (task is None or card_task == task):
+                    card = self._cards[student_id][(card_kind, card_task, key)]
+                    result.append({"kind": card_kind, "task": card_task, "key": key, **card})
+            for entry in taken:
+                heapq.heappush(heap, entry)
+        return result
+
+    def daily_review_sets(self, until=None, limit=20, students=None):
+        """
+        Batch job: student -> review set due by `until` (default: end of
+        today) for every student, or for the given cohort.
+        """
+        if until is None:
+            until = end_of_day(time.time())
+        with self._lock:
+            cohort = list(self._cards) if students is None else list(students)
+        return {student_id: self.due(student_id, until, limit) for student_id in cohort}
+
+
+def end_of_day(ts):
+    t = time.localtime(ts)
+    return time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 23, 59, 59, 0, 0, -1))
+
+
+# =========================
+# PROCESS-WIDE SCHEDULER
+# =========================
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_review_scheduler():
+    """The ReviewScheduler attached to this process's attempt log"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ReviewScheduler(get_attempt_log())
+    return _scheduler
+
+
+# =========================
+# DAILY BATCH
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Build today's review set for every student")
+    parser.add_argument("--limit", type=int, default=20, help="cards per student")
+    parser.add_argument("--students", nargs="*", help="only these student IDs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sets = get_review_scheduler().daily_review_sets(limit=args.limit, students=args.students)
+    elapsed = time.perf_counter() - start
+
+    for student_id, cards in sorted(sets.items()):
+        blanks = sum(1 for c in cards if c["kind"] == BLANK)
+        print(f"{student_id}: {blanks} blanks, {len(cards) - blanks} error types due")
+    print(f"✅ Built review sets for {len(sets)} students in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
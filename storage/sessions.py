@@ -0,0 +1,255 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# =========================
+# CONFIG
+# =========================
+SESSION_DB = "sessions.db"
+
+SESSION_TTL = float(os.environ.get("SESSION_TTL_HOURS", "12")) * 3600   # idle time before a login expires
+REFRESH_INTERVAL = 60.0   # write a new expiry at most this often per session
+CACHE_TTL = 2.0           # seconds a cached session row is trusted without a query
+CACHE_SIZE = 1024         # sessions kept in the read-through cache
+MAX_HOPS = 16             # rotations followed from an old token
+
+
+# =========================
+# SESSION STORE
+# =========================
+class SessionStore:
+    """
+    Login sessions and in-progress practice state shared by app processes.
+
+    Streamlit keeps st.session_state in the process that serves the
+    browser connection, so with several worker processes behind a load
+    balancer a reconnect can land on a process that has never seen the
+    student. Logins therefore get a random token (kept in the page URL,
+    see app.py) that names a row of the sessions table, and each task
+    saves its in-progress state under (token, name) in session_state, in
+    an SQLite database in WAL mode that every process on the box opens.
+
+    A token in a URL can leak (shared links, history, proxy logs), so it
+    only restores a login once: restore() retires it and issues a new
+    token for the same login. A retired token is only followed by get(),
+    i.e. by app sessions that already held it (another open tab), never
+    restored from. All tokens of one login share a login_id, which is
+    what logout deletes.
+
+    get() runs on every rerun to check the login is still valid, so it is
+    answered from a small per-process LRU cache for CACHE_TTL seconds:
+    a logout on another worker is noticed within that time. The reads
+    that do reach the database also push the idle expiry forward (at
+    most every REFRESH_INTERVAL), so any page keeps a login alive.
+    Each thread gets its own connection, as in SQLiteUserStore.
+    """
+
+    def __init__(self, path=SESSION_DB, ttl=SESSION_TTL, cache_ttl=CACHE_TTL, cache_size=CACHE_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._local = threading.local()
+        # token -> (fetched_at, session or None)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " token TEXT PRIMARY KEY,"
+                " student_id TEXT NOT NULL, full_name TEXT,"
+                " created REAL NOT NULL, expires REAL NOT NULL,"
+                " login_id TEXT, replaced_by TEXT)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "login_id" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN login_id TEXT")
+                conn.execute("ALTER TABLE sessions ADD COLUMN replaced_by TEXT")
+                conn.execute("UPDATE sessions SET login_id = token")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_state ("
+                " token TEXT NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL,"
+                " updated REAL NOT NULL,"
+                " PRIMARY KEY (token, name))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_login ON sessions (login_id)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- cache ----------
+    def _cached(self, token, now):
+        with self._cache_lock:
+            entry = self._cache.get(token)
+            if entry is None or now - entry[0] > self.cache_ttl:
+                return False, None
+            self._cache.move_to_end(token)
+            return True, entry[1]
+
+    def _remember(self, token, session, now):
+        with self._cache_lock:
+            self._cache[token] = (now, session)
+            self._cache.move_to_end(token)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, tokens):
+        with self._cache_lock:
+            for token in tokens:
+                self._cache.pop(token, None)
+
+    # ---------- sessions ----------
+    def create(self, student_id, full_name):
+        """Start a session for a signed-in student; returns its token"""
+        token = secrets.token_urlsafe(24)
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO sessions (token, student_id, full_name, created, expires, login_id)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (token, str(student_id), full_name, now, now + self.ttl, token)
+            )
+        self.purge(now)
+        self._remember(token, {"student_id": str(student_id), "full_name": full_name, "token": token}, now)
+        return token
+
+    def get(self, token, cached=True):
+        """
+        {"student_id", "full_name", "token"} of a live session, or None.
+        "token" is the current one: it differs from the argument when the
+        login was rotated since (see restore).
+        """
+        now = time.time()
+        if cached:
+            hit, session = self._cached(token, now)
+            if hit:
+                return session
+
+        conn = self._conn()
+        current, session = token, None
+        for _ in range(MAX_HOPS):
+            row = conn.execute(
+                "SELECT student_id, full_name, expires, replaced_by FROM sessions"
+                " WHERE token = ? AND expires > ?",
+                (current, now)
+            ).fetchone()
+            if row is None:
+                break
+            if row[3] is None:
+                session = {"student_id": row[0], "full_name": row[1], "token": current}
+                if row[2] - now < self.ttl - REFRESH_INTERVAL:
+                    with conn:
+                        conn.execute("UPDATE sessions SET expires = ? WHERE token = ?", (now + self.ttl, current))
+                break
+            current = row[3]
+        self._remember(token, session, now)
+        return session
+
+    def restore(self, token):
+        """
+        Sign a new app session in from a token (e.g. the URL after a
+        reconnect). The token is retired and the login moves to a fresh
+        one, which is returned with the session; None if the token is
+        unknown, expired or already retired.
+        """
+        now = time.time()
+        new_token = secrets.token_urlsafe(24)
+        conn = self._conn()
+        with conn:
+            row = conn.execute(
+                "SELECT student_id, full_name, created, login_id FROM sessions"
+                " WHERE token = ? AND expires > ? AND replaced_by IS NULL",
+                (token, now)
+            ).fetchone()
+            if row is None:
+                return None
+            student_id, full_name, created, login_id = row
+            conn.execute(
+                "INSERT INTO sessions (token, student_id, full_name, created, expires, login_id)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (new_token, student_id, full_name, created, now + self.ttl, login_id)
+            )
+            conn.execute("UPDATE sessions SET replaced_by = ? WHERE token = ?", (new_token, token))
+            conn.execute("UPDATE session_state SET token = ? WHERE token = ?", (new_token, token))
+        self._forget([token])
+        session = {"student_id": student_id, "full_name": full_name, "token": new_token}
+        self._remember(new_token, session, now)
+        return session
+
+    def delete(self, token):
+        """Log a login out, every token it had (other processes notice within CACHE_TTL)"""
+        conn = self._conn()
+        with conn:
+            tokens = [row[0] for row in conn.execute(
+                "SELECT token FROM sessions WHERE login_id = (SELECT login_id FROM sessions WHERE token = ?)",
+                (token,)
+            )] or [token]
+            conn.executemany("DELETE FROM session_state WHERE token = ?", [(t,) for t in tokens])
+            conn.executemany("DELETE FROM sessions WHERE token = ?", [(t,) for t in tokens])
+        now = time.time()
+        for t in tokens:
+            self._remember(t, None, now)
+
+    def purge(self, now=None):
+        """Drop expired sessions and their state; returns how many"""
+        now = now if now is not None else time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM session_state WHERE token IN (SELECT token FROM sessions WHERE expires <= ?)",
+                (now,)
+            )
+            return conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,)).rowcount
+
+    # ---------- in-progress state ----------
+    def load_state(self, token):
+        """name -> value of everything saved for a session (read from disk)"""
+        rows = self._conn().execute(
+            "SELECT name, value FROM session_state WHERE token = ?", (token,)
+        ).fetchall()
+        return {name: json.loads(value) for name, value in rows}
+
+    def save_state(self, token, name, value):
+        """Save one JSON-serializable piece of state; False if the session is gone or retired"""
+        now = time.time()
+        with self._conn() as conn:
+            alive = conn.execute(
+                "SELECT 1 FROM sessions WHERE token = ? AND expires > ? AND replaced_by IS NULL",
+                (token, now)
+            ).fetchone()
+            if alive:
+                conn.execute(
+                    "INSERT INTO session_state (token, name, value, updated) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (token, name) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                    (token, name, json.dumps(value, ensure_ascii=False), now)
+                )
+        return bool(alive)
+
+
+# =========================
+# PROCESS-WIDE STORE
+# =========================
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """The SessionStore shared by every session in this process"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore()
+    return _store
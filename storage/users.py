@@ -0,0 +1,261 @@
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+# =========================
+# CONFIG
+# =========================
+USER_DB = "users.db"
+LEGACY_USER_FILE = "users.csv"
+
+# "sqlite" (default) or "csv"
+USER_STORE_BACKEND = os.environ.get("USER_STORE", "sqlite")
+
+# Every account has one role; teachers and content authors can also use
+# the Item Search page. New accounts are students.
+STUDENT, TEACHER, AUTHOR = "student", "teacher", "author"
+ROLES = (STUDENT, TEACHER, AUTHOR)
+AUTHOR_ROLES = {TEACHER, AUTHOR}
+
+FIELDS = ["student_id", "full_name", "password", "role"]
+
+
+def check_role(role):
+    if role not in ROLES:
+        raise ValueError(f"Unknown role: {role} (expected one of {', '.join(ROLES)})")
+    return role
+
+
+# =========================
+# INTERFACE
+# =========================
+class UserStore(ABC):
+    """
+    Where student accounts live. app.py only talks to this interface,
+    so the backend can be swapped without touching the login UI.
+    The password field holds whatever storage.passwords produced
+    (a salted scrypt hash, or plaintext for accounts not yet upgraded).
+    """
+
+    @abstractmethod
+    def get(self, student_id):
+        """Return {"student_id", "full_name", "password", "role"} or None"""
+
+    @abstractmethod
+    def add(self, student_id, full_name, password, role=STUDENT):
+        """Create an account; return False if the ID is already taken"""
+
+    @abstractmethod
+    def set_password(self, student_id, password):
+        """Replace the stored password value (e.g. plaintext -> hash)"""
+
+    @abstractmethod
+    def set_role(self, student_id, role):
+        """Change an account's role; return False if there is no such account"""
+
+
+# =========================
+# SQLITE BACKEND
+# =========================
+class SQLiteUserStore(UserStore):
+    """
+    Users in an embedded SQLite database in WAL mode.
+
+    student_id is the primary key, so lookups are an index search instead
+    of a file scan, and inserts are single transactions: two students
+    signing up at once can never overwrite each other's rows.
+    Each thread gets its own connection (Streamlit runs sessions on
+    separate threads).
+    """
+
+    def __init__(self, path=USER_DB, legacy_csv=LEGACY_USER_FILE):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                " student_id TEXT PRIMARY KEY,"
+                " full_name TEXT NOT NULL,"
+                " password TEXT NOT NULL,"
+                " role TEXT NOT NULL DEFAULT 'student')"
+            )
+            # databases created before roles existed
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+            if "role" not in columns:
+                conn.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'student'")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        if legacy_csv:
+            self.migrate_from_csv(legacy_csv)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, student_id):
+        row = self._conn().execute(
+            "SELECT student_id, full_name, password, role FROM users WHERE student_id = ?",
+            (str(student_id),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def add(self, student_id, full_name, password, role=STUDENT):
+        check_role(role)
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT INTO users (student_id, full_name, password, role) VALUES (?, ?, ?, ?)",
+                    (str(student_id), full_name, password, role)
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def set_password(self, student_id, password):
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE users SET password = ? WHERE student_id = ?",
+                (password, str(student_id))
+            )
+
+    def set_role(self, student_id, role):
+        check_role(role)
+        with self._conn() as conn:
+            cursor = conn.execute("UPDATE users SET role = ? WHERE student_id = ?", (role, str(student_id)))
+        return cursor.rowcount > 0
+
+    def migrate_from_csv(self, csv_path):
+        """
+        One-time import of the old users.csv. Runs in a single transaction
+        and is recorded in the meta table, so it never runs twice; the CSV
+        itself is left in place.
+        """
+        if not os.path.exists(csv_path):
+            return 0
+
+        conn = self._conn()
+        with conn:
+            done = conn.execute(
+                "SELECT value FROM meta WHERE key = 'migrated_from_csv'"
+            ).fetchone()
+            if done:
+                return 0
+
+            with open(csv_path, "r", encoding="utf-8", newline="") as f:
+                rows = [
+                    (str(r["student_id"]), r["full_name"], r["password"], check_role(r.get("role") or STUDENT))
+                    for r in csv.DictReader(f)
+                    if r.get("student_id")
+                ]
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (student_id, full_name, password, role) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_csv', ?)",
+                (os.path.abspath(csv_path),)
+            )
+        return len(rows)
+
+
+# =========================
+# CSV BACKEND (LEGACY)
+# =========================
+class CSVUserStore(UserStore):
+    """The original users.csv file, kept for setups without SQLite files"""
+
+    def __init__(self, path=LEGACY_USER_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            self._write([])
+            return
+        # files written before roles existed get the column (everyone a student)
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            header = next(csv.reader(f), [])
+        if "role" not in header:
+            self._write(self._read())
+
+    def _read(self):
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row["role"] = row.get("role") or STUDENT
+        return rows
+
+    def _write(self, rows):
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def get(self, student_id):
+        for row in self._read():
+            if row["student_id"] == str(student_id):
+                return row
+        return None
+
+    def add(self, student_id, full_name, password, role=STUDENT):
+        check_role(role)
+        with self._lock:
+            if self.get(student_id):
+                return False
+            with open(self.path, "a", encoding="utf-8", newline="") as f:
+                csv.writer(f).writerow([student_id, full_name, password, role])
+            return True
+
+    def _update(self, student_id, field, value):
+        with self._lock:
+            rows = self._read()
+            found = False
+            for row in rows:
+                if row["student_id"] == str(student_id):
+                    row[field] = value
+                    found = True
+            self._write(rows)
+            return found
+
+    def set_password(self, student_id, password):
+        self._update(student_id, "password", password)
+
+    def set_role(self, student_id, role):
+        return self._update(student_id, "role", check_role(role))
+
+
+def open_user_store(backend=USER_STORE_BACKEND):
+    """Build the configured user store"""
+    if backend == "csv":
+        return CSVUserStore()
+    if backend == "sqlite":
+        return SQLiteUserStore()
+    raise ValueError(f"Unknown user store backend: {backend}")
+
+
+# =========================
+# ROLES
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="Change the role of an account")
+    parser.add_argument("student_id")
+    parser.add_argument("role", choices=ROLES)
+    args = parser.parse_args()
+
+    if open_user_store().set_role(args.student_id, args.role):
+        print(f"✅ {args.student_id} is now a {args.role}")
+    else:
+        print(f"❌ No account with ID {args.student_id}")
+
+
+if __name__ == "__main__":
+    main()
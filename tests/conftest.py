@@ -0,0 +1,11 @@
+import os
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+CONVERTER_DIR = os.path.join(ROOT, "data", "converted data")
+
+# Tests import the app packages from the project root and the converters
+# the way they run, from their own directory (see benchmarks/bench_converter.py)
+for path in (ROOT, CONVERTER_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,126 @@
+import pytest
+
+from practice.adaptive import K_START, AdaptiveEngine, p_correct, step_size
+from practice.item_bank import ItemBank
+from storage.attempts import AttemptLog, make_event
+
+
+def make_bank(passages=4, blanks=2, version="v1"):
+    data = {"format": "passage-blank/1", "task": "flyer", "passages": [], "blanks": []}
+    for p in range(1, passages + 1):
+        ids = [f"{p}.{b}" for b in range(1, blanks + 1)]
+        data["passages"].append({"id": str(p), "topic": "T", "passage_text": "", "blank_ids": ids})
+        data["blanks"] += [{"id": i, "passage_id": str(p), "options": ["a", "b"], "correct_answer": "a"} for i in ids]
+    return ItemBank("memory", version, data)
+
+
+def event(blank_id, correct, student_id="s1", task="flyer"):
+    return make_event(student_id, task, "v1", blank_id.partition(".")[0], blank_id,
+                      "a" if correct else "b", correct, None, 1200, ts=1000.0)
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = AttemptLog(str(tmp_path / "attempts.db"), flush_interval=3600)
+    yield log
+    log.close()
+
+
+def test_elo_step():
+    assert p_correct(0.0, 0.0) == 0.5
+    assert step_size(0) == K_START
+    assert step_size(10**6) == pytest.approx(0.05)
+
+
+def test_answers_move_ability_and_difficulty(log):
+    engine = AdaptiveEngine(log, "flyer")
+    engine.bind(make_bank())
+
+    log.record([event("1.1", True)])
+
+    # an even match answered right: both move by K_START / 2
+    assert engine.ability("s1") == pytest.approx(K_START / 2)
+    assert engine.difficulty[0] == pytest.approx(-K_START / 2)
+    assert engine.passage_difficulty()[0] == pytest.approx(-K_START / 4)
+    # other tasks and unknown blanks are ignored
+    log.record([event("1.1", False, task="reorder"), event("9.9", False)])
+    assert engine.ability("s1") == pytest.approx(K_START / 2)
+
+
+def test_select_targets_the_success_rate_and_skips_recent_passages(log):
+    engine = AdaptiveEngine(log, "flyer")
+    engine.bind(make_bank(passages=4))
+    # make passage 3 (index 2) hard and passage 4 easy; a new student targets
+    # difficulty -log(0.7 / 0.3) ~ -0.85, i.e. an easy passage
+    for _ in range(5):
+        log.record([event("3.1", False, student_id="x"), event("3.2", False, student_id="x")])
+        log.record([event("4.1", True, student_id="x"), event("4.2", True, student_id="x")])
+
+    assert engine.select("s1") == 3
+    served = [engine.select("s1") for _ in range(3)]
+    assert sorted([3] + served) == [0, 1, 2, 3]
+    # every passage served recently: only the current one is avoided
+    assert engine.select("s1", current=3) != 3
+
+
+def test_parameters_survive_rebinding_and_restarts(tmp_path):
+    path = str(tmp_path / "attempts.db")
+    log = AttemptLog(path, flush_interval=3600)
+    engine = AdaptiveEngine(log, "flyer")
+    engine.bind(make_bank())
+    log.record([event("1.1", True), event("2.1", False)])
+    learned = (engine.ability("s1"), engine.difficulty[0], engine.difficulty[2])
+
+    # a new version keeps what surviving blanks learned
+    engine.bind(make_bank(passages=5, version="v2"))
+    assert (engine.difficulty[0], engine.difficulty[2]) == learned[1:]
+    assert engine.difficulty[8] == 0.0
+    log.close()
+
+    log = AttemptLog(path, flush_interval=3600)
+    try:
+        restarted = AdaptiveEngine(log, "flyer")
+        restarted.bind(make_bank())
+        assert (restarted.ability("s1"), restarted.difficulty[0], restarted.difficulty[2]) == pytest.approx(learned)
+    finally:
+        log.close()
+
+
+def test_processes_sharing_a_database_build_on_each_other(tmp_path):
+    path = str(tmp_path / "attempts.db")
+    first_log = AttemptLog(path, flush_interval=3600)
+    second_log = AttemptLog(path, flush_interval=3600)
+    try:
+        first = AdaptiveEngine(first_log, "flyer")
+        second = AdaptiveEngine(second_log, "flyer")
+        first.bind(make_bank())
+        second.bind(make_bank())
+
+        # each process sees one answer before the other's is saved
+        first_log.record([event("1.1", True)])
+        second_log.record([event("1.1", True)])
+        first_log.flush()
+        second_log.flush()
+        first_log.follow()
+        second_log.follow()
+
+        single = AdaptiveEngine(AttemptLog(str(tmp_path / "single.db"), flush_interval=3600), "flyer")
+        single.bind(make_bank())
+        single._log.record([event("1.1", True), event("1.1", True)])
+        single._log.close()
+        expected = (single.ability("s1"), single.difficulty[0], single.attempts[0], single.passage_sum[0])
+        for engine in (first, second):
+            assert (engine.ability("s1"), engine.difficulty[0], engine.attempts[0],
+                    engine.passage_sum[0]) == pytest.approx(expected)
+    finally:
+        first_log.close()
+        second_log.close()
+
+    log = AttemptLog(path, flush_interval=3600)
+    try:
+        restarted = AdaptiveEngine(log, "flyer")
+        restarted.bind(make_bank())
+        assert restarted.attempts[0] == 2
+        assert restarted.ability("s1") == pytest.approx(expected[0])
+    finally:
+        log.close()
@@ -0,0 +1,114 @@
+import sqlite3
+
+import pytest
+
+from storage.attempts import AttemptLog, make_event
+
+# Flushes and follows are driven by the tests, not the daemon thread
+NEVER = 3600
+
+
+def event(blank_id, correct=True, student_id="s1", ts=1000.0):
+    return make_event(student_id, "flyer", "v1", blank_id.partition(".")[0], blank_id,
+                      "option", correct, "Collocation", 1200, ts=ts)
+
+
+@pytest.fixture
+def open_log(tmp_path):
+    logs = []
+
+    def open_log():
+        log = AttemptLog(str(tmp_path / "attempts.db"), flush_interval=NEVER)
+        logs.append(log)
+        return log
+
+    yield open_log
+    for log in logs:
+        log.close()
+
+
+def test_record_buffers_and_notifies_listeners(open_log):
+    log = open_log()
+    seen = []
+    log.subscribe(seen.extend)
+
+    log.record([event("1.1"), event("1.2", correct=False)])
+
+    assert [e["blank_id"] for e in seen] == ["1.1", "1.2"]
+    assert log.pending() == 2
+    with log.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0] == 0
+
+
+def test_flush_writes_events_and_runs_hooks_in_the_transaction(open_log):
+    log = open_log()
+    hooked = []
+    log.on_flush(lambda conn, events: hooked.append(
+        (conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0], len(events))
+    ))
+
+    log.record([event("1.1"), event("1.2", correct=False)])
+    assert log.flush() == 2
+    assert log.flush() == 0
+
+    # the hook already sees the rows it summarizes
+    assert hooked == [(2, 2)]
+    assert log.pending() == 0
+    assert [(e["blank_id"], e["correct"]) for e in log.history("s1")] == [("1.1", 1), ("1.2", 0)]
+
+
+def test_failed_flush_keeps_the_batch(open_log):
+    log = open_log()
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky_hook(conn, events):
+        if failures:
+            raise failures.pop()
+
+    log.on_flush(flaky_hook)
+    log.record([event("1.1")])
+    log.record([event("1.2")])
+
+    with pytest.raises(sqlite3.OperationalError):
+        log.flush()
+    assert log.pending() == 2
+
+    assert log.flush() == 2
+    assert [e["blank_id"] for e in log.history("s1")] == ["1.1", "1.2"]
+
+
+def test_follow_hands_other_processes_rows_to_listeners(open_log):
+    writer, reader = open_log(), open_log()
+    written, read = [], []
+    writer.subscribe(written.extend)
+    reader.subscribe(read.extend)
+
+    writer.record([event("1.1"), event("1.2")])
+    writer.flush()
+
+    assert reader.follow() == 2
+    assert [e["blank_id"] for e in read] == ["1.1", "1.2"]
+    # each row is followed once, and never back into the log that wrote it
+    assert reader.follow() == 0
+    assert writer.follow() == 0
+    assert [e["blank_id"] for e in written] == ["1.1", "1.2"]
+
+
+def test_attach_reaches_every_event_exactly_once(open_log):
+    writer, reader = open_log(), open_log()
+
+    # committed after reader opened, before anything attached to it
+    writer.record([event("1.1"), event("1.2")])
+    writer.flush()
+
+    counted = []
+    with reader.attach(counted.extend, lambda conn, events: None) as conn:
+        loaded = conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+
+    writer.record([event("1.3")])
+    writer.flush()
+    reader.follow()
+
+    # the first two come from the table, only the third through the listener
+    assert loaded == 2
+    assert [e["blank_id"] for e in counted] == ["1.3"]
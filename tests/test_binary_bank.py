@@ -0,0 +1,86 @@
+import json
+import os
+from types import MappingProxyType
+
+import pytest
+
+from binary_bank import write_binary_bank
+from flyer_converter import build_item_bank
+from practice.item_bank import ItemBank, MappedItemBank, load_item_bank, open_mapped_bank
+
+
+def raw_bank():
+    passages = [
+        {"id": "1", "topic": "Campus", "passage_text": "(1) ______ café (2) ______", "blank_ids": ["1.1", "1.2"]},
+        {"id": "2", "topic": None, "passage_text": "(1) ______", "blank_ids": ["2.1"]},
+    ]
+    blanks = [
+        {
+            "id": "1.1", "passage_id": "1", "blank": 1,
+            "options": ["a", "b", "c", "d"], "correct_answer": "b", "correct_letter": "B",
+            "error_type": "Collocation Error (Preposition)",
+            "error_analysis": {"a": {"error_type": "Word Order"}, "c": {}},
+        },
+        {"id": "1.2", "passage_id": "1", "blank": 2, "options": ["x", "y"],
+         "correct_answer": "y", "correct_letter": "B", "error_type": None, "error_analysis": {}},
+        {"id": "2.1", "passage_id": "2", "blank": 1, "options": ["p", "q", "r"],
+         "correct_answer": "p", "correct_letter": "A", "error_type": "Word Order", "error_analysis": {}},
+    ]
+    return build_item_bank("flyer", passages, blanks)
+
+
+def thaw(value):
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = str(tmp_path / "flyer.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(raw_bank(), f, ensure_ascii=False)
+    return path
+
+
+def test_round_trip_matches_the_json_bank(json_path):
+    with open(json_path, encoding="utf-8") as f:
+        parsed = ItemBank(json_path, "v", json.load(f))
+
+    mapped = open_mapped_bank(write_binary_bank(json_path))
+
+    assert mapped.task == "flyer" and len(mapped) == len(parsed)
+    assert thaw(list(mapped.passages)) == thaw(list(parsed.passages))
+    assert thaw(list(mapped.blanks)) == thaw(list(parsed.blanks))
+    assert thaw(mapped.blank("2.1")) == thaw(parsed.blank("2.1"))
+    assert mapped.blank("9.9") is None
+    assert mapped.index_of("2") == 1 and mapped.index_of("9") is None
+
+
+def test_binary_twin_is_only_used_while_it_matches_the_json(json_path):
+    write_binary_bank(json_path)
+    bank = load_item_bank(json_path)
+    assert isinstance(bank, MappedItemBank)
+    assert open_mapped_bank(bank.path, version="another json") is None
+
+    data = raw_bank()
+    data["blanks"][0].update(correct_answer="a", correct_letter="A")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    stat = os.stat(json_path)
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    reloaded = load_item_bank(json_path)
+    assert not isinstance(reloaded, MappedItemBank)
+    assert reloaded.blank("1.1")["correct_answer"] == "a"
+
+
+def test_not_a_binary_bank(tmp_path, json_path):
+    with pytest.raises(ValueError):
+        open_mapped_bank(json_path)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"format": "reorder/1", "items": []}, f)
+    with pytest.raises(ValueError):
+        write_binary_bank(json_path)
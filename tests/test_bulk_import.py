@@ -0,0 +1,82 @@
+import csv
+import json
+import os
+
+from bulk_import import bank_key, bulk_import, detect_layout
+
+FLAT_HEADER = ["ID", "Topic", "Question", "Option A", "Option B", "Option C", "Option D",
+               "Correct Answer", "Error Type"]
+PACKED_HEADER = ["ID", "Topic", "Question", "Options", "Answers", "Error Types"]
+
+
+def flat_row(item_id):
+    return [item_id, "Campus", "(1) ______", "a", "b", "c", "d", "B", "Word Form"]
+
+
+PACKED_ROW = ["7", "Sale", "(1) ______ (2) ______",
+              "(1): A. cheap | B. cheaper | C. cheapest | D. cheaply; (2): A. on | B. in | C. at | D. by",
+              "1:B, 2:A", "(1): Word Form; (2): Collocation"]
+
+
+def write_csv(path, header, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+def read_bank(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_bank_key_groups_parts_of_one_bank():
+    assert bank_key("raw/flyer_gap-fill.csv") == "flyer_gap-fill"
+    assert bank_key("raw/spring/flyer_gap-fill.spring.csv") == "flyer_gap-fill"
+
+
+def test_detect_layout(tmp_path):
+    assert detect_layout(write_csv(str(tmp_path / "flat.csv"), FLAT_HEADER, [flat_row("1.1")])) == "flat"
+    assert detect_layout(write_csv(str(tmp_path / "packed.csv"), PACKED_HEADER, [PACKED_ROW])) == "packed"
+    assert detect_layout(write_csv(str(tmp_path / "other.csv"), ["a", "b"], [["1", "2"]])) is None
+
+
+def test_bulk_import_writes_one_bank_per_key(tmp_path):
+    raw, out = tmp_path / "raw", str(tmp_path / "out")
+    write_csv(str(raw / "flyer_gap-fill.csv"), FLAT_HEADER, [flat_row("1.1"), flat_row("1.2")])
+    write_csv(str(raw / "spring" / "flyer_gap-fill.spring.csv"), FLAT_HEADER, [flat_row("2.1")])
+    write_csv(str(raw / "advertisement_gap-fill.csv"), PACKED_HEADER, [PACKED_ROW])
+    write_csv(str(raw / "notes.csv"), ["a", "b"], [["1", "2"]])
+
+    results = bulk_import(str(raw), out, workers=2, binary=False)
+
+    errors = {os.path.basename(r["file"]): r["error"] for r in results}
+    assert errors == {
+        "advertisement_gap-fill.csv": None,
+        "flyer_gap-fill.csv": None,
+        "flyer_gap-fill.spring.csv": None,
+        "notes.csv": "unrecognised column layout",
+    }
+    assert sorted(os.listdir(out)) == ["advertisement_gap-fill.json", "flyer_gap-fill.json"]
+
+    flyer = read_bank(os.path.join(out, "flyer_gap-fill.json"))
+    assert flyer["task"] == "flyer"
+    assert [b["id"] for b in flyer["blanks"]] == ["1.1", "1.2", "2.1"]
+    assert [p["blank_ids"] for p in flyer["passages"]] == [["1.1", "1.2"], ["2.1"]]
+
+    advert = read_bank(os.path.join(out, "advertisement_gap-fill.json"))
+    assert advert["task"] == "advertisement"
+    assert [b["correct_answer"] for b in advert["blanks"]] == ["cheaper", "on"]
+
+
+def test_bank_with_a_clashing_part_is_not_replaced(tmp_path):
+    raw, out = tmp_path / "raw", str(tmp_path / "out")
+    write_csv(str(raw / "flyer_gap-fill.csv"), FLAT_HEADER, [flat_row("1.1")])
+    write_csv(str(raw / "flyer_gap-fill.spring.csv"), FLAT_HEADER, [flat_row("1.1")])
+
+    results = bulk_import(str(raw), out, workers=2, binary=False)
+
+    assert all("1.1 appears in more than one CSV" in r["error"] for r in results)
+    assert os.listdir(out) == []
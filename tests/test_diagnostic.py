@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from practice import cat
+from practice.cat import MAX_ITEMS, MIN_ITEMS, SE_TARGET, AdaptiveTest, ItemTables, item_tables, level_of
+from practice.diagnostic import grade_answer
+from practice.item_bank import ItemBank
+
+
+def make_bank(blanks=30, version="v1"):
+    data = {"format": "passage-blank/1", "task": "flyer", "passages": [], "blanks": []}
+    for p in range(1, blanks + 1):
+        data["passages"].append({"id": str(p), "topic": "T", "passage_text": "", "blank_ids": [f"{p}.1"]})
+        data["blanks"].append({"id": f"{p}.1", "passage_id": str(p), "blank": 1,
+                               "options": ["a", "b", "c"], "correct_answer": "b"})
+    return ItemBank("memory", version, data)
+
+
+def test_diagnostic_grades_with_the_answer_key():
+    bank = make_bank()
+    blank = bank.blanks[0]
+
+    assert grade_answer(bank, blank, "b")
+    for chosen in ("a", "c", None, "not an option"):
+        assert not grade_answer(bank, blank, chosen)
+
+
+@pytest.mark.parametrize("ability, level", [(2.5, "Advanced"), (-2.5, "Beginner")])
+def test_diagnostic_places_clear_cases(ability, level):
+    difficulty = np.linspace(-3, 3, 60)
+    tables = ItemTables(make_bank(60), difficulty)
+    rng = np.random.default_rng(1)
+
+    test = AdaptiveTest(tables)
+    while not test.finished():
+        item = test.next_item()
+        assert item not in test.used
+        p = 1.0 / (1.0 + np.exp(difficulty[item] - ability))
+        test.answer(item, rng.random() < p)
+
+    assert MIN_ITEMS <= len(test.used) <= MAX_ITEMS
+    assert test.se < SE_TARGET or len(test.used) == MAX_ITEMS
+    assert test.level() == level
+    assert test.next_item() is None
+
+
+def test_small_bank_ends_when_every_item_is_used():
+    tables = ItemTables(make_bank(3), np.zeros(3))
+    test = AdaptiveTest(tables)
+    for _ in range(3):
+        test.answer(test.next_item(), True)
+    assert test.finished() and sorted(test.used) == [0, 1, 2]
+
+
+def test_levels():
+    assert level_of(1.5) == "Advanced"
+    assert level_of(0.0) == "Intermediate"
+    assert level_of(-10) == "Beginner"
+
+
+def test_tables_are_shared_per_version():
+    first = item_tables("test-task", make_bank(version="a"), np.zeros(30))
+    assert item_tables("test-task", make_bank(version="a"), np.ones(30)) is first
+
+    second = item_tables("test-task", make_bank(version="b"), np.zeros(30))
+    assert second is not first
+    assert [k for k in cat._tables if k[0] == "test-task"] == [("test-task", "b")]
@@ -0,0 +1,63 @@
+import pytest
+
+from error_taxonomy import CODES, OTHER, TAXONOMY, ErrorTaxonomy, label_of, normalize_label
+from flyer_converter import build_item_bank
+from practice.grading import AnswerKey
+from practice.item_bank import ItemBank
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Word Order ", ("Word Order", None)),
+    ("  word   order", ("Word Order", None)),
+    ("Collocation Error (Preposition)", ("Collocation", "Preposition")),
+    ("collocation errors ( idiom )", ("Collocation", "Idiomatic Expression")),
+    ("Spelling", ("Spelling", None)),
+    (None, None),
+    ("   ", None),
+    (float("nan"), None),
+])
+def test_normalize_label(text, expected):
+    assert normalize_label(text) == expected
+
+
+def test_codes_are_the_shared_table_positions():
+    taxonomy = ErrorTaxonomy()
+    assert taxonomy.code("Word Order ") == taxonomy.code("WORD ORDER") == CODES["word order"]
+    assert taxonomy.code("") is None
+    assert [entry["label"] for entry in taxonomy.table()] == [label_of(*entry) for entry in TAXONOMY]
+    assert len(CODES) == len(TAXONOMY)
+
+
+def test_unknown_labels_fall_back_and_are_reported(capsys):
+    taxonomy = ErrorTaxonomy()
+
+    assert taxonomy.code("Collocation (Phrasal Verb)") == CODES["collocation"]
+    assert taxonomy.code("Spelling") == CODES[OTHER.casefold()]
+    assert taxonomy.label(taxonomy.code("Spelling")) == OTHER
+
+    taxonomy.report()
+    assert "Collocation (Phrasal Verb), Spelling" in capsys.readouterr().out
+
+
+def bank(name, labels):
+    passages = [{"id": "1", "topic": "T", "passage_text": "", "blank_ids": []}]
+    blanks = []
+    for i, label in enumerate(labels, 1):
+        passages[0]["blank_ids"].append(f"1.{i}")
+        blanks.append({"id": f"1.{i}", "passage_id": "1", "blank": i, "options": ["a", "b"],
+                       "correct_answer": "a", "error_type": label, "error_analysis": {"b": {"error_type": label}}})
+    return ItemBank(name, name, build_item_bank("flyer", passages, blanks))
+
+
+def test_same_error_has_the_same_code_in_every_bank():
+    first = bank("first", ["Word Order", "Collocation Error (Preposition)"])
+    second = bank("second", ["collocation (preposition)", "Adjective Form", "word order "])
+
+    assert first.taxonomy == second.taxonomy
+    assert [b["error_code"] for b in first.blanks] == [CODES["word order"], CODES["collocation (preposition)"]]
+    assert second.blanks[0]["error_code"] == first.blanks[1]["error_code"]
+
+    # analytics of both banks count under the same category codes
+    _, first_categories = AnswerKey(first).grade([0, 1], [1, 1])
+    _, second_categories = AnswerKey(second).grade([2, 0], [1, 1])
+    assert first_categories.tolist() == second_categories.tolist()
@@ -0,0 +1,126 @@
+import json
+
+import pandas as pd
+import pytest
+
+from flyer_converter import (convert_flyer_csv_incremental, convert_flyer_csv_streaming,
+                             convert_flyer_csv_to_json, manifest_path_for)
+
+COLUMNS = ["ID", "Topic", "Question", "Option A", "Option B", "Option C", "Option D",
+           "Correct Answer", "Error Type"]
+
+
+def row(item_id, correct="A", error_type="Word Form", topic="Campus"):
+    passage = item_id.partition(".")[0]
+    return [item_id, topic, f"Passage {passage} (1) ______", f"{item_id} a", f"{item_id} b",
+            f"{item_id} c", f"{item_id} d", correct, error_type]
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def read_bank(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "flyer.csv", str(tmp_path / "flyer_gap-fill.json")
+
+
+def test_passages_are_stored_once_and_reference_their_blanks(paths):
+    csv, output = paths
+    write_csv(csv, [row("1.1"), row("1.2", "C", "Collocation"), row("2.1", "B", topic="Trip")])
+
+    convert_flyer_csv_to_json(csv, output)
+
+    bank = read_bank(output)
+    assert bank["format"] == "passage-blank/1" and bank["task"] == "flyer"
+    assert [(p["id"], p["topic"], p["blank_ids"]) for p in bank["passages"]] == [
+        ("1", "Campus", ["1.1", "1.2"]), ("2", "Trip", ["2.1"]),
+    ]
+    blank = bank["blanks"][1]
+    assert (blank["id"], blank["passage_id"], blank["blank"]) == ("1.2", "1", 2)
+    assert blank["options"] == ["1.2 a", "1.2 b", "1.2 c", "1.2 d"]
+    assert (blank["correct_answer"], blank["correct_letter"]) == ("1.2 c", "C")
+    # every distractor, and only the distractors, is analysed
+    assert sorted(blank["error_analysis"]) == ["1.2 a", "1.2 b", "1.2 d"]
+    assert "passage_text" not in blank
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 100])
+def test_streaming_matches_the_row_by_row_converter(paths, tmp_path, chunksize):
+    csv, output = paths
+    # passage 2 straddles chunk boundaries; "X" is not a valid letter
+    write_csv(csv, [row("1.1"), row("2.1", "B"), row("2.2", "D", "Collocation Error"),
+                    row("2.3", "X"), row("3.1", "C", "word order")])
+    convert_flyer_csv_to_json(csv, output)
+
+    streamed = str(tmp_path / "streamed.json")
+    assert convert_flyer_csv_streaming(csv, streamed, chunksize=chunksize) == 5
+
+    assert read_bank(streamed) == read_bank(output)
+
+
+def test_first_build_adds_every_row(paths):
+    csv, output = paths
+    write_csv(csv, [row("1.1"), row("1.2", "C"), row("2.1", "B")])
+
+    change = convert_flyer_csv_incremental(csv, output)
+
+    assert change == {"added": ["1.1", "1.2", "2.1"], "changed": [], "deleted": []}
+    bank = read_bank(output)
+    assert [p["blank_ids"] for p in bank["passages"]] == [["1.1", "1.2"], ["2.1"]]
+    assert [b["correct_answer"] for b in bank["blanks"]] == ["1.1 a", "1.2 c", "2.1 b"]
+    assert read_bank(manifest_path_for(output))["last_change"] == change
+
+
+def test_unchanged_csv_is_not_rewritten(paths):
+    csv, output = paths
+    write_csv(csv, [row("1.1"), row("1.2")])
+    convert_flyer_csv_incremental(csv, output)
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(" ")    # marks the file: a rebuild would drop it
+
+    assert convert_flyer_csv_incremental(csv, output) == {"added": [], "changed": [], "deleted": []}
+    with open(output, encoding="utf-8") as f:
+        assert f.read().endswith(" ")
+
+
+def test_only_changed_rows_are_rebuilt(paths, tmp_path):
+    csv, output = paths
+    write_csv(csv, [row("1.1"), row("1.2"), row("2.1"), row("2.2")])
+    convert_flyer_csv_incremental(csv, output)
+
+    edited = [row("1.1"), row("1.2", "D", "Collocation"), row("2.1"), row("3.1")]
+    write_csv(csv, edited)
+    change = convert_flyer_csv_incremental(csv, output)
+
+    assert change == {"added": ["3.1"], "changed": ["1.2"], "deleted": ["2.2"]}
+
+    # same bank as converting the edited CSV from scratch
+    fresh_csv, fresh_output = tmp_path / "fresh.csv", str(tmp_path / "fresh.json")
+    write_csv(fresh_csv, edited)
+    convert_flyer_csv_incremental(fresh_csv, fresh_output)
+    assert read_bank(output) == read_bank(fresh_output)
+
+
+def test_missing_output_rebuilds_every_row(paths, tmp_path):
+    csv, output = paths
+    write_csv(csv, [row("1.1"), row("1.2")])
+    convert_flyer_csv_incremental(csv, output)
+    (tmp_path / "flyer_gap-fill.json").unlink()
+
+    change = convert_flyer_csv_incremental(csv, output)
+
+    assert change == {"added": [], "changed": ["1.1", "1.2"], "deleted": []}
+    assert [b["id"] for b in read_bank(output)["blanks"]] == ["1.1", "1.2"]
+
+
+def test_duplicate_ids_are_rejected(paths):
+    csv, output = paths
+    write_csv(csv, [row("1.1"), row("1.1", "B")])
+    with pytest.raises(ValueError, match="1.1"):
+        convert_flyer_csv_incremental(csv, output)
@@ -0,0 +1,103 @@
+import pytest
+
+from flyer_converter import build_item_bank
+from practice import grading
+from practice.grading import CORRECT, UNANSWERED, UNCATEGORIZED, AnswerKey, answer_key
+from practice.item_bank import ItemBank
+
+
+def raw_bank():
+    passages = [{"id": "1", "topic": "Campus", "passage_text": "(1) ______ (2) ______", "blank_ids": ["1.1", "1.2"]}]
+    blanks = [
+        {
+            "id": "1.1", "passage_id": "1", "blank": 1,
+            "options": ["a", "b", "c", "d"], "correct_answer": "b",
+            "error_type": "Collocation Error (Preposition)",
+            "error_analysis": {
+                "a": {"error_type": "Word Order"},
+                "c": {},
+                "d": {"error_type": "collocation error (preposition)"},
+            },
+        },
+        {
+            "id": "1.2", "passage_id": "1", "blank": 2,
+            "options": ["x", "y", "z"], "correct_answer": "z",
+            "error_type": None, "error_analysis": {},
+        },
+    ]
+    return passages, blanks
+
+
+@pytest.fixture(params=["taxonomy", "legacy"])
+def bank(request):
+    passages, blanks = raw_bank()
+    if request.param == "taxonomy":
+        data = build_item_bank("flyer", passages, blanks)
+    else:
+        data = {"format": "passage-blank/1", "task": "flyer", "passages": passages, "blanks": blanks}
+    return ItemBank("memory", f"test-{request.param}", data)
+
+
+def test_grade_choices(bank):
+    key = AnswerKey(bank)
+    rows = [0, 0, 0, 0, 0, 1, 1]
+    choices = [1, 0, 2, 3, -1, 2, 0]
+
+    is_correct, category = key.grade(rows, choices)
+
+    # older banks keep the labels as typed, taxonomy banks normalize them
+    if bank.taxonomy:
+        blank_label = distractor_label = "Collocation (Preposition)"
+    else:
+        blank_label, distractor_label = "Collocation Error (Preposition)", "collocation error (preposition)"
+    assert is_correct.tolist() == [True, False, False, False, False, True, False]
+    assert key.category_names(category).tolist() == [
+        CORRECT, "Word Order", blank_label, distractor_label, UNANSWERED, CORRECT, UNCATEGORIZED,
+    ]
+
+
+def test_blank_missing_from_the_version_grades_wrong(bank):
+    key = AnswerKey(bank)
+    is_correct, category = key.grade([-1, 0], [1, 1])
+    assert is_correct.tolist() == [False, True]
+    assert key.category_names(category).tolist() == [UNCATEGORIZED, CORRECT]
+
+
+def test_taxonomy_groups_roll_up_to_the_main_category():
+    passages, blanks = raw_bank()
+    key = AnswerKey(ItemBank("memory", "test-groups", build_item_bank("flyer", passages, blanks)))
+    _, category = key.grade([0, 0, 0, 0], [0, 2, 3, 1])
+
+    assert key.group_names(category).tolist() == ["Word Order", "Collocation", "Collocation", CORRECT]
+    assert key.category_counts(category, by_group=True).to_dict() == {
+        "Collocation": 2, "Word Order": 1, CORRECT: 1,
+    }
+
+
+def test_encode_many_matches_encode(bank):
+    key = AnswerKey(bank)
+    blank_ids = ["1.1", "1.1", "1.2", "9.9", "1.2", "1.1"]
+    chosen = ["b", None, "q", "a", "z", "d"]
+
+    rows, codes = key.encode_many(blank_ids, chosen)
+
+    assert rows.tolist() == [0, 0, 1, -1, 1, 0]
+    assert codes.tolist() == [1, -1, -1, -1, 2, 3]
+    assert codes.tolist() == key.encode(key.rows(blank_ids), chosen).tolist()
+
+
+def test_answer_key_is_built_once_per_version(bank):
+    assert answer_key(bank) is answer_key(bank)
+
+
+def test_new_version_replaces_the_cached_key(monkeypatch):
+    monkeypatch.setattr(grading, "_keys", {})
+    passages, blanks = raw_bank()
+    data = {"format": "passage-blank/1", "task": "flyer", "passages": passages, "blanks": blanks}
+    first = answer_key(ItemBank("flyer.json", "v1", data))
+
+    second = answer_key(ItemBank("flyer.json", "v2", data))
+    other = answer_key(ItemBank("notice.json", "v1", data))
+
+    assert second is not first and second.version == "v2"
+    assert grading._keys == {"flyer.json": second, "notice.json": other}
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from practice import item_bank
+from practice.item_bank import BankWatcher, ItemBank, ReorderBank, load_item_bank
+
+
+def bank_data(correct="b"):
+    return {
+        "format": "passage-blank/1",
+        "task": "flyer",
+        "passages": [{"id": "1", "topic": "Campus", "passage_text": "(1) ______", "blank_ids": ["1.1"]}],
+        "blanks": [{"id": "1.1", "passage_id": "1", "blank": 1, "options": ["a", "b"], "correct_answer": correct}],
+    }
+
+
+def write_bank(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_one_shared_bank_per_file(tmp_path):
+    path = write_bank(tmp_path / "bank.json", bank_data())
+
+    bank = load_item_bank(path)
+
+    assert load_item_bank(path) is bank
+    assert bank[0]["questions"][0] is bank.blank("1.1")
+    assert bank.index_of("1") == 0 and bank.index_of("9") is None
+
+
+def test_bank_is_read_only(tmp_path):
+    bank = load_item_bank(write_bank(tmp_path / "bank.json", bank_data()))
+    with pytest.raises(TypeError):
+        bank.blank("1.1")["correct_answer"] = "a"
+    with pytest.raises(TypeError):
+        bank[0]["questions"][0] = None
+
+
+def test_touched_file_keeps_its_bank(tmp_path):
+    path = write_bank(tmp_path / "bank.json", bank_data())
+    bank = load_item_bank(path)
+
+    bump_mtime(path)
+
+    assert load_item_bank(path) is bank
+
+
+def test_changed_file_is_parsed_again(tmp_path):
+    path = write_bank(tmp_path / "bank.json", bank_data())
+    bank = load_item_bank(path)
+
+    write_bank(path, bank_data(correct="a"))
+    bump_mtime(path)
+    reloaded = load_item_bank(path)
+
+    assert reloaded is not bank and reloaded.version != bank.version
+    assert reloaded.blank("1.1")["correct_answer"] == "a"
+    # sessions still holding the old version keep it intact
+    assert bank.blank("1.1")["correct_answer"] == "b"
+
+
+def test_not_a_bank(tmp_path):
+    with pytest.raises(ValueError):
+        load_item_bank(write_bank(tmp_path / "bank.json", [{"id": "1.1"}]))
+    with pytest.raises(FileNotFoundError):
+        load_item_bank(str(tmp_path / "missing.json"))
+    assert isinstance(load_item_bank(write_bank(tmp_path / "ok.json", bank_data())), ItemBank)
+
+
+def test_inconsistent_bank_is_a_value_error(tmp_path):
+    dangling = bank_data()
+    dangling["passages"][0]["blank_ids"].append("1.9")
+    no_id = bank_data()
+    del no_id["blanks"][0]["id"]
+    for data in (dangling, no_id, {"passages": [None], "blanks": []}):
+        with pytest.raises(ValueError):
+            ItemBank("memory", "v", data)
+    with pytest.raises(ValueError):
+        ReorderBank("memory", "v", {"format": "reorder/1", "items": ["no id"]})
+
+
+@pytest.fixture
+def watcher(monkeypatch):
+    monkeypatch.setattr(item_bank, "_banks", {})
+    watcher = BankWatcher(3600)
+    # loads are served from the cache, as in the app
+    monkeypatch.setattr(item_bank, "_watcher", watcher)
+    yield watcher
+    watcher.stop()
+
+
+def change(path, data):
+    write_bank(path, data)
+    bump_mtime(path)
+
+
+def test_watcher_keeps_the_good_bank_and_loads_the_fix(tmp_path, watcher, caplog):
+    path = write_bank(tmp_path / "bank.json", bank_data())
+    bank = load_item_bank(path)
+
+    broken = bank_data()
+    broken["passages"][0]["blank_ids"].append("1.9")
+    change(path, broken)
+    with caplog.at_level(logging.WARNING, logger="practice.item_bank"):
+        watcher.check()     # change seen
+        watcher.check()     # unchanged for a tick: reload, which fails
+    assert "Keeping bank.json" in caplog.text
+    assert load_item_bank(path) is bank
+
+    change(path, bank_data(correct="a"))
+    watcher.check()
+    watcher.check()
+    assert load_item_bank(path).blank("1.1")["correct_answer"] == "a"
+    assert watcher.reloads == 1
+
+
+def test_watcher_thread_survives_a_failed_check(monkeypatch, caplog):
+    calls = []
+
+    def check(self):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise KeyError("boom")
+
+    monkeypatch.setattr(BankWatcher, "check", check)
+    with caplog.at_level(logging.ERROR, logger="practice.item_bank"):
+        watcher = BankWatcher(0.01)
+        deadline = time.monotonic() + 5
+        while len(calls) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        watcher.stop()
+
+    assert len(calls) >= 3
+    assert "Item bank check failed" in caplog.text
+
@@ -0,0 +1,92 @@
+import pytest
+
+from storage.attempts import AttemptLog, make_event
+from storage.mistakes import UNCATEGORIZED, MistakeIndex
+
+
+def event(blank_id, correct, ts, error_type="Collocation", task="flyer", chosen="wrong"):
+    return make_event("s1", task, "v1", blank_id.partition(".")[0], blank_id,
+                      chosen, correct, error_type, 1200, ts=ts)
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = AttemptLog(str(tmp_path / "attempts.db"), flush_interval=3600)
+    yield log
+    log.close()
+
+
+def keys(entries):
+    return [e["blank_id"] for e in entries]
+
+
+def test_wrong_answers_are_listed_newest_first(log):
+    mistakes = MistakeIndex(log)
+    log.record([event("1.1", False, 1), event("1.2", False, 2), event("2.1", False, 3, error_type="Word Order"),
+                event("2.2", False, 4, error_type=" ")])
+
+    assert mistakes.categories("s1") == {"Collocation": 2, UNCATEGORIZED: 1, "Word Order": 1}
+    assert keys(mistakes.unresolved("s1", "Collocation")) == ["1.2", "1.1"]
+    assert keys(mistakes.unresolved("s1", "Collocation", limit=1)) == ["1.2"]
+
+
+def test_correct_answer_resolves_the_mistake(log):
+    mistakes = MistakeIndex(log)
+    log.record([event("1.1", False, 1), event("1.2", False, 2)])
+
+    log.record([event("1.1", True, 3)])
+
+    assert keys(mistakes.unresolved("s1", "Collocation")) == ["1.2"]
+    log.record([event("1.2", True, 4)])
+    assert mistakes.categories("s1") == {}
+    assert mistakes.in_passage("s1", "flyer", "1") == set()
+
+
+def test_repeated_mistake_moves_to_the_front_and_counts(log):
+    mistakes = MistakeIndex(log)
+    log.record([event("1.1", False, 1), event("1.2", False, 2)])
+    log.record([event("1.1", False, 3, chosen="again")])
+
+    newest = mistakes.unresolved("s1", "Collocation")[0]
+    assert (newest["blank_id"], newest["wrong_count"], newest["chosen"]) == ("1.1", 2, "again")
+
+
+def test_mistakes_by_passage(log):
+    mistakes = MistakeIndex(log)
+    log.record([event("1.1", False, 1), event("1.3", False, 2, error_type="Word Order"),
+                event("2.1", False, 3), event("1.1", False, 4, task="reorder")])
+
+    assert mistakes.in_passage("s1", "flyer", "1") == {"1.1", "1.3"}
+    assert mistakes.in_passage("s1", "reorder", "1") == {"1.1"}
+    log.record([event("1.3", True, 5)])
+    assert mistakes.in_passage("s1", "flyer", "1") == {"1.1"}
+    assert mistakes.in_passage("s2", "flyer", "1") == set()
+
+
+def test_tasks_are_kept_apart(log):
+    mistakes = MistakeIndex(log)
+    log.record([event("1.1", False, 1), event("1.1", False, 2, task="reorder")])
+
+    assert mistakes.categories("s1", task="flyer") == {"Collocation": 1}
+    assert [e["task"] for e in mistakes.unresolved("s1", "Collocation", task="reorder")] == ["reorder"]
+    log.record([event("1.1", True, 3, task="reorder")])
+    assert mistakes.categories("s1", task="reorder") == {}
+    assert mistakes.categories("s1") == {"Collocation": 1}
+
+
+def test_index_is_reloaded_from_the_mistakes_table(tmp_path):
+    path = str(tmp_path / "attempts.db")
+    log = AttemptLog(path, flush_interval=3600)
+    MistakeIndex(log)
+    log.record([event("1.1", False, 1), event("1.2", False, 2), event("1.1", False, 3)])
+    log.record([event("1.2", True, 4)])
+    log.close()
+
+    log = AttemptLog(path, flush_interval=3600)
+    try:
+        mistakes = MistakeIndex(log)
+        [entry] = mistakes.unresolved("s1", "Collocation")
+        assert (entry["blank_id"], entry["wrong_count"]) == ("1.1", 2)
+        assert mistakes.in_passage("s1", "flyer", "1") == {"1.1"}
+    finally:
+        log.close()
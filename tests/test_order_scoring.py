@@ -0,0 +1,75 @@
+import random
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from practice.order_scoring import (RUBRICS, in_order_positions, inversion_counts, inversions,
+                                    lis_length, lis_lengths, score_order, score_orders)
+
+
+def brute_lis(order):
+    best = [1] * len(order)
+    for j in range(len(order)):
+        for i in range(j):
+            if order[i] < order[j]:
+                best[j] = max(best[j], best[i] + 1)
+    return max(best, default=0)
+
+
+def brute_inversions(order):
+    return sum(1 for a, b in combinations(order, 2) if a > b)
+
+
+def permutations(count, n, seed=7):
+    rng = random.Random(seed)
+    return [rng.sample(range(n), n) for _ in range(count)]
+
+
+@pytest.mark.parametrize("rubric", RUBRICS)
+def test_correct_and_reversed_orders(rubric):
+    assert score_order([0, 1, 2, 3, 4], rubric) == 1.0
+    assert score_order([4, 3, 2, 1, 0], rubric) == 0.0
+    assert score_order([0], rubric) == 1.0
+    assert score_order([], rubric) == 1.0
+
+
+def test_partial_credit():
+    # one sentence moved to the front: 3 of 4 still in relative order
+    assert score_order([3, 0, 1, 2], "lis") == pytest.approx(2 / 3)
+    assert score_order([3, 0, 1, 2], "kendall") == pytest.approx(0.5)
+
+
+def test_unknown_rubric():
+    with pytest.raises(ValueError):
+        score_order([0, 1], "spearman")
+    with pytest.raises(ValueError):
+        score_orders([[0, 1]], "spearman")
+
+
+@pytest.mark.parametrize("n", [2, 5, 8, 13])
+def test_one_order_matches_brute_force(n):
+    for order in permutations(50, n):
+        assert lis_length(order) == brute_lis(order)
+        assert inversions(order) == brute_inversions(order)
+        kept = in_order_positions(order)
+        assert len(kept) == brute_lis(order)
+        assert [order[j] for j in kept] == sorted(order[j] for j in kept)
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 8, 13])
+def test_batch_matches_one_by_one(n):
+    orders = np.array(permutations(200, n), dtype=np.int64)
+    assert lis_lengths(orders).tolist() == [lis_length(o) for o in orders.tolist()]
+    assert inversion_counts(orders).tolist() == [inversions(o) for o in orders.tolist()]
+    for rubric in RUBRICS:
+        expected = [score_order(o, rubric) for o in orders.tolist()]
+        assert score_orders(orders, rubric) == pytest.approx(expected)
+
+
+def test_batch_of_mixed_lengths_keeps_input_order():
+    orders = permutations(3, 4) + [[0]] + permutations(3, 6, seed=1) + [[1, 0]]
+    random.Random(3).shuffle(orders)
+    for rubric in RUBRICS:
+        expected = [score_order(o, rubric) for o in orders]
+        assert score_orders(orders, rubric) == pytest.approx(expected)
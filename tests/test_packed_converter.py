@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+import re
+
+import pytest
+
+from packed_converter import MalformedRow, convert_packed_csv, parse_packed_row
+
+HEADER = ["ID", "Topic", "Question", "Options", "Answers", "Error Types"]
+OPTIONS = "(1): A. cheap | B. cheaper | C. cheapest | D. cheaply; (2): A. on | B. in | C. at | D. by"
+
+
+def packed_row(passage_id="7", options=OPTIONS, answers="1:B, 2:a", errors="(1): Word Form; (2): Collocation"):
+    return [passage_id, "Sale", "(1) ______ (2) ______", options, answers, errors]
+
+
+def test_parse_packed_row():
+    passage_id, topic, text, blanks = parse_packed_row(packed_row())
+
+    assert (passage_id, topic) == ("7", "Sale")
+    assert [b["id"] for b in blanks] == ["7.1", "7.2"]
+    assert blanks[0]["options"] == ["cheap", "cheaper", "cheapest", "cheaply"]
+    assert (blanks[1]["correct_answer"], blanks[1]["correct_letter"]) == ("on", "A")
+    assert blanks[1]["error_type"] == "Collocation"
+    assert sorted(blanks[0]["error_analysis"]) == ["cheap", "cheapest", "cheaply"]
+
+
+def test_packed_cells_are_found_by_position():
+    # header still naming Option_A..Option_D: the packed cells are the non-empty ones
+    row = packed_row()
+    _, _, _, blanks = parse_packed_row(row[:3] + [row[3], "", row[4], row[5], ""])
+    assert len(blanks) == 2
+
+
+@pytest.mark.parametrize("cells, reason", [
+    (["", "Sale", "text", OPTIONS, "1:B, 2:A", "(1): x; (2): y"], "missing ID"),
+    (["4", "T"], "too few columns: 2"),
+    (packed_row()[:5], "too few columns: 5"),
+    (packed_row(errors=""), "found 2"),
+    (packed_row(options="A. cheap | B. cheaper"), "no blanks"),
+    (packed_row(answers="1:B"), "answers for [1]"),
+    (packed_row(errors="(1): Word Form; (3): Collocation"), "error types for [1, 3]"),
+])
+def test_malformed_rows(cells, reason):
+    with pytest.raises(MalformedRow, match=re.escape(reason)):
+        parse_packed_row(cells)
+
+
+def test_malformed_rows_are_reported_and_skipped(tmp_path):
+    source = tmp_path / "advertisement.csv"
+    with open(source, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerow(packed_row("1"))
+        writer.writerow(packed_row("2", answers="1:B"))
+        writer.writerow([])
+        writer.writerow(packed_row("1"))
+        writer.writerow(packed_row("3"))
+    output = str(tmp_path / "advertisement.json")
+    report = io.StringIO()
+
+    assert convert_packed_csv(str(source), output, report=report) == 4
+
+    lines = report.getvalue().splitlines()
+    assert lines[0].startswith("⚠️ advertisement.csv line 3: blanks with options")
+    assert lines[1] == "⚠️ advertisement.csv line 5: duplicate passage ID 1"
+    assert lines[2] == "⚠️ 2 malformed rows skipped"
+    with open(output, encoding="utf-8") as f:
+        bank = json.load(f)
+    assert [p["id"] for p in bank["passages"]] == ["1", "3"]
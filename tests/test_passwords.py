@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from storage import passwords
+from storage.passwords import (KDFBusy, VerifiedCache, hash_password, hash_password_pooled, is_hashed,
+                               verify_password, verify_password_pooled)
+
+
+def test_hash_and_verify():
+    stored = hash_password("correct horse")
+
+    assert is_hashed(stored)
+    assert verify_password("correct horse", stored)
+    assert not verify_password("Correct horse", stored)
+
+
+def test_every_hash_gets_its_own_salt():
+    first, second = hash_password("pw"), hash_password("pw")
+    assert first != second
+    assert first.split("$")[4] != second.split("$")[4]
+
+
+def test_plaintext_accounts_still_verify():
+    assert not is_hashed("pw")
+    assert verify_password("pw", "pw")
+    assert not verify_password("pw2", "pw")
+
+
+def test_malformed_hash_never_verifies():
+    assert not verify_password("pw", "scrypt$16384$8$1$not base64$")
+    assert not verify_password("pw", "scrypt$broken")
+
+
+def test_pooled_calls_return_results():
+    stored = hash_password_pooled("pw")
+    assert verify_password_pooled("pw", stored)
+    assert not verify_password_pooled("nope", stored)
+
+
+def test_full_pool_fails_fast(monkeypatch):
+    monkeypatch.setattr(passwords, "_pending", threading.BoundedSemaphore(1))
+    passwords._pending.acquire()
+    with pytest.raises(KDFBusy):
+        hash_password_pooled("pw")
+    passwords._pending.release()
+    assert is_hashed(hash_password_pooled("pw"))
+
+
+def test_verified_cache_is_bound_to_password_and_hash():
+    cache = VerifiedCache()
+    cache.add("s1", "hash1", "pw")
+
+    assert cache.hit("s1", "hash1", "pw")
+    assert not cache.hit("s1", "hash1", "other")
+    # a password change replaces the stored hash
+    assert not cache.hit("s1", "hash2", "pw")
+    assert not cache.hit("s2", "hash1", "pw")
+
+
+def test_verified_cache_expires_and_is_bounded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(passwords.time, "monotonic", lambda: now[0])
+    cache = VerifiedCache(maxsize=2, ttl=60)
+    cache.add("s1", "h", "pw")
+    cache.add("s2", "h", "pw")
+    cache.add("s3", "h", "pw")
+
+    assert not cache.hit("s1", "h", "pw")
+    assert cache.hit("s2", "h", "pw")
+    now[0] += 61
+    assert not cache.hit("s2", "h", "pw")
@@ -0,0 +1,79 @@
+import json
+import logging
+
+import pytest
+
+from devtools import profiling
+from devtools.profiling import Collector
+
+
+@pytest.fixture
+def collector(monkeypatch, tmp_path):
+    collector = Collector(str(tmp_path / "metrics.jsonl"))
+    monkeypatch.setattr(profiling, "ENABLED", True)
+    monkeypatch.setattr(profiling, "collector", collector)
+    return collector
+
+
+def test_disabled_profiling_is_a_shared_no_op(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", False)
+    assert profiling.section("a") is profiling.rerun() is profiling._NULL
+    profiling.count("a")
+
+
+def test_sections_and_counters_land_in_their_rerun(collector):
+    with profiling.rerun("app"):
+        with profiling.section("load"):
+            profiling.count("hit")
+            profiling.count("hit", 2)
+        with profiling.section("load"):
+            pass
+        with profiling.section("grade"):
+            pass
+
+    [record] = collector.recent()
+    assert record["rerun"] == "app"
+    assert sorted(record["sections"]) == ["grade", "load"]
+    assert record["counters"] == {"hit": 3}
+    assert record["total_ms"] >= sum(record["sections"].values())
+
+
+def test_section_outside_a_rerun_is_its_own_record(collector):
+    with profiling.section("fragment"):
+        pass
+    profiling.count("ignored")
+    assert [r["rerun"] for r in collector.recent()] == ["fragment"]
+
+
+def test_summary(collector):
+    for ms in (1.0, 2.0, 3.0):
+        collector.add({"rerun": "app", "total_ms": ms, "sections": {"load": ms / 2}, "counters": {"hit": 1}})
+
+    summary = collector.summary()
+
+    assert summary["reruns"] == 3
+    assert summary["total"] == {"count": 3, "mean_ms": 2.0, "p95_ms": 3.0, "max_ms": 3.0}
+    assert summary["sections"]["load"]["max_ms"] == 1.5
+    assert summary["counters"] == {"hit": 3}
+
+
+def test_records_are_appended_in_batches(collector, monkeypatch):
+    monkeypatch.setattr(profiling, "FLUSH_EVERY", 2)
+    collector.add({"n": 1})
+    with pytest.raises(FileNotFoundError):
+        open(collector.path)
+
+    collector.add({"n": 2})
+    collector.add({"n": 3})
+    collector.flush()
+
+    with open(collector.path, encoding="utf-8") as f:
+        assert [json.loads(line)["n"] for line in f] == [1, 2, 3]
+
+
+def test_unwritable_metrics_file_is_logged(tmp_path, caplog):
+    collector = Collector(str(tmp_path / "missing" / "metrics.jsonl"))
+    collector.add({"n": 1})
+    with caplog.at_level(logging.WARNING, logger="devtools.profiling"):
+        collector.flush()
+    assert "Could not write metrics" in caplog.text
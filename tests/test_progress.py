@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from storage.attempts import AttemptLog, make_event
+from storage.progress import ProgressIndex, day_of
+
+DAY1 = time.mktime((2026, 3, 2, 12, 0, 0, 0, 0, -1))
+DAY2 = DAY1 + 86400
+
+
+def event(blank_id, correct, ts=DAY1, topic="Campus", error_type="Collocation", student_id="s1"):
+    return make_event(student_id, "flyer", "v1", blank_id.partition(".")[0], blank_id,
+                      "option", correct, error_type, 1200, topic=topic, ts=ts)
+
+
+@pytest.fixture
+def open_log(tmp_path):
+    logs = []
+
+    def open_log():
+        log = AttemptLog(str(tmp_path / "attempts.db"), flush_interval=3600)
+        logs.append(log)
+        return log
+
+    yield open_log
+    for log in logs:
+        log.close()
+
+
+def rows(summary, dimension):
+    return [(r["category"], r["attempts"], r["correct"]) for r in summary[dimension]]
+
+
+def test_summary_counts_every_dimension_weakest_first(open_log):
+    log = open_log()
+    progress = ProgressIndex(log)
+    log.record([
+        event("1.1", True), event("1.2", False, error_type="Word Order"),
+        event("2.1", True, topic="Trip"), event("2.2", True, topic="Trip", error_type="Word Order"),
+    ])
+
+    summary = progress.summary("s1")
+
+    assert rows(summary, "overall") == [("all", 4, 3)]
+    assert rows(summary, "topic") == [("Campus", 2, 1), ("Trip", 2, 2)]
+    assert rows(summary, "error_type") == [("Word Order", 2, 1), ("Collocation", 2, 2)]
+    assert progress.summary("s2")["overall"] == []
+
+
+def test_trend_is_bucketed_by_day(open_log):
+    log = open_log()
+    progress = ProgressIndex(log)
+    log.record([event("1.1", False), event("1.2", True, ts=DAY2), event("1.3", True, ts=DAY2)])
+
+    assert progress.trend("s1", "topic") == {"Campus": [(day_of(DAY1), 1, 0), (day_of(DAY2), 2, 2)]}
+
+
+def test_counters_are_reloaded_not_recounted(open_log):
+    log = open_log()
+    ProgressIndex(log)
+    log.record([event("1.1", True), event("1.2", False)])
+    log.flush()
+
+    restarted = ProgressIndex(open_log())
+
+    assert rows(restarted.summary("s1"), "overall") == [("all", 2, 1)]
+
+
+def test_other_processes_submissions_are_counted_once(open_log):
+    writer_log, reader_log = open_log(), open_log()
+    writer, reader = ProgressIndex(writer_log), ProgressIndex(reader_log)
+
+    writer_log.record([event("1.1", True), event("1.2", False)])
+    writer_log.flush()
+    reader_log.follow()
+    reader_log.follow()
+
+    assert rows(reader.summary("s1"), "overall") == [("all", 2, 1)]
+    assert rows(writer.summary("s1"), "overall") == [("all", 2, 1)]
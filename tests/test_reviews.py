@@ -0,0 +1,150 @@
+import pytest
+
+from storage.attempts import AttemptLog, make_event
+from storage.reviews import (BLANK, DAY, ERROR_TYPE, MIN_EASE, START_EASE, ReviewScheduler,
+                             card_reviews, sm2)
+
+
+def new_card():
+    return {"ease": START_EASE, "interval": 0, "reps": 0, "lapses": 0, "due": 0.0}
+
+
+def event(blank_id, correct, ts, error_type="Collocation", student_id="s1"):
+    return make_event(student_id, "flyer", "v1", blank_id.partition(".")[0], blank_id,
+                      "option", correct, error_type, 1200, ts=ts)
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = AttemptLog(str(tmp_path / "attempts.db"), flush_interval=3600)
+    yield log
+    log.close()
+
+
+# =========================
+# SM-2
+# =========================
+def test_sm2_intervals_grow_with_correct_answers():
+    card = new_card()
+    intervals = []
+    for _ in range(4):
+        sm2(card, 4, 0.0)
+        intervals.append(card["interval"])
+
+    # quality 4 leaves the ease where it is: 1, 6, then interval * ease
+    assert card["ease"] == pytest.approx(START_EASE)
+    assert intervals == [1, 6, 15, 38]
+    assert card["reps"] == 4
+    assert card["due"] == 38 * DAY
+
+
+def test_sm2_lapse_resets_the_card():
+    card = new_card()
+    for _ in range(3):
+        sm2(card, 4, 0.0)
+
+    sm2(card, 1, 100.0)
+
+    assert (card["reps"], card["interval"], card["lapses"]) == (0, 1, 1)
+    assert card["ease"] == pytest.approx(START_EASE - 0.54)
+    assert card["due"] == 100.0 + DAY
+
+
+def test_sm2_ease_never_drops_below_the_floor():
+    card = new_card()
+    for _ in range(10):
+        sm2(card, 0, 0.0)
+    assert card["ease"] == MIN_EASE
+
+
+def test_card_reviews_grades_blanks_and_error_types():
+    reviews = card_reviews([
+        event("1.1", True, 10.0),
+        event("1.2", False, 10.0),
+        event("1.3", True, 10.0),
+        event("1.4", False, 10.0, error_type="Word Order"),
+        event("1.1", False, 40.0),
+    ])
+
+    assert reviews[("s1", BLANK, "flyer", "1.1")] == [(4, 10.0), (1, 40.0)]
+    assert reviews[("s1", BLANK, "flyer", "1.2")] == [(1, 10.0)]
+    # one review per submission: the share of the type's blanks answered right, graded 0-5
+    assert reviews[("s1", ERROR_TYPE, "flyer", "Collocation")] == [(3, 10.0), (0, 40.0)]
+    assert reviews[("s1", ERROR_TYPE, "flyer", "Word Order")] == [(0, 10.0)]
+
+
+# =========================
+# SCHEDULER
+# =========================
+def test_due_cards_come_most_overdue_first(log):
+    scheduler = ReviewScheduler(log)
+    log.record([event("1.2", False, 100.0)])
+    log.record([event("1.1", False, 0.0)])
+
+    due = scheduler.due("s1", now=DAY + 200, kind=BLANK)
+    assert [c["key"] for c in due] == ["1.1", "1.2"]
+    assert [c["key"] for c in scheduler.due("s1", now=DAY + 50, kind=BLANK)] == ["1.1"]
+    # taking due cards does not use them up
+    assert scheduler.due("s1", now=DAY + 200, kind=BLANK) == due
+    assert scheduler.due("s1", now=DAY + 200, kind=BLANK, task="reorder") == []
+
+
+def test_rescheduled_card_leaves_its_old_slot(log):
+    scheduler = ReviewScheduler(log)
+    log.record([event("1.1", False, 0.0), event("1.2", False, 100.0)])
+    log.record([event("1.1", True, DAY + 10)])
+
+    assert [c["key"] for c in scheduler.due("s1", now=DAY + 200, kind=BLANK)] == ["1.2"]
+    assert [c["key"] for c in scheduler.due("s1", now=2 * DAY + 200, kind=BLANK)] == ["1.2", "1.1"]
+
+
+def test_cards_survive_a_restart(tmp_path):
+    path = str(tmp_path / "attempts.db")
+    log = AttemptLog(path, flush_interval=3600)
+    before = ReviewScheduler(log)
+    log.record([event("1.1", False, 0.0), event("1.2", True, 100.0)])
+    log.close()
+
+    log = AttemptLog(path, flush_interval=3600)
+    try:
+        after = ReviewScheduler(log)
+        now = 10 * DAY
+        assert after.due("s1", now=now) == before.due("s1", now=now)
+        assert len(after.due("s1", now=now)) == 3
+    finally:
+        log.close()
+
+
+def test_processes_sharing_a_database_build_on_each_other(tmp_path):
+    path = str(tmp_path / "attempts.db")
+    first_log = AttemptLog(path, flush_interval=3600)
+    second_log = AttemptLog(path, flush_interval=3600)
+    try:
+        first = ReviewScheduler(first_log)
+        second = ReviewScheduler(second_log)
+
+        # both review the same card before seeing each other's answer
+        first_log.record([event("1.1", True, 0.0)])
+        second_log.record([event("1.1", True, 10.0)])
+        first_log.flush()
+        second_log.flush()
+        first_log.follow()
+        second_log.follow()
+
+        expected = new_card()
+        sm2(expected, 4, 0.0)
+        sm2(expected, 4, 10.0)
+        for scheduler in (first, second):
+            [card] = scheduler.due("s1", now=100 * DAY, kind=BLANK)
+            assert (card["reps"], card["interval"], card["due"]) == (2, 6, expected["due"])
+    finally:
+        first_log.close()
+        second_log.close()
+
+    log = AttemptLog(path, flush_interval=3600)
+    try:
+        [card] = ReviewScheduler(log).due("s1", now=100 * DAY, kind=BLANK)
+        assert card["reps"] == 2
+    finally:
+        log.close()
+
@@ -0,0 +1,96 @@
+import pytest
+
+from flyer_converter import build_item_bank
+from practice import search
+from practice.item_bank import ItemBank
+from practice.search import SearchIndex, search_index
+
+
+def blank(blank_id, options, correct, error_type, analysis=None):
+    return {"id": blank_id, "passage_id": blank_id.partition(".")[0], "blank": int(blank_id.partition(".")[2]),
+            "options": options, "correct_answer": correct, "error_type": error_type,
+            "error_analysis": analysis or {}}
+
+
+def make_bank(path="bank.json", version="v1"):
+    passages = [
+        {"id": "1", "topic": "Campus Life", "passage_text": "Join the museum tour (1) ______ (2) ______",
+         "blank_ids": ["1.1", "1.2"]},
+        {"id": "2", "topic": "Ocean", "passage_text": "Protect the reef (1) ______", "blank_ids": ["2.1"]},
+        {"id": "3", "topic": "Campus Life", "passage_text": "Register before Friday (1) ______", "blank_ids": ["3.1"]},
+    ]
+    blanks = [
+        blank("1.1", ["make", "do", "take"], "take", "Collocation Error (Make vs Do)",
+              {"make": {"error_type": "Collocation (Make vs Do)"}}),
+        blank("1.2", ["excited", "exciting"], "excited", "Overgeneralization (Adjective -ed/-ing)"),
+        blank("2.1", ["on", "in", "at"], "in", "Collocation (Preposition)"),
+        blank("3.1", ["registers", "register"], "register", None),
+    ]
+    return ItemBank(path, version, build_item_bank("flyer", passages, blanks))
+
+
+@pytest.fixture
+def index():
+    return SearchIndex(make_bank())
+
+
+def found(index, query, **filters):
+    return index.search(query, **filters)["rows"].tolist()
+
+
+def test_parse():
+    assert SearchIndex.parse("Make -topic:campus distractor:make/DO error:colloc* bogus:") == [
+        (False, search.FIELDS, ["make"]),
+        (True, ("topic",), ["campus"]),
+        (False, ("distractor",), ["make", "do"]),
+        (False, ("error",), ["colloc*"]),
+        (False, search.FIELDS, ["bogus"]),
+    ]
+    assert SearchIndex.parse("passage:reef options:-ed") == [(False, ("text",), ["reef"]), (False, ("option",), ["ed"])]
+
+
+def test_fields_alternatives_and_prefixes(index):
+    assert found(index, "make") == [0]
+    assert found(index, "answer:take") == [0]
+    assert found(index, "answer:make") == []
+    assert found(index, "distractor:make/at") == [0, 2]
+    assert found(index, "error:colloc*") == [0, 2]
+    assert found(index, "error:preposition") == [2]
+    # clauses must all match
+    assert found(index, "error:collocation option:on") == [2]
+
+
+def test_passage_fields_match_every_blank_of_the_passage(index):
+    assert found(index, "museum") == [0, 1]
+    assert found(index, "topic:campus") == [0, 1, 3]
+    assert found(index, "topic:campus -museum") == [3]
+    assert found(index, "") == [0, 1, 2, 3]
+
+
+def test_facets_and_filters(index):
+    result = index.search("topic:campus")
+    assert result["passages"] == [0, 2]
+    assert result["topics"] == {"Campus Life": 3}
+    assert result["categories"] == {"Collocation": 1, "Overgeneralization": 1, "Uncategorized": 1}
+
+    result = index.search("", category="Collocation")
+    assert result["rows"].tolist() == [0, 2]
+    # each facet counts the other facet's filter only
+    assert result["topics"] == {"Campus Life": 1, "Ocean": 1}
+    assert result["categories"]["Collocation"] == 2 and result["categories"]["Uncategorized"] == 1
+
+    assert found(index, "", topic="Ocean", category="Collocation") == [2]
+    assert found(index, "", topic="No such topic") == []
+    assert index.rows_in(result["rows"], [1]) == [2]
+
+
+def test_one_index_per_bank_version(monkeypatch):
+    monkeypatch.setattr(search, "_indexes", {})
+    first = search_index(make_bank())
+    assert search_index(make_bank()) is first
+
+    second = search_index(make_bank(version="v2"))
+    other = search_index(make_bank(path="other.json"))
+
+    assert second is not first and second.version == "v2"
+    assert search._indexes == {"bank.json": second, "other.json": other}
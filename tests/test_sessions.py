@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from storage.sessions import SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(str(tmp_path / "sessions.db"), cache_ttl=0.0)
+
+
+def test_create_and_get(store):
+    token = store.create(7, "Ana")
+    assert store.get(token) == {"student_id": "7", "full_name": "Ana", "token": token}
+    assert store.get("unknown") is None
+
+
+def test_restore_rotates_the_token_once(store):
+    token = store.create("s1", "Ana")
+    store.save_state(token, "flyer", {"index": 3})
+
+    session = store.restore(token)
+
+    assert session["student_id"] == "s1" and session["token"] != token
+    assert store.load_state(session["token"]) == {"flyer": {"index": 3}}
+    # the old token restores nothing and saves nothing...
+    assert store.restore(token) is None
+    assert not store.save_state(token, "flyer", {"index": 4})
+    # ...but a tab that already held it follows it to the new one
+    assert store.get(token, cached=False)["token"] == session["token"]
+    assert store.restore(session["token"])["token"] not in (token, session["token"])
+
+
+def test_delete_logs_out_every_token_of_the_login(store):
+    token = store.create("s1", "Ana")
+    rotated = store.restore(token)["token"]
+    other = store.create("s2", "Ben")
+
+    store.delete(rotated)
+
+    assert store.get(token, cached=False) is None
+    assert store.get(rotated, cached=False) is None
+    assert store.restore(rotated) is None
+    assert store.get(other, cached=False)["student_id"] == "s2"
+
+
+def test_expired_sessions_are_purged(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), ttl=60.0, cache_ttl=0.0)
+    token = store.create("s1", "Ana")
+    store.save_state(token, "flyer", {"index": 3})
+
+    assert store.purge(time.time() + 120) == 1
+    assert store.get(token) is None
+    assert store.load_state(token) == {}
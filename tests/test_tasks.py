@@ -0,0 +1,46 @@
+import sys
+import types
+
+import pytest
+
+from practice import tasks
+
+
+def test_labels_and_keys_round_trip():
+    assert [tasks.task_key(label) for label in tasks.task_labels()] == [t["key"] for t in tasks.TASKS]
+    assert tasks.task_label("flyer") == "📄 Leaflet/Flyer completion"
+
+
+@pytest.mark.parametrize("key", [t["key"] for t in tasks.TASKS])
+def test_every_task_declares_its_entry_point(key):
+    module = tasks.load_task(key)
+    assert module.TASK["key"] == key
+    assert callable(getattr(module, module.TASK["entry"]))
+    assert tasks.load_task(key) is module
+
+
+@pytest.fixture
+def fake_task(monkeypatch):
+    monkeypatch.setattr(tasks, "_loaded", {})
+    monkeypatch.setitem(tasks._by_key, "fake", {"key": "fake", "label": "Fake", "module": "fake_task"})
+    module = types.ModuleType("fake_task")
+    module.render = lambda: None
+    monkeypatch.setitem(sys.modules, "fake_task", module)
+    return module
+
+
+def test_task_modules_are_imported_on_first_use(fake_task):
+    fake_task.TASK = {"key": "fake", "entry": "render"}
+
+    assert tasks.load_task("fake") is fake_task
+    assert tasks._loaded == {"fake": fake_task}
+
+
+@pytest.mark.parametrize("spec", [None, {"key": "other", "entry": "render"}, {"key": "fake", "entry": "missing"}])
+def test_invalid_task_declaration(fake_task, spec):
+    if spec is not None:
+        fake_task.TASK = spec
+
+    with pytest.raises(ValueError, match="does not declare a valid TASK"):
+        tasks.load_task("fake")
+    assert tasks._loaded == {}
@@ -0,0 +1,89 @@
+import csv
+import sqlite3
+
+import pytest
+
+from storage.users import TEACHER, CSVUserStore, SQLiteUserStore, UserStore
+
+
+@pytest.fixture(params=["sqlite", "csv"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteUserStore(str(tmp_path / "users.db"), legacy_csv=None)
+    return CSVUserStore(str(tmp_path / "users.csv"))
+
+
+def write_legacy_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["student_id", "full_name", "password"])
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_add_and_get(store):
+    assert store.add("s1", "Student One", "hash1")
+    assert store.get("s1") == {"student_id": "s1", "full_name": "Student One", "password": "hash1", "role": "student"}
+    assert store.get("s2") is None
+
+
+def test_student_id_is_unique(store):
+    assert store.add("s1", "Student One", "hash1")
+    assert not store.add("s1", "Someone Else", "hash2")
+    assert store.get("s1")["full_name"] == "Student One"
+
+
+def test_set_password(store):
+    store.add("s1", "Student One", "plain")
+    store.add("s2", "Student Two", "other")
+    store.set_password("s1", "hashed")
+    assert store.get("s1")["password"] == "hashed"
+    assert store.get("s2")["password"] == "other"
+
+
+def test_roles(store):
+    store.add("s1", "Student One", "pw")
+    store.add("t1", "Teacher One", "pw", role=TEACHER)
+    assert [store.get(i)["role"] for i in ("s1", "t1")] == ["student", "teacher"]
+
+    assert store.set_role("s1", "author")
+    assert store.get("s1")["role"] == "author"
+    assert store.get("t1")["role"] == "teacher"
+    assert not store.set_role("nobody", "author")
+    with pytest.raises(ValueError):
+        store.set_role("s1", "admin")
+    with pytest.raises(ValueError):
+        store.add("s2", "Student Two", "pw", role="admin")
+
+
+def test_accounts_from_before_roles_are_students(tmp_path):
+    legacy = write_legacy_csv(tmp_path / "users.csv", [["s1", "Student One", "pw"]])
+    csv_store = CSVUserStore(legacy)
+    csv_store.add("s2", "Student Two", "pw")
+    assert [csv_store.get(i)["role"] for i in ("s1", "s2")] == ["student", "student"]
+
+    db = str(tmp_path / "users.db")
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE users (student_id TEXT PRIMARY KEY, full_name TEXT NOT NULL, password TEXT NOT NULL)")
+        conn.execute("INSERT INTO users VALUES ('s1', 'Student One', 'pw')")
+    conn.close()
+    assert SQLiteUserStore(db, legacy_csv=None).get("s1")["role"] == "student"
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        UserStore()
+
+
+def test_csv_accounts_are_migrated_once(tmp_path):
+    legacy = write_legacy_csv(tmp_path / "users.csv", [["s1", "Student One", "pw"], ["", "No ID", "x"]])
+    db = str(tmp_path / "users.db")
+
+    store = SQLiteUserStore(db, legacy_csv=legacy)
+    assert store.get("s1")["full_name"] == "Student One"
+
+    # later edits to the CSV are not imported again
+    write_legacy_csv(tmp_path / "users.csv", [["s1", "Renamed", "pw"], ["s2", "Student Two", "pw"]])
+    store = SQLiteUserStore(db, legacy_csv=legacy)
+    assert store.get("s1")["full_name"] == "Student One"
+    assert store.get("s2") is None